@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+"""
+Apply an Arca Verborum Delta Package
+
+Rebuilds a collection of a new release from the collection of the previous
+release (an extracted archive) and the delta package published next to the
+new archive, so that only the changed datasets need to be downloaded.
+
+Tables are rebuilt dataset by dataset: unchanged blocks are copied from the
+old files, changed and added ones are read from the delta, and removed
+datasets are left out. Every block and every resulting file is checked
+against the SHA256 recorded in the delta; the new files are only moved into
+place once all of them have been verified.
+
+Needs only the Python standard library. Each delta package includes a copy
+of this script.
+
+Usage:
+    python apply_delta.py OLD_DIR DELTA_ZIP NEW_DIR
+    python apply_delta.py arcaverborum-A-full-20251001 \\
+        arcaverborum.A.full.20260101.delta-A.20251001.zip arcaverborum-A-full-20260101
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+DELTA_FILE = "delta.json"
+COPY_BUFFER_SIZE = 1024 * 1024  # Bytes copied per chunk for whole files
+
+
+def die(msg, code=1):
+    """Print error message and exit."""
+    print(f"ERROR: {msg}", file=sys.stderr)
+    sys.exit(code)
+
+
+def read_exactly(f, size: int, label: str) -> bytes:
+    """Read size bytes from f, or die if the file is too short."""
+    data = f.read(size)
+    if len(data) != size:
+        die(f"{label}: expected {size} bytes, found {len(data)}")
+    return data
+
+
+def rebuild_table(filename: str, spec: dict, old_dir: Path, delta: zipfile.ZipFile, out_path: Path,
+                  from_version: str):
+    """
+    Rebuild one table from the old file's blocks and the delta's blocks.
+
+    @param filename: Table file name (e.g., "forms.csv")
+    @param spec: The table's entry in delta.json
+    @param old_dir: Directory of the old collection
+    @param delta: Open delta package
+    @param out_path: Path to write the rebuilt table to
+    @param from_version: Version the delta applies to (for error messages)
+    """
+    file_hash = hashlib.sha256()
+    size = 0
+    with open(old_dir / filename, "rb") as old, delta.open(f"tables/{filename}") as new, \
+            open(out_path, "wb") as out:
+        header = spec["header"].encode("utf-8")
+        out.write(header)
+        file_hash.update(header)
+        size += len(header)
+
+        for block in spec["blocks"]:
+            label = f"{filename}, {block['dataset']}"
+            if block["source"] == "old":
+                old.seek(block["offset"])
+                data = read_exactly(old, block["size"], f"{label} (old release)")
+                if hashlib.sha256(data).hexdigest() != block["sha256"]:
+                    die(f"{label}: old release does not match the delta's base. "
+                        f"Is {old_dir} the {from_version} release?")
+            else:
+                # Delta blocks are stored in the order they are used
+                data = read_exactly(new, block["size"], f"{label} (delta)")
+                if hashlib.sha256(data).hexdigest() != block["sha256"]:
+                    die(f"{label}: corrupted delta block")
+            out.write(data)
+            file_hash.update(data)
+            size += len(data)
+
+    if size != spec["size"] or file_hash.hexdigest() != spec["sha256"]:
+        die(f"{filename}: rebuilt file does not match the new release's checksum")
+
+
+def extract_file(filename: str, spec: dict, delta: zipfile.ZipFile, out_path: Path):
+    """
+    Extract a file shipped whole in the delta, verifying its checksum.
+
+    @param filename: File name (e.g., "sources.bib")
+    @param spec: The file's entry in delta.json
+    @param delta: Open delta package
+    @param out_path: Path to write the file to
+    """
+    file_hash = hashlib.sha256()
+    with delta.open(f"files/{filename}") as src, open(out_path, "wb") as out:
+        while chunk := src.read(COPY_BUFFER_SIZE):
+            file_hash.update(chunk)
+            out.write(chunk)
+    if file_hash.hexdigest() != spec["sha256"]:
+        die(f"{filename}: corrupted file in delta")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild a new Arca Verborum release from the previous one and a delta package"
+    )
+    parser.add_argument("old_dir", type=Path, help="Extracted collection of the previous release")
+    parser.add_argument("delta", type=Path, help="Delta package (.zip)")
+    parser.add_argument("new_dir", type=Path, help="Directory for the new collection (may be OLD_DIR)")
+    args = parser.parse_args()
+
+    if not args.old_dir.is_dir():
+        die(f"Not a directory: {args.old_dir}")
+
+    with zipfile.ZipFile(args.delta) as delta:
+        try:
+            info = json.loads(delta.read(DELTA_FILE))
+        except KeyError:
+            die(f"{args.delta} is not a delta package ({DELTA_FILE} missing)")
+
+        print(f"Delta for the {info['collection']} collection: "
+              f"{info['from_version']} -> {info['to_version']}")
+        datasets = info["datasets"]
+        print(f"  {len(datasets['changed'])} changed, {len(datasets['added'])} added, "
+              f"{len(datasets['removed'])} removed datasets")
+
+        # Write everything next to its final name, and rename only once all files check out
+        args.new_dir.mkdir(parents=True, exist_ok=True)
+        pending = []
+        try:
+            for filename, spec in info["tables"].items():
+                out_path = args.new_dir / f"{filename}.tmp"
+                pending.append((out_path, args.new_dir / filename))
+                rebuild_table(filename, spec, args.old_dir, delta, out_path, info["from_version"])
+                print(f"  Rebuilt: {filename}")
+            for filename, spec in info["files"].items():
+                out_path = args.new_dir / f"{filename}.tmp"
+                pending.append((out_path, args.new_dir / filename))
+                extract_file(filename, spec, delta, out_path)
+                print(f"  Extracted: {filename}")
+        except SystemExit:
+            for tmp_path, _ in pending:
+                tmp_path.unlink(missing_ok=True)
+            raise
+
+    for tmp_path, path in pending:
+        tmp_path.replace(path)
+
+    print(f"\nVerified {len(pending)} files of {info['to_version']} in {args.new_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+
+"""
+Arca Verborum Build Pipeline
+
+Runs sync, merge and (optionally) release preparation as one pipeline:
+each Lexibank repository is merged as soon as its sync finishes, instead of
+waiting for all repositories to be cloned first. Repositories are synced by
+a thread pool, datasets are processed by a process pool, and the main thread
+appends results to the collections in sorted dataset order through a reorder
+buffer, so the output is identical to running clone_lexibank.py and
+merge_cldf_datasets.py one after the other.
+
+At the end, an end-to-end timing report shows the critical path: the chain
+of sync, processing and writing that determined the total build time.
+
+Usage:
+    python build_pipeline.py
+    python build_pipeline.py --jobs 16 --workers 4 --timings timings.json
+    python build_pipeline.py --skip-sync --release --version 1.20260101
+"""
+
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import clone_lexibank
+import merge_cldf_datasets as merger
+
+# === CONFIGURATION ===
+DATASETS_CSV = Path('datasets.csv')
+
+logger = logging.getLogger(__name__)
+
+
+# === STAGES ===
+
+def sync_timed(repo: Dict, lexibank_dir: Path, sync_options: Dict) -> Tuple[str, float, float]:
+    """
+    Sync one repository (thread pool).
+
+    @param repo: Repository dictionary from clone_lexibank.read_datasets
+    @param lexibank_dir: Lexibank directory
+    @param sync_options: Keyword arguments for clone_lexibank.sync_repository
+    @return: Tuple of (action, start, end) with wall-clock times
+    """
+    start = time.time()
+    _, action, _ = clone_lexibank.sync_repository(repo, lexibank_dir, **sync_options)
+    return action, start, time.time()
+
+
+def process_timed(dataset: str, lexibank_dir: Path) -> Tuple[tuple, float, float]:
+    """
+    Process one dataset (process pool).
+
+    @param dataset: Dataset name
+    @param lexibank_dir: Lexibank directory
+    @return: Tuple of (process_dataset result, start, end) with wall-clock times
+    """
+    start = time.time()
+    result = merger.process_dataset(dataset, lexibank_dir)
+    return result, start, time.time()
+
+
+def run_release(version: Optional[str]) -> bool:
+    """
+    Run prepare_release.py on the merged collections.
+
+    @param version: Release version, or None for the default
+    @return: True if successful
+    """
+    command = [sys.executable, str(Path(__file__).with_name('prepare_release.py'))]
+    if version:
+        command += ['--version', version]
+    logger.info(f"Running {' '.join(command[1:])}")
+    return subprocess.run(command).returncode == 0
+
+
+# === TIMING REPORT ===
+
+def critical_path(timeline: Dict[str, Dict], order: List[str], t0: float) -> Optional[Dict]:
+    """
+    Find the dataset whose readiness last held up the writer.
+
+    Writes are serialized in dataset order, so the build's end is determined
+    by the last dataset the writer had to wait for; everything written after
+    it was already buffered.
+
+    @param timeline: Per-dataset stage times
+    @param order: Dataset output order
+    @param t0: Pipeline start time
+    @return: Critical-path summary, or None if nothing was written
+    """
+    written = [name for name in order if 'write_start' in timeline[name]]
+    if not written:
+        return None
+
+    gating = written[0]
+    previous_end = t0
+    for name in written:
+        if timeline[name]['ready'] > previous_end:
+            gating = name
+        previous_end = timeline[name]['write_end']
+
+    stages = timeline[gating]
+    after = written[written.index(gating):]
+    return {
+        'dataset': gating,
+        'sync': stages.get('sync_end', t0) - stages.get('sync_start', t0),
+        'wait_for_worker': stages['process_start'] - stages.get('sync_end', t0),
+        'process': stages['process_end'] - stages['process_start'],
+        'write_remaining': timeline[after[-1]]['write_end'] - stages['write_start'],
+        'datasets_written_after': len(after) - 1,
+    }
+
+
+def log_timing_report(timeline: Dict[str, Dict], order: List[str], phases: Dict[str, float],
+                      t0: float, t_end: float) -> Dict:
+    """
+    Log and return the end-to-end timing report.
+
+    @param timeline: Per-dataset stage times
+    @param order: Dataset output order
+    @param phases: Start times of the final phases (finish, release, end)
+    @param t0: Pipeline start time
+    @param t_end: Pipeline end time
+    @return: Report dictionary
+    """
+    def total(start_key: str, end_key: str) -> float:
+        return sum(t[end_key] - t[start_key] for t in timeline.values() if end_key in t)
+
+    path = critical_path(timeline, order, t0)
+    report: Dict[str, Any] = {
+        'wall_time': t_end - t0,
+        'stage_totals': {
+            'sync': total('sync_start', 'sync_end'),
+            'process': total('process_start', 'process_end'),
+            'write': total('write_start', 'write_end'),
+        },
+        'finish_collections': phases['release'] - phases['finish'],
+        'release': phases['end'] - phases['release'],
+        'critical_path': path,
+        'datasets': {
+            name: {key: round(value - t0, 3) for key, value in stages.items()}
+            for name, stages in timeline.items()
+        },
+    }
+
+    logger.info("=" * 60)
+    logger.info("END-TO-END TIMING")
+    logger.info("=" * 60)
+    logger.info(f"Wall time: {report['wall_time']:.1f}s")
+    for stage, seconds in report['stage_totals'].items():
+        logger.info(f"Total {stage} time (all datasets): {seconds:.1f}s")
+    if path:
+        logger.info(f"Critical path via {path['dataset']}: "
+                    f"sync {path['sync']:.1f}s -> wait for worker {path['wait_for_worker']:.1f}s -> "
+                    f"process {path['process']:.1f}s -> write it and {path['datasets_written_after']} "
+                    f"buffered datasets {path['write_remaining']:.1f}s -> "
+                    f"finish collections {report['finish_collections']:.1f}s -> release {report['release']:.1f}s")
+    return report
+
+
+# === MAIN ===
+
+def main():
+    """Main entry point - syncs, merges and optionally releases in one pipeline."""
+    parser = argparse.ArgumentParser(
+        description='Sync Lexibank repositories and merge each dataset as soon as it is synced',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        '--csv',
+        type=Path,
+        default=DATASETS_CSV,
+        help=f'Path to datasets.csv (default: {DATASETS_CSV})'
+    )
+    parser.add_argument(
+        '--input',
+        type=Path,
+        default=merger.LEXIBANK_DIR,
+        help=f'Lexibank directory (default: {merger.LEXIBANK_DIR})'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=merger.OUTPUT_DIR,
+        help=f'Output directory (default: {merger.OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=8,
+        help='Number of repositories to sync in parallel (default: 8)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Number of processes for process_dataset (default: 2)'
+    )
+    parser.add_argument(
+        '--memory-budget',
+        type=float,
+        help='Memory budget in GB for datasets being processed or buffered (default: half of RAM)'
+    )
+    parser.add_argument(
+        '--skip-sync',
+        action='store_true',
+        help='Use the existing checkouts in the lexibank directory without syncing'
+    )
+    parser.add_argument(
+        '--via',
+        choices=['git', 'archive'],
+        default='git',
+        help='Sync with git or by downloading archives (default: git)'
+    )
+    parser.add_argument(
+        '--full-checkout',
+        action='store_true',
+        help='Clone complete working trees instead of only cldf/'
+    )
+    parser.add_argument(
+        '--mirror-dir',
+        type=Path,
+        help='Shared directory of bare mirrors (see clone_lexibank.py)'
+    )
+    parser.add_argument(
+        '--lock',
+        type=Path,
+        default=clone_lexibank.LOCK_FILE,
+        help=f'Lockfile to update with the synced commits (default: {clone_lexibank.LOCK_FILE})'
+    )
+    parser.add_argument(
+        '--release',
+        action='store_true',
+        help='Run prepare_release.py after merging (requires the default --output)'
+    )
+    parser.add_argument(
+        '--version',
+        help='Release version passed to prepare_release.py'
+    )
+    parser.add_argument(
+        '--timings',
+        type=Path,
+        help='Write the per-dataset timeline and critical path as JSON'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    # prepare_release.py always packages the collections in merger.OUTPUT_DIR
+    if args.release and args.output.resolve() != merger.OUTPUT_DIR.resolve():
+        parser.error(f'--release requires the default --output ({merger.OUTPUT_DIR})')
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    repositories = clone_lexibank.read_datasets(args.csv)
+    core_datasets = {repo['name'] for repo in repositories if repo['is_core']}
+    corecog_datasets = {repo['name'] for repo in repositories if repo['is_corecog']}
+    order = sorted(repo['name'] for repo in repositories)
+    workers = max(1, args.workers)
+    memory_budget = int(args.memory_budget * 1024 ** 3) if args.memory_budget else merger.default_memory_budget()
+
+    args.input.mkdir(exist_ok=True)
+    merger.initialize_output_files(args.output / 'full', args.output / 'core', args.output / 'corecog')
+    writers = merger.create_collection_writers(args.output)
+
+    t0 = time.time()
+    timeline: Dict[str, Dict] = {name: {} for name in order}
+    sync_stats = {'cloned': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    failed_sync: List[str] = []
+    skipped: List[str] = []
+
+    estimates: Dict[str, dict] = {}
+    scheduler = merger.DatasetScheduler(estimates, memory_budget, workers)  # synced, waiting for a worker
+    buffer: Dict[str, tuple] = {}              # processed, waiting for the writer
+    done: set = set()                          # written or skipped
+    futures: Dict[Future, Tuple[str, str]] = {}
+    next_index = 0
+
+    def mark_synced(name: str):
+        if (args.input / name / 'cldf' / 'cldf-metadata.json').exists():
+            estimates[name] = merger.estimate_dataset(name, args.input)
+            scheduler.add(name)
+        else:
+            logger.warning(f"No cldf/cldf-metadata.json in {args.input / name}, skipping")
+            skipped.append(name)
+            done.add(name)
+
+    # Workers are spawned, not forked: forking while sync threads hold locks can deadlock them
+    spawn = multiprocessing.get_context('spawn')
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as sync_pool, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as process_pool:
+
+        if args.skip_sync:
+            for name in order:
+                mark_synced(name)
+        else:
+            heads = (clone_lexibank.resolve_remote_heads(repositories, max(args.jobs, clone_lexibank.LS_REMOTE_WORKERS))
+                     if args.via == 'git' else {})
+            session = clone_lexibank.make_session(max(1, args.jobs)) if args.via == 'archive' else None
+            for repo in repositories:
+                sync_options = {
+                    'sparse': not args.full_checkout,
+                    'expected_head': heads.get(repo['name']),
+                    'mirror_dir': args.mirror_dir,
+                    'session': session,
+                }
+                futures[sync_pool.submit(sync_timed, repo, args.input, sync_options)] = ('sync', repo['name'])
+
+        while next_index < len(order):
+            # Start processing, largest first, within the memory budget
+            processing = sum(1 for stage, _ in futures.values() if stage == 'process')
+            while (name := scheduler.next(order[next_index], processing)) is not None:
+                futures[process_pool.submit(process_timed, name, args.input)] = ('process', name)
+                processing += 1
+
+            # Write everything that is next in order
+            while next_index < len(order) and (order[next_index] in buffer or order[next_index] in done):
+                name = order[next_index]
+                next_index += 1
+                if name in done:
+                    continue
+                result = buffer.pop(name)
+                timeline[name]['write_start'] = time.time()
+                try:
+                    merger.write_dataset(writers, name, result, core_datasets, corecog_datasets)
+                except Exception as e:
+                    logger.error(f"Failed to write {name}: {e}")
+                    skipped.append(name)
+                timeline[name]['write_end'] = time.time()
+                done.add(name)
+                scheduler.done(name)
+                logger.info(f"Merged dataset {next_index}/{len(order)}: {name} "
+                            f"({len(buffer)} buffered, {len(scheduler.pending)} waiting for a worker)")
+                del result
+                gc.collect()
+
+            if next_index >= len(order):
+                break
+
+            finished, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, name = futures.pop(future)
+                if stage == 'sync':
+                    action, start, end = future.result()
+                    timeline[name].update(sync_start=start, sync_end=end)
+                    sync_stats[action] += 1
+                    if action == 'failed':
+                        failed_sync.append(name)
+                        skipped.append(name)
+                        done.add(name)
+                    else:
+                        mark_synced(name)
+                else:
+                    try:
+                        result, start, end = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process {name}: {e}")
+                        skipped.append(name)
+                        done.add(name)
+                        scheduler.done(name)
+                        continue
+                    timeline[name].update(process_start=start, process_end=end, ready=time.time())
+                    buffer[name] = result
+
+    phases = {'finish': time.time()}
+    if skipped:
+        logger.warning(f"Skipped {len(skipped)} datasets: {', '.join(sorted(skipped))}")
+
+    merger.finish_collections(writers)
+
+    if not args.skip_sync:
+        synced = [repo for repo in repositories if repo['name'] not in failed_sync]
+        new_entries, changed = clone_lexibank.update_lock_entries(
+            synced, failed_sync, clone_lexibank.read_lockfile(args.lock), args.input, args.via
+        )
+        clone_lexibank.write_lockfile(args.lock, new_entries)
+        logger.info(f"Sync: {sync_stats['cloned']} cloned, {sync_stats['updated']} updated, "
+                    f"{sync_stats['unchanged']} unchanged, {sync_stats['failed']} failed; "
+                    f"{len(changed)} changed since {args.lock.name}")
+
+    phases['release'] = time.time()
+    released = run_release(args.version) if args.release else True
+    phases['end'] = time.time()
+
+    report = log_timing_report(timeline, order, phases, t0, phases['end'])
+    if args.timings:
+        with open(args.timings, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Wrote timings to {args.timings}")
+
+    if failed_sync or not released:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
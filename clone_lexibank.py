@@ -8,11 +8,44 @@ or updates repositories in a local lexibank/ directory.
 
 import argparse
 import csv
+import hashlib
+import json
 import logging
+import shutil
 import subprocess
 import sys
+import tarfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from progress import ProgressTracker
+
+# Directories checked out in sparse mode (the merger only reads cldf/)
+SPARSE_PATHS = ['cldf']
+
+# Pinned commits of the synchronized repositories
+LOCK_FILE = Path('lexibank.lock')
+
+# Config of the shared mirrors: checkouts cloned with --shared borrow their
+# objects, so git must never delete objects from a mirror (e.g. commits that
+# became unreachable after an upstream force-push or branch deletion)
+MIRROR_CONFIG = {'gc.auto': '0', 'gc.pruneExpire': 'never'}
+
+# Concurrent `git ls-remote` calls when resolving remote heads
+LS_REMOTE_WORKERS = 16
+
+# Archive mode: default tarball URL (placeholders: {url}, {name}, {ref}),
+# overridable per repository with an ARCHIVE_URL column in datasets.csv
+ARCHIVE_URL_TEMPLATE = '{url}/archive/{ref}.tar.gz'
+# Archive ref meaning each repository's latest release tag, resolved from the
+# redirect of {url}/releases/latest (GitHub); HEAD if a repository has none
+LATEST_REF = 'latest'
+LATEST_RELEASE_URL_TEMPLATE = '{url}/releases/latest'
+ARCHIVE_STATE_FILE = '.archive.json'
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -30,28 +63,55 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
-def clone_repository(name: str, url: str, target_dir: Path) -> bool:
+def clone_repository(name: str, url: str, target_dir: Path, sparse: bool = True, shared: bool = False) -> bool:
     """
-    Clone a repository with shallow clone.
+    Clone a repository.
+
+    From the network, the clone is shallow (--depth 1). In sparse mode the clone is partial (--filter=blob:none) and only the
+    directories in SPARSE_PATHS are checked out, so blobs outside cldf/
+    (raw/, etc/, ...) are never downloaded.
+
+    With shared, url is a local mirror and the clone borrows its objects
+    (git clone --shared) instead of copying or downloading them. The clone
+    is only valid as long as the mirror keeps those objects, which is why
+    update_mirror() disables garbage collection and pruning in mirrors
+    (MIRROR_CONFIG).
 
     @param name: Repository name
     @type name: str
-    @param url: Repository URL
+    @param url: Repository URL (or mirror path if shared)
     @type url: str
     @param target_dir: Target directory for clone
     @type target_dir: Path
+    @param sparse: If True, check out only SPARSE_PATHS
+    @type sparse: bool
+    @param shared: If True, clone from a local mirror sharing its objects
+    @type shared: bool
     @return: True if successful, False otherwise
     @rtype: bool
     """
     try:
-        logging.info(f"Cloning {name} from {url}")
+        logging.info(f"Cloning {name} from {url}" + (" (sparse)" if sparse else ""))
+        if shared:
+            command = ['git', 'clone', '--shared', *(['--sparse'] if sparse else []), url, str(target_dir)]
+        elif sparse:
+            command = ['git', 'clone', '--depth', '1', '--filter=blob:none', '--sparse', url, str(target_dir)]
+        else:
+            command = ['git', 'clone', '--depth', '1', url, str(target_dir)]
         result = subprocess.run(
-            ['git', 'clone', '--depth', '1', url, str(target_dir)],
+            command,
             capture_output=True,
             text=True,
             check=True
         )
         logging.debug(f"Clone output: {result.stdout}")
+        if sparse:
+            subprocess.run(
+                ['git', '-C', str(target_dir), 'sparse-checkout', 'set', *SPARSE_PATHS],
+                capture_output=True,
+                text=True,
+                check=True
+            )
         logging.info(f"Successfully cloned {name}")
         return True
     except subprocess.CalledProcessError as e:
@@ -62,6 +122,66 @@ def clone_repository(name: str, url: str, target_dir: Path) -> bool:
         return False
 
 
+def update_mirror(name: str, url: str, mirror_path: Path, expected_head: Optional[str] = None) -> bool:
+    """
+    Create or update the bare mirror of a repository.
+
+    Mirrors hold all objects of a repository once per machine; checkouts in
+    any output directory are cloned from them with --shared. A mirror that
+    already contains expected_head is not fetched. Since the checkouts
+    borrow the mirror's objects, MIRROR_CONFIG is applied before every fetch
+    (also to mirrors created before it existed): fetch --prune removes refs
+    that were deleted upstream, but the objects they pointed to are kept.
+
+    @param name: Repository name
+    @type name: str
+    @param url: Repository URL
+    @type url: str
+    @param mirror_path: Path of the bare mirror (e.g. mirrors/<name>.git)
+    @type mirror_path: Path
+    @param expected_head: Commit the mirror must contain, if known
+    @type expected_head: Optional[str]
+    @return: True if successful, False otherwise
+    @rtype: bool
+    """
+    try:
+        if mirror_path.exists():
+            if expected_head:
+                present = subprocess.run(
+                    ['git', '-C', str(mirror_path), 'cat-file', '-e', f'{expected_head}^{{commit}}'],
+                    capture_output=True
+                )
+                if present.returncode == 0:
+                    logging.debug(f"Mirror of {name} already has {expected_head[:10]}")
+                    return True
+            logging.info(f"Updating mirror of {name}")
+            for key, value in MIRROR_CONFIG.items():
+                subprocess.run(
+                    ['git', '-C', str(mirror_path), 'config', key, value],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            command = ['git', '-C', str(mirror_path), 'fetch', '--prune', 'origin']
+        else:
+            logging.info(f"Mirroring {name} from {url}")
+            config = [arg for key, value in MIRROR_CONFIG.items() for arg in ('--config', f'{key}={value}')]
+            command = ['git', 'clone', '--mirror', *config, url, str(mirror_path)]
+        subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return True
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to mirror {name}: {e.stderr}")
+        return False
+    except Exception as e:
+        logging.error(f"Unexpected error mirroring {name}: {e}")
+        return False
+
+
 def update_repository(name: str, repo_dir: Path) -> bool:
     """
     Update an existing repository with git pull.
@@ -92,29 +212,591 @@ def update_repository(name: str, repo_dir: Path) -> bool:
         return False
 
 
-def process_repository(name: str, url: str, lexibank_dir: Path) -> Tuple[bool, str]:
+def get_local_head(repo_dir: Path) -> Optional[str]:
+    """
+    Get the commit SHA checked out in a repository.
+
+    @param repo_dir: Repository directory
+    @type repo_dir: Path
+    @return: Commit SHA, or None if it cannot be resolved
+    @rtype: Optional[str]
+    """
+    result = subprocess.run(
+        ['git', '-C', str(repo_dir), 'rev-parse', 'HEAD'],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def get_remote_head(url: str) -> Optional[str]:
+    """
+    Get the commit SHA of a remote repository's HEAD without fetching.
+
+    @param url: Repository URL
+    @type url: str
+    @return: Commit SHA, or None if the remote cannot be queried
+    @rtype: Optional[str]
+    """
+    result = subprocess.run(
+        ['git', 'ls-remote', url, 'HEAD'],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout.split()[0]
+
+
+def resolve_remote_heads(repositories: List[Dict], workers: int = LS_REMOTE_WORKERS) -> Dict[str, Optional[str]]:
+    """
+    Resolve the remote HEAD of all repositories concurrently.
+
+    @param repositories: Repository dictionaries from read_datasets
+    @type repositories: List[Dict]
+    @param workers: Number of concurrent `git ls-remote` calls
+    @type workers: int
+    @return: Dictionary of name -> commit SHA (None if unresolved)
+    @rtype: Dict[str, Optional[str]]
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        heads = dict(zip(
+            [repo['name'] for repo in repositories],
+            executor.map(get_remote_head, [repo['url'] for repo in repositories])
+        ))
+
+    unresolved = sorted(name for name, head in heads.items() if head is None)
+    if unresolved:
+        logging.warning(f"Could not resolve remote HEAD for: {', '.join(unresolved)}")
+    logging.info(f"Resolved {len(heads) - len(unresolved)} remote heads in {time.perf_counter() - start:.1f}s")
+    return heads
+
+
+def checkout_commit(name: str, repo_dir: Path, commit: str) -> bool:
+    """
+    Check out a specific commit, fetching it first if needed.
+
+    The current branch (if any) is moved to the commit, so a later
+    `git pull` still works.
+
+    @param name: Repository name
+    @type name: str
+    @param repo_dir: Repository directory
+    @type repo_dir: Path
+    @param commit: Commit SHA to check out
+    @type commit: str
+    @return: True if successful, False otherwise
+    @rtype: bool
+    """
+    git = ['git', '-C', str(repo_dir)]
+    try:
+        logging.info(f"Checking out {name} at {commit[:10]}")
+        present = subprocess.run(git + ['cat-file', '-e', f'{commit}^{{commit}}'], capture_output=True)
+        if present.returncode != 0:
+            subprocess.run(
+                git + ['fetch', '--depth', '1', 'origin', commit],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+
+        branch = subprocess.run(
+            git + ['rev-parse', '--abbrev-ref', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+        target = ['--detach', commit] if branch == 'HEAD' else ['-B', branch, commit]
+        subprocess.run(
+            git + ['checkout', *target],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        logging.info(f"Successfully checked out {name}")
+        return True
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to check out {name} at {commit}: {e.stderr}")
+        return False
+    except Exception as e:
+        logging.error(f"Unexpected error checking out {name}: {e}")
+        return False
+
+
+def process_repository(
+    name: str,
+    url: str,
+    lexibank_dir: Path,
+    sparse: bool = True,
+    expected_head: Optional[str] = None,
+    pin: bool = False,
+    mirror_dir: Optional[Path] = None
+) -> Tuple[bool, str]:
     """
     Clone or update a repository.
 
+    If the checkout is already at expected_head, nothing is fetched. With
+    pin, the repository is checked out at exactly expected_head (a locked
+    commit) instead of being pulled. Existing checkouts are updated as they
+    are; sparse mode only applies to new clones. With mirror_dir, the
+    repository's mirror is brought up to date first and new clones are made
+    from it, so checkouts never fetch from the network themselves.
+
     @param name: Repository name
     @type name: str
     @param url: Repository URL
     @type url: str
     @param lexibank_dir: Lexibank directory
     @type lexibank_dir: Path
-    @return: Tuple of (success, action) where action is 'cloned', 'updated', or 'failed'
+    @param sparse: If True, new clones check out only cldf/
+    @type sparse: bool
+    @param expected_head: Commit the checkout should end up at, if known
+    @type expected_head: Optional[str]
+    @param pin: If True, check out expected_head instead of pulling
+    @type pin: bool
+    @param mirror_dir: Directory of shared bare mirrors, if used
+    @type mirror_dir: Optional[Path]
+    @return: Tuple of (success, action) where action is 'cloned', 'updated', 'unchanged', or 'failed'
     @rtype: Tuple[bool, str]
     """
     repo_dir = lexibank_dir / name
 
+    if repo_dir.exists() and expected_head and get_local_head(repo_dir) == expected_head:
+        logging.info(f"{name} is up to date at {expected_head[:10]}")
+        return (True, 'unchanged')
+
+    # Commit to check out with pin (e.g. archive-mode lock entries may have none)
+    pinned = expected_head if pin else None
+    if pin and not pinned:
+        logging.error(f"No commit to check out for {name}")
+        return (False, 'failed')
+
+    mirror_path = mirror_dir / f'{name}.git' if mirror_dir else None
+    if mirror_path and not update_mirror(name, url, mirror_path, expected_head):
+        return (False, 'failed')
+
     if repo_dir.exists():
-        success = update_repository(name, repo_dir)
+        if pinned:
+            success = checkout_commit(name, repo_dir, pinned)
+        else:
+            success = update_repository(name, repo_dir)
         return (success, 'updated' if success else 'failed')
     else:
-        success = clone_repository(name, url, repo_dir)
+        if mirror_path:
+            success = clone_repository(name, str(mirror_path.resolve()), repo_dir, sparse, shared=True)
+        else:
+            success = clone_repository(name, url, repo_dir, sparse)
+        if success and pinned and get_local_head(repo_dir) != pinned:
+            success = checkout_commit(name, repo_dir, pinned)
         return (success, 'cloned' if success else 'failed')
 
 
+def make_session(pool_size: int):
+    """
+    Create a pooled HTTP session for archive downloads.
+
+    @param pool_size: Maximum number of pooled connections per host
+    @type pool_size: int
+    @return: requests.Session with retries on transient errors
+    """
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except ImportError:
+        logging.error("requests is required for --via archive. Install with: pip install requests")
+        sys.exit(1)
+
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def resolve_latest_tag(session, url: str) -> Optional[str]:
+    """
+    Resolve the tag of a repository's latest release without git.
+
+    GitHub redirects {url}/releases/latest to .../releases/tag/<tag>, or to
+    .../releases if the repository has no release.
+
+    @param session: requests.Session
+    @param url: Repository URL
+    @type url: str
+    @return: Tag name, or None if the repository has no release
+    @rtype: Optional[str]
+    """
+    latest_url = LATEST_RELEASE_URL_TEMPLATE.format(url=url.rstrip('/'))
+    response = session.head(latest_url, allow_redirects=False, timeout=60)
+    location = response.headers.get('Location', '')
+    if response.is_redirect and '/releases/tag/' in location:
+        return unquote(location.split('/releases/tag/', 1)[1].split('?')[0].rstrip('/'))
+    if response.status_code not in (301, 302, 303, 307, 308, 404):
+        response.raise_for_status()
+    return None
+
+
+def download_archive(session, url: str, target: Path, etag: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Download a file, resuming a previous partial download if possible.
+
+    Data is streamed to <target>.part; if that exists, only the remaining
+    bytes are requested with a Range header (guarded by If-Range with the
+    ETag of the first attempt, so a changed file is downloaded afresh). If
+    the server rejects that range (HTTP 416), the .part file is taken as the
+    download when it has the file's full size, and otherwise discarded and
+    downloaded again from the start. Otherwise, if the ETag of a previous complete download is given, the
+    request is conditional and nothing is downloaded if the file is unchanged.
+
+    @param session: requests.Session
+    @param url: Archive URL
+    @type url: str
+    @param target: Final path of the download
+    @type target: Path
+    @param etag: ETag of the previous complete download, if any
+    @type etag: Optional[str]
+    @return: Tuple of (SHA-256 hex digest, ETag), or None if unchanged
+    @rtype: Optional[Tuple[str, Optional[str]]]
+    """
+    part = target.with_name(target.name + '.part')
+    etag_file = target.with_name(target.name + '.etag')
+    sha256 = hashlib.sha256()
+
+    headers = {}
+    offset = part.stat().st_size if part.exists() else 0
+    if offset and etag_file.exists():
+        headers['Range'] = f'bytes={offset}-'
+        headers['If-Range'] = etag_file.read_text(encoding='utf-8').strip()
+    elif etag:
+        headers['If-None-Match'] = etag
+
+    with session.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 416 and 'Range' in headers:
+            # Content-Range: bytes */<size of the file>
+            if response.headers.get('Content-Range', '').rpartition('/')[2] == str(offset):
+                logging.debug(f"{part.name} is already complete")
+                with open(part, 'rb') as f:
+                    while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                        sha256.update(chunk)
+                part.replace(target)
+                etag_file.unlink()
+                return sha256.hexdigest(), headers['If-Range']
+            logging.warning(f"Cannot resume {url} at byte {offset} (HTTP 416), downloading it again")
+            part.unlink()
+            etag_file.unlink()
+            return download_archive(session, url, target, etag)
+        response.raise_for_status()
+        if response.status_code == 304:
+            return None
+
+        if response.status_code == 206:
+            logging.debug(f"Resuming {url} at byte {offset}")
+            with open(part, 'rb') as f:
+                while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+                    sha256.update(chunk)
+            mode = 'ab'
+        else:
+            mode = 'wb'
+            if response.headers.get('ETag'):
+                etag_file.write_text(response.headers['ETag'], encoding='utf-8')
+        etag = response.headers.get('ETag')
+
+        with open(part, mode) as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                sha256.update(chunk)
+                f.write(chunk)
+
+    part.replace(target)
+    etag_file.unlink(missing_ok=True)
+    return sha256.hexdigest(), etag
+
+
+def extract_cldf(archive_path: Path, repo_dir: Path) -> Optional[str]:
+    """
+    Extract only the cldf/ directory of a repository tarball.
+
+    The previous cldf/ directory is replaced only after extraction succeeds.
+    Only regular files are extracted; links and paths escaping cldf/ are
+    skipped.
+
+    @param archive_path: Path to the .tar.gz archive
+    @type archive_path: Path
+    @param repo_dir: Repository directory (receives cldf/)
+    @type repo_dir: Path
+    @return: Commit SHA recorded in the archive (GitHub tarballs), or None
+    @rtype: Optional[str]
+    """
+    staging = repo_dir.with_name(repo_dir.name + '.partial')
+    shutil.rmtree(staging, ignore_errors=True)
+
+    with tarfile.open(archive_path, 'r:gz') as tar:
+        commit = tar.pax_headers.get('comment')
+        for member in tar:
+            parts = Path(member.name).parts
+            # Archives have a single top-level directory: <repo>-<ref>/cldf/...
+            if len(parts) < 3 or parts[1] != 'cldf' or '..' in parts or not member.isfile():
+                continue
+            source = tar.extractfile(member)
+            if source is None:
+                continue
+            destination = staging.joinpath(*parts[1:])
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            with source, open(destination, 'wb') as f:
+                shutil.copyfileobj(source, f, DOWNLOAD_CHUNK_SIZE)
+
+    if not (staging / 'cldf').exists():
+        shutil.rmtree(staging, ignore_errors=True)
+        raise ValueError(f"No cldf/ directory in {archive_path.name}")
+
+    repo_dir.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(repo_dir / 'cldf', ignore_errors=True)
+    (staging / 'cldf').rename(repo_dir / 'cldf')
+    shutil.rmtree(staging, ignore_errors=True)
+    return commit
+
+
+def read_archive_state(repo_dir: Path) -> Dict:
+    """
+    Read the archive download state of a repository directory.
+
+    @param repo_dir: Repository directory
+    @type repo_dir: Path
+    @return: Dictionary with archive_url, ref, sha256, commit and etag (empty if none)
+    @rtype: Dict
+    """
+    state_path = repo_dir / ARCHIVE_STATE_FILE
+    if not state_path.exists():
+        return {}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def fetch_archive(
+    repo: Dict,
+    lexibank_dir: Path,
+    session,
+    ref: str = LATEST_REF,
+    locked: Optional[Dict] = None
+) -> Tuple[bool, str]:
+    """
+    Download a repository tarball and extract its cldf/ directory.
+
+    No git is needed. With ref LATEST_REF, the repository's latest release
+    tag is downloaded (its branch tip if it has no release). The archive URL, its SHA-256, its ETag and the commit
+    (if the archive records one) are stored in <repo>/.archive.json; the
+    next download of the same URL is conditional on that ETag. With a
+    locked lockfile entry, the locked commit (or archive URL) is fetched and
+    the download is skipped if it is already in place.
+
+    @param repo: Repository dictionary from read_datasets
+    @type repo: Dict
+    @param lexibank_dir: Lexibank directory
+    @type lexibank_dir: Path
+    @param session: Pooled requests.Session
+    @param ref: Git ref to download (branch, tag or commit), or LATEST_REF
+    @type ref: str
+    @param locked: Lockfile entry to reproduce, if any
+    @type locked: Optional[Dict]
+    @return: Tuple of (success, action) where action is 'cloned', 'updated', 'unchanged', or 'failed'
+    @rtype: Tuple[bool, str]
+    """
+    name = repo['name']
+    repo_dir = lexibank_dir / name
+
+    if (repo_dir / '.git').exists():
+        logging.error(f"{name} is a git checkout; remove it or use --via git")
+        return (False, 'failed')
+
+    state = read_archive_state(repo_dir)
+    if locked:
+        ref = locked.get('commit') or locked.get('ref') or ref
+        if state and state.get('sha256') == locked.get('sha256') and state.get('commit') == locked.get('commit'):
+            logging.info(f"{name} is up to date at {(ref or '')[:10]}")
+            return (True, 'unchanged')
+
+    template = repo.get('archive_url') or ARCHIVE_URL_TEMPLATE
+    download_dir = lexibank_dir / '.downloads'
+    download_dir.mkdir(exist_ok=True)
+    archive_path = download_dir / f'{name}.tar.gz'
+
+    try:
+        if locked and not locked.get('commit') and locked.get('archive_url'):
+            url = locked['archive_url']
+        else:
+            if ref == LATEST_REF:
+                tag = resolve_latest_tag(session, repo['url'])
+                if tag is None:
+                    logging.warning(f"{name} has no release, downloading its default branch")
+                ref = tag or 'HEAD'
+            url = template.format(url=repo['url'].rstrip('/'), name=name, ref=ref)
+
+        logging.info(f"Downloading {name} from {url}")
+        previous_etag = state.get('etag') if state.get('archive_url') == url else None
+        downloaded = download_archive(session, url, archive_path, previous_etag)
+        if downloaded is None:
+            logging.info(f"{name} is up to date ({url} not modified)")
+            return (True, 'unchanged')
+        sha256, etag = downloaded
+        if locked and locked.get('sha256') and locked['sha256'] != sha256:
+            message = f"Checksum of {name} differs from lockfile ({sha256} != {locked['sha256']})"
+            if not locked.get('commit'):
+                logging.error(message)
+                archive_path.unlink(missing_ok=True)
+                return (False, 'failed')
+            logging.warning(message)
+
+        commit = extract_cldf(archive_path, repo_dir)
+        archive_path.unlink()
+        with open(repo_dir / ARCHIVE_STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'archive_url': url, 'ref': ref, 'sha256': sha256, 'commit': commit, 'etag': etag}, f, indent=2)
+            f.write('\n')
+
+        action = 'updated' if state else 'cloned'
+        logging.info(f"Successfully {action} {name} ({sha256[:12]})")
+        return (True, action)
+    except Exception as e:
+        logging.error(f"Failed to download {name}: {e}")
+        return (False, 'failed')
+
+
+def sync_repository(
+    repo: Dict,
+    lexibank_dir: Path,
+    sparse: bool = True,
+    expected_head: Optional[str] = None,
+    pin: bool = False,
+    mirror_dir: Optional[Path] = None,
+    session=None,
+    archive_ref: str = LATEST_REF,
+    locked: Optional[Dict] = None
+) -> Tuple[str, str, float]:
+    """
+    Clone or update a repository and time it, never raising.
+
+    Safe to run from worker threads: each call only touches its own
+    repository directory.
+
+    @param repo: Repository dictionary from read_datasets
+    @type repo: Dict
+    @param lexibank_dir: Lexibank directory
+    @type lexibank_dir: Path
+    @param sparse: If True, new clones check out only cldf/
+    @type sparse: bool
+    @param expected_head: Commit the checkout should end up at, if known
+    @type expected_head: Optional[str]
+    @param pin: If True, check out expected_head instead of pulling
+    @type pin: bool
+    @param mirror_dir: Directory of shared bare mirrors, if used
+    @type mirror_dir: Optional[Path]
+    @param session: requests.Session; if given, the tarball is downloaded instead of using git
+    @param archive_ref: Git ref to download in archive mode, or LATEST_REF
+    @type archive_ref: str
+    @param locked: Lockfile entry to reproduce in archive mode, if any
+    @type locked: Optional[Dict]
+    @return: Tuple of (name, action, seconds)
+    @rtype: Tuple[str, str, float]
+    """
+    start = time.perf_counter()
+    try:
+        if session is not None:
+            _, action = fetch_archive(repo, lexibank_dir, session, archive_ref, locked)
+        else:
+            _, action = process_repository(
+                repo['name'], repo['url'], lexibank_dir, sparse, expected_head, pin, mirror_dir
+            )
+    except Exception as e:
+        logging.error(f"Unexpected error processing {repo['name']}: {e}")
+        action = 'failed'
+    elapsed = time.perf_counter() - start
+    logging.debug(f"{repo['name']}: {action} in {elapsed:.1f}s")
+    return repo['name'], action, elapsed
+
+
+def read_lockfile(lock_path: Path) -> Dict[str, Dict]:
+    """
+    Read pinned commits from a lockfile.
+
+    @param lock_path: Path to lexibank.lock
+    @type lock_path: Path
+    @return: Dictionary of name -> {'url': ..., 'commit': ...} (empty if missing)
+    @rtype: Dict[str, Dict]
+    """
+    if not lock_path.exists():
+        return {}
+    with open(lock_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_lockfile(lock_path: Path, entries: Dict[str, Dict]) -> None:
+    """
+    Write pinned commits to a lockfile, sorted by name.
+
+    @param lock_path: Path to lexibank.lock
+    @type lock_path: Path
+    @param entries: Dictionary of name -> {'url': ..., 'commit': ...}
+    @type entries: Dict[str, Dict]
+    """
+    with open(lock_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(entries.items())), f, indent=2)
+        f.write('\n')
+
+
+def update_lock_entries(
+    repositories: List[Dict],
+    failed: List[str],
+    lock_entries: Dict[str, Dict],
+    lexibank_dir: Path,
+    via: str = 'git'
+) -> Tuple[Dict[str, Dict], List[str]]:
+    """
+    Record the synced commit of each repository and detect changes.
+
+    Failed repositories keep their previous entry.
+
+    @param repositories: Repository dictionaries that were synced
+    @type repositories: List[Dict]
+    @param failed: Names of repositories that failed
+    @type failed: List[str]
+    @param lock_entries: Previous lockfile entries
+    @type lock_entries: Dict[str, Dict]
+    @param lexibank_dir: Lexibank directory
+    @type lexibank_dir: Path
+    @param via: Sync mode ('git' or 'archive')
+    @type via: str
+    @return: Tuple of (new lockfile entries, sorted names of changed datasets)
+    @rtype: Tuple[Dict[str, Dict], List[str]]
+    """
+    changed = []
+    new_entries = dict(lock_entries)
+    for repo in repositories:
+        if repo['name'] in failed:
+            continue
+        previous = lock_entries.get(repo['name'], {})
+        if via == 'archive':
+            state = read_archive_state(lexibank_dir / repo['name'])
+            if not state:
+                continue
+            entry = {'url': repo['url'], 'archive_url': state['archive_url'], 'ref': state.get('ref'),
+                     'sha256': state['sha256'], 'commit': state['commit']}
+            # Tarball bytes are not guaranteed stable, so compare commits when known
+            moved = (entry['commit'] != previous.get('commit') if entry['commit']
+                     else entry['sha256'] != previous.get('sha256'))
+        else:
+            commit = get_local_head(lexibank_dir / repo['name'])
+            if commit is None:
+                continue
+            entry = {'url': repo['url'], 'commit': commit}
+            moved = commit != previous.get('commit')
+        if moved:
+            changed.append(repo['name'])
+        new_entries[repo['name']] = entry
+
+    return new_entries, sorted(changed)
+
+
 def read_datasets(csv_path: Path, core_only: bool = False, corecog_only: bool = False) -> list:
     """
     Read repository information from CSV file.
@@ -149,6 +831,7 @@ def read_datasets(csv_path: Path, core_only: bool = False, corecog_only: bool =
                     repositories.append({
                         'name': name,
                         'url': url,
+                        'archive_url': (row.get('ARCHIVE_URL') or '').strip() or None,
                         'is_core': is_core,
                         'is_corecog': is_corecog
                     })
@@ -209,6 +892,56 @@ def main() -> None:
         action='store_true',
         help='Clone only CoreCog datasets (58 datasets with expert cognate judgments)'
     )
+    parser.add_argument(
+        '--jobs',
+        '-j',
+        type=int,
+        default=1,
+        help='Number of repositories to clone/update in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--full-checkout',
+        action='store_true',
+        help='Clone complete working trees instead of only cldf/ (default: sparse cldf/ checkout)'
+    )
+    parser.add_argument(
+        '--lock',
+        type=Path,
+        default=LOCK_FILE,
+        help=f'Lockfile with the commit of each repository (default: {LOCK_FILE})'
+    )
+    parser.add_argument(
+        '--locked',
+        action='store_true',
+        help='Check out exactly the commits in the lockfile instead of the latest upstream'
+    )
+    parser.add_argument(
+        '--via',
+        choices=['git', 'archive'],
+        default='git',
+        help='Sync with git, or download tarballs and extract only cldf/ (default: git)'
+    )
+    parser.add_argument(
+        '--archive-ref',
+        default=LATEST_REF,
+        help=f'Branch, tag or commit to download for every repository with --via archive '
+             f'(default: {LATEST_REF}, each repository\'s latest release tag)'
+    )
+    parser.add_argument(
+        '--mirror-dir',
+        type=Path,
+        help='Shared directory of bare mirrors; checkouts are cloned from it with --shared'
+    )
+    parser.add_argument(
+        '--changed-file',
+        type=Path,
+        help='Write the names of datasets whose commit changed to this file (one per line)'
+    )
+    parser.add_argument(
+        '--progress-file',
+        type=Path,
+        help='Write progress (fraction, repositories/s, ETA) as JSON to this file'
+    )
 
     args = parser.parse_args()
 
@@ -235,17 +968,67 @@ def main() -> None:
     # Create lexibank directory if it doesn't exist
     args.output_dir.mkdir(exist_ok=True)
     logging.info(f"Using output directory: {args.output_dir}")
+    if args.mirror_dir:
+        args.mirror_dir.mkdir(parents=True, exist_ok=True)
+        logging.info(f"Using mirror directory: {args.mirror_dir}")
 
-    # Process each repository
-    stats = {'cloned': 0, 'updated': 0, 'failed': 0}
+    # Determine the commit each repository should end up at
+    lock_entries = read_lockfile(args.lock)
+    stats = {'cloned': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+    failed = []
 
-    for repo in repositories:
-        success, action = process_repository(
-            repo['name'],
-            repo['url'],
-            args.output_dir
-        )
-        stats[action] += 1
+    if args.locked:
+        logging.info(f"Checking out locked commits from {args.lock}")
+        unlocked = [repo['name'] for repo in repositories if repo['name'] not in lock_entries]
+        for name in unlocked:
+            logging.error(f"No locked commit for {name} in {args.lock}")
+        stats['failed'] += len(unlocked)
+        failed.extend(unlocked)
+        repositories = [repo for repo in repositories if repo['name'] in lock_entries]
+        heads = {repo['name']: lock_entries[repo['name']]['commit'] for repo in repositories}
+    elif args.via == 'git':
+        heads = resolve_remote_heads(repositories, max(args.jobs, LS_REMOTE_WORKERS))
+    else:
+        heads = {}
+
+    session = make_session(max(1, args.jobs)) if args.via == 'archive' else None
+
+    # Process repositories, in parallel if requested
+    timings: Dict[str, float] = {}
+    jobs = max(1, args.jobs)
+    start = time.perf_counter()
+    progress = ProgressTracker('sync', len(repositories), len(repositories), unit='repositories',
+                               progress_file=args.progress_file, log=logging.info)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(sync_repository, repo, args.output_dir, not args.full_checkout,
+                            heads.get(repo['name']), args.locked, args.mirror_dir,
+                            session, args.archive_ref,
+                            lock_entries.get(repo['name']) if args.locked else None)
+            for repo in repositories
+        ]
+        for future in as_completed(futures):
+            name, action, elapsed = future.result()
+            stats[action] += 1
+            timings[name] = elapsed
+            if action == 'failed':
+                failed.append(name)
+            progress.advance(1, name)
+
+    progress.finish('failed' if failed else 'done')
+    wall_time = time.perf_counter() - start
+
+    # Record the resolved commits; failed repositories keep their previous entry
+    new_entries, changed = update_lock_entries(repositories, failed, lock_entries, args.output_dir, args.via)
+
+    if not args.locked:
+        write_lockfile(args.lock, new_entries)
+        logging.info(f"Wrote {args.lock}")
+
+    if args.changed_file:
+        args.changed_file.write_text(''.join(f"{name}\n" for name in changed), encoding='utf-8')
+        logging.info(f"Wrote {len(changed)} changed datasets to {args.changed_file}")
 
     # Print summary
     logging.info("=" * 60)
@@ -254,7 +1037,17 @@ def main() -> None:
     logging.info(f"Total repositories: {len(repositories)}")
     logging.info(f"Cloned: {stats['cloned']}")
     logging.info(f"Updated: {stats['updated']}")
+    logging.info(f"Unchanged: {stats['unchanged']}")
     logging.info(f"Failed: {stats['failed']}")
+    logging.info(f"Changed since {args.lock.name}: {len(changed)}")
+    logging.info(f"Wall time: {wall_time:.1f}s with {jobs} job(s) "
+                 f"(sum of per-repository times: {sum(timings.values()):.1f}s)")
+
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:5]
+    if slowest:
+        logging.info("Slowest: " + ", ".join(f"{name} ({elapsed:.1f}s)" for name, elapsed in slowest))
+    if failed:
+        logging.info(f"Failed repositories: {', '.join(sorted(failed))}")
 
     if stats['failed'] > 0:
         sys.exit(1)
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+
+"""
+Collection Version Comparison
+
+Compares two versions of a collection (e.g. output/full and an extracted
+release archive) table by table and reports, as JSON, which datasets were
+added, removed or changed, and how many rows were added, removed or changed
+in each, with per-column change counts.
+
+Both versions are streamed one dataset at a time (the merger writes the
+tables sorted by dataset), so memory stays bounded by the largest dataset.
+Rows are matched by their ID (metadata.csv: by Dataset). When both versions
+have a manifest with per-dataset blocks (see manifest.py), datasets whose
+blocks have the same SHA256 are counted as unchanged without being parsed,
+and only the changed blocks are read.
+
+Usage:
+    python diff_collections.py extracted/arcaverborum-A-full-20251001 output/full
+    python diff_collections.py old/full output/full --output diff.json
+    python diff_collections.py old/full output/full \\
+        --old-manifest releases/arcaverborum.A.full.20251001.manifest.json
+"""
+
+import argparse
+import csv
+import functools
+import io
+import itertools
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from manifest import load_manifest
+
+# === CONFIGURATION ===
+# Table -> column identifying a row within its dataset
+TABLE_KEYS = {
+    'forms.csv': 'ID',
+    'languages.csv': 'ID',
+    'parameters.csv': 'ID',
+    'cognates.csv': 'ID',
+    'cognatesets.csv': 'ID',
+    'metadata.csv': 'Dataset',
+}
+DATASET_COLUMN = 'Dataset'
+
+# CSV fields can be larger than the csv module's default limit (e.g., long alignments)
+csv.field_size_limit(sys.maxsize)
+
+# === LOGGING SETUP ===
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# A dataset of one version: (name, block SHA256 or None, function returning its rows)
+DatasetRows = Tuple[str, Optional[str], Callable[[], List[list]]]
+
+
+# === READING ===
+
+def read_header(path: Path) -> List[str]:
+    """Read the header row of a CSV file."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def stream_datasets(path: Path, header: List[str]) -> Iterator[DatasetRows]:
+    """
+    Read a table one dataset at a time.
+
+    @param path: CSV file, sorted by dataset
+    @param header: Its header row
+    @return: Iterator of (dataset, None, rows) in file order
+    """
+    column = header.index(DATASET_COLUMN)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for dataset, group in itertools.groupby(reader, key=lambda row: row[column]):
+            yield dataset, None, functools.partial(list, list(group))
+
+
+def block_datasets(path: Path, blocks: List[list]) -> Iterator[DatasetRows]:
+    """
+    List a table's datasets from its manifest blocks; rows are read only on demand.
+
+    @param path: CSV file
+    @param blocks: [dataset, offset, size, sha256] for each dataset, in file order
+    @return: Iterator of (dataset, sha256, rows) in file order
+    """
+    def load(offset: int, size: int) -> List[list]:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size).decode('utf-8')
+        return list(csv.reader(io.StringIO(data, newline='')))
+
+    for dataset, offset, size, sha256 in blocks:
+        # Datasets without rows in this table have empty blocks
+        if size:
+            yield dataset, sha256, functools.partial(load, offset, size)
+
+
+def manifest_blocks(directory: Path, manifest_path: Optional[Path]) -> Dict[str, dict]:
+    """
+    Manifest entries of a collection that can be trusted for its files.
+
+    @param directory: Collection directory
+    @param manifest_path: Manifest saved with a release (trusted while the file
+                          sizes match), or None to use the directory's manifest.json
+    @return: Dictionary of filename -> manifest entry
+    """
+    if manifest_path is None:
+        return load_manifest(directory)
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        files = json.load(f)['files']
+    return {
+        filename: entry for filename, entry in files.items()
+        if (directory / filename).exists() and (directory / filename).stat().st_size == entry['size']
+    }
+
+
+# === COMPARISON ===
+
+def new_counts() -> dict:
+    """Empty row counts of a dataset or table."""
+    return {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0}
+
+
+def diff_rows(old_rows: List[list], new_rows: List[list], key: str,
+              old_header: List[str], new_header: List[str]) -> dict:
+    """
+    Compare the rows of one dataset in two versions.
+
+    @param old_rows: Rows of the old version
+    @param new_rows: Rows of the new version
+    @param key: Column identifying a row
+    @param old_header: Header of the old table
+    @param new_header: Header of the new table
+    @return: Row counts and per-column change counts ("columns")
+    """
+    old_key, new_key = old_header.index(key), new_header.index(key)
+    # Columns in both versions, as (name, old index, new index)
+    common = [(name, old_header.index(name), i) for i, name in enumerate(new_header) if name in old_header]
+    same_layout = old_header == new_header
+
+    counts = new_counts()
+    columns: Dict[str, int] = {}
+    old_by_key = {row[old_key]: row for row in old_rows}
+    for row in new_rows:
+        old = old_by_key.pop(row[new_key], None)
+        if old is None:
+            counts['added'] += 1
+        elif same_layout and old == row:
+            counts['unchanged'] += 1
+        else:
+            changed = [name for name, i, j in common if old[i] != row[j]]
+            if changed:
+                counts['changed'] += 1
+                for name in changed:
+                    columns[name] = columns.get(name, 0) + 1
+            else:
+                counts['unchanged'] += 1
+    counts['removed'] = len(old_by_key)
+    counts['columns'] = columns
+    return counts
+
+
+def join_datasets(old: Iterator[DatasetRows], new: Iterator[DatasetRows], path: Path):
+    """
+    Pair up the datasets of two versions, both in sorted order.
+
+    @return: Iterator of (dataset, old entry or None, new entry or None)
+    """
+    def checked(entries: Iterator[DatasetRows], label: str):
+        previous = None
+        for entry in entries:
+            if previous is not None and entry[0] <= previous:
+                logger.error(f"{path.name} ({label}) is not sorted by dataset: {entry[0]} after {previous}")
+                sys.exit(1)
+            previous = entry[0]
+            yield entry
+
+    old, new = checked(old, 'old'), checked(new, 'new')
+    old_entry, new_entry = next(old, None), next(new, None)
+    while old_entry is not None or new_entry is not None:
+        if old_entry is not None and (new_entry is None or old_entry[0] < new_entry[0]):
+            yield old_entry[0], old_entry, None
+            old_entry = next(old, None)
+        elif new_entry is not None and (old_entry is None or new_entry[0] < old_entry[0]):
+            yield new_entry[0], None, new_entry
+            new_entry = next(new, None)
+        elif old_entry is not None and new_entry is not None:
+            yield old_entry[0], old_entry, new_entry
+            old_entry, new_entry = next(old, None), next(new, None)
+
+
+def diff_table(filename: str, old_dir: Path, new_dir: Path,
+               old_manifest: Dict[str, dict], new_manifest: Dict[str, dict]) -> Tuple[dict, set, set]:
+    """
+    Compare one table of two collection versions, dataset by dataset.
+
+    @param filename: Table file name (e.g., "forms.csv")
+    @param old_dir: Old collection directory
+    @param new_dir: New collection directory
+    @param old_manifest: Trusted manifest entries of the old version
+    @param new_manifest: Trusted manifest entries of the new version
+    @return: Tuple of (column changes, row totals, per-column change counts and
+             the datasets that differ; names of the old datasets; names of the new datasets)
+    """
+    key = TABLE_KEYS[filename]
+    old_path, new_path = old_dir / filename, new_dir / filename
+    old_header, new_header = read_header(old_path), read_header(new_path)
+    for header, path in [(old_header, old_path), (new_header, new_path)]:
+        if key not in header or DATASET_COLUMN not in header:
+            logger.error(f"{path} has no {key} or {DATASET_COLUMN} column")
+            sys.exit(1)
+
+    old_blocks = old_manifest.get(filename, {}).get('blocks')
+    new_blocks = new_manifest.get(filename, {}).get('blocks')
+    use_blocks = old_blocks is not None and new_blocks is not None
+    if old_blocks is not None and new_blocks is not None:
+        old_datasets = block_datasets(old_path, old_blocks)
+        new_datasets = block_datasets(new_path, new_blocks)
+    else:
+        old_datasets = stream_datasets(old_path, old_header)
+        new_datasets = stream_datasets(new_path, new_header)
+
+    totals = new_counts()
+    columns: Dict[str, int] = {}
+    datasets = {}
+    unchanged_datasets = 0
+    old_names, new_names = set(), set()
+    for dataset, old, new in join_datasets(old_datasets, new_datasets, new_path):
+        if old is not None:
+            old_names.add(dataset)
+        if new is not None:
+            new_names.add(dataset)
+        if old is not None and new is not None and old[1] is not None and old[1] == new[1]:
+            unchanged_datasets += 1
+            continue
+
+        if old is None:
+            counts = {'status': 'added', **new_counts(), 'added': len(new[2]())}
+        elif new is None:
+            counts = {'status': 'removed', **new_counts(), 'removed': len(old[2]())}
+        else:
+            counts = diff_rows(old[2](), new[2](), key, old_header, new_header)
+            if not (counts['added'] or counts['removed'] or counts['changed']):
+                totals['unchanged'] += counts['unchanged']
+                unchanged_datasets += 1
+                continue
+            counts = {'status': 'changed', **counts}
+
+        for name in totals:
+            totals[name] += counts[name]
+        for name, n in counts.get('columns', {}).items():
+            columns[name] = columns.get(name, 0) + n
+        datasets[dataset] = counts
+
+    if use_blocks:
+        # Datasets skipped by their hash are not parsed; every other new row is accounted for
+        totals['unchanged'] = new_manifest[filename]['rows'] - totals['added'] - totals['changed']
+
+    result = {
+        'columns_added': [name for name in new_header if name not in old_header],
+        'columns_removed': [name for name in old_header if name not in new_header],
+        'used_manifest': use_blocks,
+        'rows': totals,
+        'column_changes': dict(sorted(columns.items(), key=lambda item: (-item[1], item[0]))),
+        'unchanged_datasets': unchanged_datasets,
+        'datasets': datasets,
+    }
+    return result, old_names, new_names
+
+
+def summarize_datasets(tables: Dict[str, dict], old_names: set, new_names: set) -> dict:
+    """
+    Datasets added, removed or changed across all tables.
+
+    A dataset that only gains its first cognates is changed, not added, so
+    added and removed are decided by presence in any table of each version.
+    """
+    differing = {dataset for table in tables.values() for dataset in table['datasets']}
+    return {
+        'added': sorted(new_names - old_names),
+        'removed': sorted(old_names - new_names),
+        'changed': sorted(differing & old_names & new_names),
+    }
+
+
+def main():
+    """Main entry point - compares two collection versions."""
+    parser = argparse.ArgumentParser(
+        description='Compare two versions of an Arca Verborum collection, dataset by dataset',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        'old',
+        type=Path,
+        help='Old collection directory (e.g., an extracted release archive)'
+    )
+    parser.add_argument(
+        'new',
+        type=Path,
+        help='New collection directory (e.g., output/full)'
+    )
+    parser.add_argument(
+        '--tables',
+        nargs='+',
+        choices=list(TABLE_KEYS),
+        help='Tables to compare (default: all tables present in both versions)'
+    )
+    parser.add_argument(
+        '--old-manifest',
+        type=Path,
+        help='Manifest saved with the old release (releases/*.manifest.json), '
+             'to skip unchanged datasets of an extracted archive'
+    )
+    parser.add_argument(
+        '--new-manifest',
+        type=Path,
+        help='Manifest saved with the new release, if NEW is an extracted archive'
+    )
+    parser.add_argument(
+        '--no-manifest',
+        action='store_true',
+        help='Parse every dataset instead of skipping those with unchanged manifest blocks'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Write the JSON report to this file (default: stdout)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    for directory in [args.old, args.new]:
+        if not directory.is_dir():
+            logger.error(f"Not a directory: {directory}")
+            sys.exit(1)
+
+    tables = args.tables or [
+        filename for filename in TABLE_KEYS
+        if (args.old / filename).exists() and (args.new / filename).exists()
+    ]
+    if args.no_manifest:
+        old_manifest, new_manifest = {}, {}
+    else:
+        old_manifest = manifest_blocks(args.old, args.old_manifest)
+        new_manifest = manifest_blocks(args.new, args.new_manifest)
+
+    start = time.perf_counter()
+    results = {}
+    old_names, new_names = set(), set()
+    for filename in tables:
+        for directory in [args.old, args.new]:
+            if not (directory / filename).exists():
+                logger.error(f"{filename} not found in {directory}")
+                sys.exit(1)
+        table_start = time.perf_counter()
+        results[filename], old_datasets, new_datasets = diff_table(filename, args.old, args.new,
+                                                                   old_manifest, new_manifest)
+        old_names |= old_datasets
+        new_names |= new_datasets
+        rows = results[filename]['rows']
+        logger.info(f"{filename}: {rows['added']:,} added, {rows['removed']:,} removed, "
+                    f"{rows['changed']:,} changed rows in {len(results[filename]['datasets'])} datasets "
+                    f"({time.perf_counter() - table_start:.1f}s"
+                    f"{', using manifest' if results[filename]['used_manifest'] else ''})")
+
+    report = {
+        'old': str(args.old),
+        'new': str(args.new),
+        'datasets': summarize_datasets(results, old_names, new_names),
+        'tables': results,
+    }
+
+    elapsed = time.perf_counter() - start
+    logger.info("=" * 60)
+    logger.info("SUMMARY")
+    logger.info("=" * 60)
+    for status, datasets in report['datasets'].items():
+        logger.info(f"Datasets {status}: {len(datasets)}" + (f" ({', '.join(datasets)})" if datasets else ""))
+    logger.info(f"Elapsed: {elapsed:.1f}s")
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n', encoding='utf-8')
+        logger.info(f"Output: {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+
+"""
+Cognate Character Matrix Exporter
+
+Builds binary presence/absence matrices (languages x cognate sets) from a
+collection's forms.csv, one per dataset or per Glottolog family, and writes
+them as NEXUS (for BEAST, MrBayes, etc.) and as scipy.sparse .npz files.
+
+A language with no form for any concept of a cognate set is coded as
+missing (?) in the NEXUS matrix, not as absent (0).
+
+Usage:
+    python export_characters.py output/corecog
+    python export_characters.py output/full --by family --jobs 8 --output characters/
+"""
+
+import argparse
+import logging
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import scipy.sparse as sp
+except ImportError:
+    print("Error: scipy not installed. Run: pip install scipy>=1.10")
+    sys.exit(1)
+
+# === CONFIGURATION ===
+OUTPUT_DIR = Path('characters')
+FORMS_USECOLS = ['Dataset', 'Language_ID', 'Family', 'Parameter_ID', 'Cognacy']
+CHUNK_SIZE = 200_000
+
+# === LOGGING SETUP ===
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+
+# === HELPER FUNCTIONS ===
+
+def safe_filename(name: str) -> str:
+    """Turn a dataset or family name into a safe file name stem."""
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or 'unnamed'
+
+
+def nexus_label(label: str) -> str:
+    """Quote a taxon or character label for NEXUS."""
+    return "'" + label.replace("'", "''") + "'"
+
+
+def codes_for(values: pd.Series, labels: pd.Index) -> np.ndarray:
+    """Map values to their positions in a sorted label index."""
+    return labels.get_indexer(values)
+
+
+# === MATRIX CONSTRUCTION ===
+
+class CharacterMatrices(NamedTuple):
+    """Character matrices of one group: rows are taxa, columns are characters (cognate sets)."""
+    taxa: List[str]
+    characters: List[str]
+    presence: sp.csr_matrix  # 1 where a taxon has a form in the set
+    attested: sp.csr_matrix  # 1 where a taxon has a form for one of the set's concepts
+
+
+def build_matrices(forms: pd.DataFrame) -> Optional[CharacterMatrices]:
+    """
+    Build presence and attestation matrices for a group of forms.
+
+    @param forms: Forms with Language_ID, Parameter_ID and Cognacy
+    @return: The matrices, or None if the group has no cognate sets
+    """
+    forms = forms[forms['Language_ID'].notna()]
+
+    members = forms[['Language_ID', 'Parameter_ID', 'Cognacy']].copy()
+    members['Cognacy'] = members['Cognacy'].astype('string').str.split(';')
+    members = members.explode('Cognacy')
+    members = members[members['Cognacy'].notna() & (members['Cognacy'] != '')]
+
+    if members.empty:
+        return None
+
+    # Languages without any cognate judgment would be all-missing rows
+    forms = forms[forms['Language_ID'].isin(members['Language_ID'].unique())]
+
+    taxa = pd.Index(sorted(forms['Language_ID'].unique()))
+    characters = pd.Index(sorted(members['Cognacy'].unique()))
+    concepts = pd.Index(sorted(forms['Parameter_ID'].dropna().unique()))
+
+    def binary(rows: np.ndarray, cols: np.ndarray, shape) -> sp.csr_matrix:
+        matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=shape)
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    presence = binary(
+        codes_for(members['Language_ID'], taxa),
+        codes_for(members['Cognacy'], characters),
+        (len(taxa), len(characters))
+    )
+
+    # A language is attested for a set if it has any form for one of the set's concepts
+    with_concept = forms[forms['Parameter_ID'].notna()]
+    language_concepts = binary(
+        codes_for(with_concept['Language_ID'], taxa),
+        codes_for(with_concept['Parameter_ID'], concepts),
+        (len(taxa), len(concepts))
+    )
+    members = members[members['Parameter_ID'].notna()]
+    character_concepts = binary(
+        codes_for(members['Cognacy'], characters),
+        codes_for(members['Parameter_ID'], concepts),
+        (len(characters), len(concepts))
+    )
+    attested = (language_concepts @ character_concepts.T).tocsr()
+    attested.data[:] = 1
+    attested = (attested + presence).tocsr()
+    attested.data[:] = 1
+
+    return CharacterMatrices(list(taxa), list(characters), presence, attested)
+
+
+def write_nexus(path: Path, name: str, taxa: List[str], characters: List[str],
+                presence: sp.csr_matrix, attested: sp.csr_matrix):
+    """
+    Write a binary character matrix as NEXUS.
+
+    @param path: Output path
+    @param name: Group name, written as a comment
+    @param taxa: Taxon labels (rows)
+    @param characters: Character labels (columns)
+    @param presence: Presence matrix (1 = language has a form in the set)
+    @param attested: Attestation matrix (1 = state known, 0 = missing)
+    """
+    width = max(len(nexus_label(t)) for t in taxa)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('#NEXUS\n')
+        f.write(f'[Cognate characters for {name}, generated by export_characters.py]\n\n')
+
+        f.write('BEGIN TAXA;\n')
+        f.write(f'    DIMENSIONS NTAX={len(taxa)};\n')
+        f.write('    TAXLABELS\n')
+        for taxon in taxa:
+            f.write(f'        {nexus_label(taxon)}\n')
+        f.write('    ;\nEND;\n\n')
+
+        f.write('BEGIN CHARACTERS;\n')
+        f.write(f'    DIMENSIONS NCHAR={len(characters)};\n')
+        f.write('    FORMAT DATATYPE=STANDARD MISSING=? GAP=- SYMBOLS="01";\n')
+        f.write('    CHARSTATELABELS\n')
+        labels = [f'        {i} {nexus_label(c)}' for i, c in enumerate(characters, 1)]
+        f.write(',\n'.join(labels) + '\n    ;\n')
+        f.write('    MATRIX\n')
+
+        for i, taxon in enumerate(taxa):
+            row = np.full(len(characters), ord('?'), dtype=np.uint8)
+            row[attested.indices[attested.indptr[i]:attested.indptr[i + 1]]] = ord('0')
+            row[presence.indices[presence.indptr[i]:presence.indptr[i + 1]]] = ord('1')
+            f.write(f'        {nexus_label(taxon).ljust(width)} {row.tobytes().decode("ascii")}\n')
+
+        f.write('    ;\nEND;\n')
+
+
+def export_group(name: str, forms: pd.DataFrame, output_dir: Path) -> Optional[dict]:
+    """
+    Build and write the character matrix for one dataset or family.
+
+    Runs in a worker process.
+
+    @param name: Dataset or family name
+    @param forms: Forms of the group
+    @param output_dir: Output directory
+    @return: Summary dict, or None if the group has no cognate sets
+    """
+    start = time.perf_counter()
+
+    matrices = build_matrices(forms)
+    if matrices is None:
+        return None
+
+    stem = safe_filename(name)
+    sp.save_npz(output_dir / f'{stem}.npz', matrices.presence, compressed=True)
+    (output_dir / f'{stem}.taxa.txt').write_text('\n'.join(matrices.taxa) + '\n', encoding='utf-8')
+    (output_dir / f'{stem}.characters.txt').write_text('\n'.join(matrices.characters) + '\n', encoding='utf-8')
+    write_nexus(output_dir / f'{stem}.nex', name, matrices.taxa, matrices.characters,
+                matrices.presence, matrices.attested)
+
+    return {
+        'name': name,
+        'taxa': len(matrices.taxa),
+        'characters': len(matrices.characters),
+        'present': int(matrices.presence.nnz),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+# === STREAMING ===
+
+def iter_dataset_groups(forms_path: Path):
+    """
+    Yield (dataset, forms) pairs by streaming forms.csv in chunks.
+
+    forms.csv is sorted by Dataset, so each dataset is complete as soon as
+    the next one starts and only one dataset is held in memory.
+    """
+    current: Optional[str] = None
+    pending: List[pd.DataFrame] = []
+
+    reader = pd.read_csv(forms_path, usecols=FORMS_USECOLS, dtype=str, chunksize=CHUNK_SIZE, encoding='utf-8',
+                         keep_default_na=False, na_values=[''])
+    for chunk in reader:
+        for dataset, group in chunk.groupby('Dataset', sort=False):
+            if dataset != current and pending:
+                yield current, pd.concat(pending, ignore_index=True)
+                pending = []
+            current = dataset
+            pending.append(group)
+
+    if pending:
+        yield current, pd.concat(pending, ignore_index=True)
+
+
+def iter_family_groups(forms_path: Path):
+    """
+    Yield (family, forms) pairs.
+
+    Families span datasets, so the (few, categorical) columns needed are
+    loaded once and grouped; forms without a family are skipped.
+    """
+    dtypes = {'Dataset': 'category', 'Language_ID': 'category', 'Family': 'category',
+              'Parameter_ID': 'category', 'Cognacy': 'string'}
+    forms = pd.read_csv(forms_path, usecols=FORMS_USECOLS, dtype=dtypes, encoding='utf-8',
+                        keep_default_na=False, na_values=[''])
+
+    missing = forms['Family'].isna().sum()
+    if missing:
+        logger.info(f"Skipping {missing:,} forms without a Family")
+
+    for family, group in forms.groupby('Family', sort=True, observed=True):
+        # 'string' keeps missing values as <NA> (str would turn them into "nan")
+        group = group.astype({'Language_ID': 'string', 'Parameter_ID': 'string'})
+        yield family, group
+
+
+# === MAIN ===
+
+def main():
+    """Main entry point - exports one character matrix per dataset or family."""
+    parser = argparse.ArgumentParser(
+        description='Export cognate presence/absence matrices as NEXUS and scipy.sparse .npz',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        'collection',
+        type=Path,
+        help='Collection directory containing forms.csv (e.g., output/corecog)'
+    )
+    parser.add_argument(
+        '--by',
+        choices=['dataset', 'family'],
+        default='dataset',
+        help='Build one matrix per dataset or per Glottolog family (default: dataset)'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=OUTPUT_DIR,
+        help=f'Output directory (default: {OUTPUT_DIR})'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of worker processes (default: 1)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    forms_path = args.collection / 'forms.csv'
+    if not forms_path.exists():
+        logger.error(f"forms.csv not found in {args.collection}")
+        sys.exit(1)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    jobs = max(1, args.jobs)
+    groups = iter_dataset_groups(forms_path) if args.by == 'dataset' else iter_family_groups(forms_path)
+
+    logger.info(f"Exporting character matrices by {args.by} from {forms_path} with {jobs} worker(s)")
+    start = time.perf_counter()
+
+    results = []
+    failed = []
+    # Keep at most 2 groups per worker in flight, so memory stays bounded
+    in_flight: List[tuple[str, Future]] = []
+
+    def collect(name: str, future: Future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Failed to export {name}: {e}")
+            failed.append(name)
+            return
+        if result is None:
+            logger.debug(f"Skipped {name}: no cognate sets")
+            return
+        logger.info(f"Exported {name}: {result['taxa']} taxa x {result['characters']} characters "
+                    f"({result['seconds']:.1f}s)")
+        results.append(result)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for name, group in groups:
+            in_flight.append((name, executor.submit(export_group, name, group, args.output)))
+            if len(in_flight) >= 2 * jobs:
+                collect(*in_flight.pop(0))
+        for name, future in in_flight:
+            collect(name, future)
+
+    elapsed = time.perf_counter() - start
+
+    logger.info("=" * 60)
+    logger.info("SUMMARY")
+    logger.info("=" * 60)
+    logger.info(f"Matrices: {len(results)}")
+    logger.info(f"Taxa: {sum(r['taxa'] for r in results):,}")
+    logger.info(f"Characters: {sum(r['characters'] for r in results):,}")
+    logger.info(f"Elapsed: {elapsed:.1f}s")
+    logger.info(f"Output: {args.output}")
+
+    if failed:
+        logger.warning(f"Failed {len(failed)} groups: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
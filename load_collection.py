@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""
+Arca Verborum Collection Loader
+
+Loads forms from a collection directory (e.g. output/core/ or an extracted
+release archive). When the collection ships forms_index.npz, lookups by
+Glottocode, language family, Concepticon gloss or cognate set read only the
+matching rows of forms.csv instead of scanning the whole file. Low-cardinality
+columns (Dataset, Family, Macroarea) are loaded as categoricals.
+
+Usage:
+    python load_collection.py output/core --glottocode stan1295
+    python load_collection.py output/full --family Indo-European
+    python load_collection.py output/full --concept HAND --output hand.csv
+    python load_collection.py output/corecog --cognateset iecor_1234
+"""
+
+import argparse
+import io
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# === LOGGING SETUP ===
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# Low-cardinality forms columns, loaded as categoricals for fast equality filters
+CATEGORICAL_COLUMNS = ['Dataset', 'Family', 'Macroarea']
+
+# Filter name -> forms.csv column, for collections without an index
+FILTER_COLUMNS = {
+    'glottocode': 'Glottocode',
+    'family': 'Family',
+    'concept': 'Concepticon_Gloss',
+}
+
+
+class FormsIndex:
+    """
+    Inverted indexes over a collection's forms.csv, as written by the merger.
+
+    Each index maps a key to the sorted row numbers of the forms carrying it;
+    row_offsets maps row numbers to byte offsets in forms.csv.
+    """
+
+    def __init__(self, path: Path):
+        with np.load(path, allow_pickle=False) as data:
+            self.arrays: Dict[str, np.ndarray] = {name: data[name] for name in data.files}
+
+        self.row_offsets = self.arrays['row_offsets']
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the available indexes."""
+        return sorted(name[:-len('_keys')] for name in self.arrays if name.endswith('_keys'))
+
+    def keys(self, name: str) -> List[str]:
+        """
+        List all keys of an index.
+
+        @param name: Index name (e.g., "glottocode")
+        @return: Sorted list of keys
+        """
+        return [key.decode('utf-8') for key in self.arrays[f'{name}_keys']]
+
+    def rows(self, name: str, key: str) -> np.ndarray:
+        """
+        Look up the row numbers for a key, in O(log n + k).
+
+        @param name: Index name (e.g., "glottocode")
+        @param key: Key to look up (e.g., "stan1295")
+        @return: Sorted array of row numbers (empty if the key is unknown)
+        """
+        if f'{name}_keys' not in self.arrays:
+            raise KeyError(f"Unknown index: {name} (available: {', '.join(self.names)})")
+
+        keys = self.arrays[f'{name}_keys']
+        offsets = self.arrays[f'{name}_offsets']
+        encoded = key.encode('utf-8')
+
+        pos = int(np.searchsorted(keys, encoded))
+        if pos >= len(keys) or keys[pos] != encoded:
+            return np.zeros(0, dtype=np.int64)
+
+        return self.arrays[f'{name}_rows'][offsets[pos]:offsets[pos + 1]].astype(np.int64)
+
+
+def load_index(collection_dir: Path) -> Optional[FormsIndex]:
+    """
+    Load forms_index.npz from a collection directory.
+
+    @param collection_dir: Collection directory
+    @return: FormsIndex, or None if the collection has no index
+    """
+    index_path = collection_dir / 'forms_index.npz'
+    if not index_path.exists():
+        return None
+    return FormsIndex(index_path)
+
+
+def read_forms_csv(source) -> pd.DataFrame:
+    """Read forms CSV data, with categorical dtypes for low-cardinality columns."""
+    return pd.read_csv(source, encoding='utf-8', dtype={col: 'category' for col in CATEGORICAL_COLUMNS})
+
+
+def read_form_rows(forms_path: Path, index: FormsIndex, rows: np.ndarray) -> pd.DataFrame:
+    """
+    Read selected rows of forms.csv by seeking to their byte offsets.
+
+    @param forms_path: Path to forms.csv
+    @param index: Index of the collection
+    @param rows: Sorted row numbers to read
+    @return: Dataframe with the selected forms
+    """
+    file_size = forms_path.stat().st_size
+    row_ends = np.append(index.row_offsets[1:], file_size)
+
+    chunks = []
+    with open(forms_path, 'rb') as f:
+        header = f.readline()
+
+        # Coalesce consecutive rows into single reads
+        breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+        for run in np.split(rows, breaks):
+            if len(run) == 0:
+                continue
+            start = index.row_offsets[run[0]]
+            f.seek(start)
+            chunks.append(f.read(row_ends[run[-1]] - start))
+
+    return read_forms_csv(io.BytesIO(header + b''.join(chunks)))
+
+
+def load_forms(
+    collection_dir: Path,
+    glottocode: Optional[str] = None,
+    concept: Optional[str] = None,
+    cognateset: Optional[str] = None,
+    family: Optional[str] = None,
+    macroarea: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Load forms from a collection, optionally filtered.
+
+    Filters are combined with AND. Indexed filters select rows before reading;
+    without an index they are applied after loading the full forms.csv.
+    Macroarea is not indexed (it matches large fractions of the data), so it
+    is always applied as a categorical equality filter.
+
+    @param collection_dir: Collection directory
+    @param glottocode: Only forms for this Glottocode
+    @param concept: Only forms for this Concepticon gloss
+    @param cognateset: Only forms in this (prefixed) cognate set
+    @param family: Only forms for languages of this Glottolog family
+    @param macroarea: Only forms for languages of this macroarea
+    @return: Forms dataframe
+    """
+    forms_path = collection_dir / 'forms.csv'
+    if not forms_path.exists():
+        raise FileNotFoundError(f"forms.csv not found in {collection_dir}")
+
+    filters = {
+        name: value
+        for name, value in [
+            ('glottocode', glottocode), ('family', family),
+            ('concept', concept), ('cognateset', cognateset)
+        ]
+        if value is not None
+    }
+
+    index = load_index(collection_dir) if filters else None
+    if index is None:
+        if filters:
+            logger.warning(f"No forms_index.npz in {collection_dir}, scanning forms.csv")
+        forms = read_forms_csv(forms_path)
+        for name, value in filters.items():
+            if name == 'cognateset':
+                forms = forms[forms['Cognacy'].fillna('').str.split(';').apply(lambda sets: value in sets)]
+            else:
+                forms = forms[forms[FILTER_COLUMNS[name]] == value]
+    else:
+        # An index is only loaded when there are filters
+        (name, value), *others = filters.items()
+        rows = index.rows(name, value)
+        for name, value in others:
+            rows = np.intersect1d(rows, index.rows(name, value), assume_unique=True)
+        forms = read_form_rows(forms_path, index, rows)
+
+    if macroarea is not None:
+        forms = forms[forms['Macroarea'] == macroarea]
+
+    return forms.reset_index(drop=True)
+
+
+# === MAIN ===
+
+def main():
+    """Main entry point - prints or exports the selected forms."""
+    parser = argparse.ArgumentParser(
+        description='Load forms from an Arca Verborum collection using its inverted indexes',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        'collection',
+        type=Path,
+        help='Collection directory (e.g., output/core)'
+    )
+    parser.add_argument('--glottocode', help='Select forms for this Glottocode')
+    parser.add_argument('--concept', help='Select forms for this Concepticon gloss')
+    parser.add_argument('--cognateset', help='Select forms in this cognate set')
+    parser.add_argument('--family', help='Select forms for languages of this Glottolog family')
+    parser.add_argument('--macroarea', help='Select forms for languages of this macroarea')
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Write the selected forms to this CSV file (default: print a preview)'
+    )
+
+    args = parser.parse_args()
+
+    if not args.collection.exists():
+        logger.error(f"Collection directory does not exist: {args.collection}")
+        sys.exit(1)
+
+    forms = load_forms(
+        args.collection, args.glottocode, args.concept, args.cognateset,
+        args.family, args.macroarea
+    )
+    logger.info(f"Selected {len(forms):,} forms")
+
+    if args.output:
+        forms.to_csv(args.output, index=False, encoding='utf-8')
+        logger.info(f"Wrote {args.output}")
+    else:
+        print(forms.head(20).to_string())
+
+
+if __name__ == '__main__':
+    main()
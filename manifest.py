@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+
+"""
+Collection File Manifests
+
+merge_cldf_datasets.py writes a manifest.json into each collection directory,
+built while the files are streamed out, so that prepare_release.py does not
+have to read the outputs again for sizes, checksums and counts:
+
+    {
+      "collection": "full",
+      "files": {
+        "forms.csv": {"size": 123456, "sha256": "...", "rows": 2000,
+                      "blocks": [["abrahammonpa", 412, 5120, "..."], ...],
+                      "mtime_ns": 1767268800000000000},
+        "sources.bib": {"size": 2345, "sha256": "...", "bibtex_entries": 12,
+                        "mtime_ns": 1767268800000000000},
+        ...
+      }
+    }
+
+An entry is only trusted while the file still has the recorded size and
+modification time; otherwise readers fall back to scanning the file.
+
+The tables streamed dataset by dataset also list each dataset's block
+(dataset, byte offset, size, SHA256), which prepare_release.py uses to
+build delta packages between releases (see apply_delta.py).
+
+With merge_cldf_datasets.py --direct-archive, the files go straight into a
+partial release archive instead; their entries have no mtime_ns, and an
+"archive" block records the archive's path, size and members, for
+prepare_release.py --direct-archive to finish it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+
+# Bytes read per chunk when scanning files
+SCAN_CHUNK_SIZE = 1024 * 1024
+
+# Entry headers such as "@article{", excluding @comment, @string and @preamble
+BIBTEX_ENTRY = re.compile(r'^[ \t]*@(?!comment\b|string\b|preamble\b)\w+[ \t]*[{(]', re.IGNORECASE | re.MULTILINE)
+
+
+def count_bibtex_entries(text: str) -> int:
+    """Count the entries of a BibTeX file."""
+    return len(BIBTEX_ENTRY.findall(text))
+
+
+class FileDigest:
+    """
+    SHA256, size and (optionally) row count and dataset blocks of a file,
+    updated as it is written.
+    """
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.rows: Optional[int] = None
+        self.bibtex_entries: Optional[int] = None
+        self.blocks: Optional[List[list]] = None
+
+    def update(self, data: bytes, rows: Optional[int] = None, dataset: Optional[str] = None):
+        """
+        Record data appended to the file.
+
+        @param data: Bytes written
+        @param rows: Number of CSV records in data, if counted
+        @param dataset: Dataset the data belongs to, to record it as a block
+        """
+        if dataset is not None:
+            if self.blocks is None:
+                self.blocks = []
+            self.blocks.append([dataset, self.size, len(data), hashlib.sha256(data).hexdigest()])
+        self.sha256.update(data)
+        self.size += len(data)
+        if rows is not None:
+            self.rows = (self.rows or 0) + rows
+
+    def update_from_file(self, path: Path):
+        """Record the whole contents of a file that was written without a digest."""
+        with open(path, 'rb') as f:
+            while chunk := f.read(SCAN_CHUNK_SIZE):
+                self.update(chunk)
+
+
+class ManifestBuilder:
+    """
+    Collect the digests of one collection's files and write manifest.json.
+
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param output_dir: Collection output directory
+    """
+
+    def __init__(self, collection: str, output_dir: Path):
+        self.collection = collection
+        self.output_dir = output_dir
+        self.digests: Dict[str, FileDigest] = {}
+
+    def digest(self, filename: str) -> FileDigest:
+        """Digest of a file, created on first use."""
+        if filename not in self.digests:
+            self.digests[filename] = FileDigest()
+        return self.digests[filename]
+
+    def write(self, archive: Optional[dict] = None):
+        """
+        Write manifest.json for all files recorded so far.
+
+        Each file's size on disk must match the bytes recorded for it; a
+        mismatch means the file was written around the digest, and is an
+        error rather than a stale manifest.
+
+        @param archive: Partial release archive holding the files that are not on disk, if any
+        """
+        files = {}
+        for filename in sorted(self.digests):
+            digest = self.digests[filename]
+            entry = {'size': digest.size, 'sha256': digest.sha256.hexdigest()}
+            if digest.rows is not None:
+                entry['rows'] = digest.rows
+            if digest.bibtex_entries is not None:
+                entry['bibtex_entries'] = digest.bibtex_entries
+            if digest.blocks is not None:
+                entry['blocks'] = digest.blocks
+
+            file_path = self.output_dir / filename
+            if archive is None or file_path.exists():
+                stat = file_path.stat()
+                if stat.st_size != digest.size:
+                    raise RuntimeError(f"{filename}: {stat.st_size} bytes on disk, {digest.size} recorded")
+                entry['mtime_ns'] = stat.st_mtime_ns
+            files[filename] = entry
+
+        manifest = {'collection': self.collection, 'files': files}
+        if archive is not None:
+            manifest['archive'] = archive
+
+        path = self.output_dir / MANIFEST_FILE
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+        logger.info(f"Wrote manifest to {path}")
+
+
+def read_manifest(output_dir: Path) -> Optional[dict]:
+    """
+    Read a collection's manifest as written, without checking it against the files.
+
+    @param output_dir: Collection output directory
+    @return: Manifest, or None if there is none (or it cannot be read)
+    """
+    path = output_dir / MANIFEST_FILE
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest['files']
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable {path}: {e}")
+        return None
+    return manifest
+
+
+def load_manifest(output_dir: Path) -> Dict[str, dict]:
+    """
+    Load the up-to-date entries of a collection's manifest.
+
+    Entries whose file is missing, or whose size or modification time
+    differ from the recorded ones, are left out, so callers scan those
+    files instead.
+
+    @param output_dir: Collection output directory
+    @return: Dictionary of filename -> manifest entry (empty if there is no manifest)
+    """
+    manifest = read_manifest(output_dir)
+    if manifest is None:
+        return {}
+
+    fresh = {}
+    for filename, entry in manifest['files'].items():
+        file_path = output_dir / filename
+        if not file_path.exists():
+            continue
+        stat = file_path.stat()
+        if stat.st_size == entry.get('size') and stat.st_mtime_ns == entry.get('mtime_ns'):
+            fresh[filename] = entry
+    return fresh
@@ -8,9 +8,13 @@ See MERGER_SPECIFICATION.md for details.
 
 Usage:
     python merge_cldf_datasets.py [--input lexibank/] [--output output/] [--verbose]
+    python merge_cldf_datasets.py --shard 2/4 --output shards/2     # One of 4 machines
+    python merge_cldf_datasets.py --combine shards/* --output output/
+    python merge_cldf_datasets.py --direct-archive --version A.20251001  # CSVs straight into releases/
 """
 
 import pandas as pd
+import numpy as np
 import json
 from pathlib import Path
 import re
@@ -19,6 +23,16 @@ from typing import Dict, List, Optional, Tuple
 import argparse
 import sys
 import gc
+import os
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from manifest import MANIFEST_FILE, ManifestBuilder, count_bibtex_entries, load_manifest
+from progress import ProgressTracker
+from zip_writer import ParallelDeflater, StreamingZipWriter, ZipMemberWriter, read_chunks, zip_date_time
 
 try:
     import bibtexparser
@@ -40,13 +54,15 @@ FORMS_COLUMNS = [
     'Value', 'Form', 'Segments', 'Comment', 'Source', 'Loan',
     'Graphemes', 'Profile', 'Cognacy', 'Doubt', 'Cognate_Detection_Method',
     'Cognate_Source', 'Alignment', 'Glottocode', 'Glottolog_Name',
-    'Concepticon_ID', 'Concepticon_Gloss', 'Morpheme_Index', 'Segment_Slice'
+    'Family', 'Macroarea', 'Concepticon_ID', 'Concepticon_Gloss',
+    'Morpheme_Index', 'Segment_Slice'
 ]
 
 # Columns to output to forms.csv (excludes Local_ID, Profile, Concepticon_ID, Graphemes)
 FORMS_OUTPUT_COLUMNS = [
     'ID', 'Dataset', 'Language_ID', 'Glottocode', 'Glottolog_Name',
-    'Parameter_ID', 'Concepticon_Gloss', 'Value', 'Form', 'Segments',
+    'Family', 'Macroarea', 'Parameter_ID', 'Concepticon_Gloss',
+    'Value', 'Form', 'Segments',
     'Cognacy', 'Alignment', 'Loan', 'Morpheme_Index', 'Segment_Slice',
     'Doubt', 'Comment', 'Source', 'Cognate_Detection_Method', 'Cognate_Source'
 ]
@@ -61,6 +77,40 @@ PARAMETERS_COLUMNS = [
     'ID', 'Dataset', 'Name', 'Concepticon_ID', 'Concepticon_Gloss'
 ]
 
+# Columns of the long-format cognates.csv (one row per cognate judgement)
+COGNATES_COLUMNS = [
+    'ID', 'Dataset', 'Form_ID', 'Cognateset_ID', 'Doubt',
+    'Cognate_Detection_Method', 'Source', 'Alignment', 'Alignment_Method',
+    'Morpheme_Index', 'Segment_Slice'
+]
+
+COGNATESETS_COLUMNS = [
+    'ID', 'Dataset', 'Form_Count', 'Language_Count',
+    'Parameter_ID', 'Concepticon_Gloss', 'Partial_Cognacy'
+]
+
+# Rough peak memory of process_dataset, per byte of CLDF CSV input and per form
+MEMORY_PER_INPUT_BYTE = 8
+MEMORY_PER_FORM = 2_000
+
+# Per-collection CSV files appended dataset by dataset (in output order)
+COLLECTION_CSV_FILES = ['forms.csv', 'languages.csv', 'parameters.csv', 'cognatesets.csv', 'cognates.csv']
+
+# Written by --shard builds; read by --combine
+SHARD_STATE_FILE = 'shard.json'
+
+# --direct-archive: compressed tables are kept in memory up to this size, then spilled to disk
+ARCHIVE_SPOOL_MEMORY = 64 * 1024 * 1024
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+# Inverted indexes over forms.csv: index name -> (column, multi-valued)
+FORMS_INDEXES = {
+    'glottocode': ('Glottocode', False),
+    'family': ('Family', False),
+    'concept': ('Concepticon_Gloss', False),
+    'cognateset': ('Cognacy', True),
+}
+
 # === LOGGING SETUP ===
 logging.basicConfig(
     level=logging.INFO,
@@ -197,22 +247,227 @@ def track_column_presence(df: pd.DataFrame, original_columns: List[str]) -> Dict
     return {col: col in original_columns for col in df.columns}
 
 
-def append_to_csv(filepath: Path, df: pd.DataFrame, is_first_write: bool, output_columns: Optional[List[str]] = None):
+def render_csv(df: pd.DataFrame, header: bool, output_columns: Optional[List[str]] = None) -> bytes:
     """
-    Append dataframe to CSV file.
+    Render dataframe as CSV, exactly as DataFrame.to_csv writes it to a file.
 
-    @param filepath: Path to output CSV file
-    @param df: Dataframe to write
-    @param is_first_write: If True, write header; otherwise append without header
-    @param output_columns: Optional list of columns to write (filters df before writing)
+    @param df: Dataframe to render
+    @param header: If True, include the header line
+    @param output_columns: Optional list of columns to render (filters df before rendering)
+    @return: UTF-8 encoded CSV
     """
     # Filter to output columns if specified
     if output_columns:
         df = df[output_columns]
 
-    mode = 'w' if is_first_write else 'a'
-    header = is_first_write
-    df.to_csv(filepath, mode=mode, header=header, index=False, encoding='utf-8')
+    return df.to_csv(header=header, index=False).encode('utf-8')
+
+
+def append_bytes(filepath: Path, data: bytes, is_first_write: bool):
+    """
+    Append encoded data to a file.
+
+    @param filepath: Path to output file
+    @param data: Bytes to append
+    @param is_first_write: If True, truncate the file first
+    """
+    with open(filepath, 'wb' if is_first_write else 'ab') as f:
+        f.write(data)
+
+
+def csv_row_starts(encoded: bytes) -> np.ndarray:
+    """
+    Find the byte offset of every record in CSV data.
+
+    Newlines inside quoted fields are skipped by tracking quote parity.
+
+    @param encoded: UTF-8 encoded CSV rows (no header)
+    @return: Array of record start offsets relative to the start of the data
+    """
+    data = np.frombuffer(encoded, dtype=np.uint8)
+    newlines = np.flatnonzero(data == 0x0A)
+    # uint8 wraps around at 256, which preserves parity and keeps memory low
+    quote_parity = np.cumsum(data == 0x22, dtype=np.uint8)
+    record_ends = newlines[quote_parity[newlines] % 2 == 0]
+    if len(record_ends) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(([0], record_ends[:-1] + 1)).astype(np.int64)
+
+
+def render_csv_rows(df: pd.DataFrame, output_columns: Optional[List[str]] = None) -> Tuple[bytes, np.ndarray]:
+    """
+    Render dataframe rows as CSV exactly as render_csv does, with row offsets.
+
+    @param df: Dataframe to render
+    @param output_columns: Optional list of columns to render
+    @return: Tuple of (encoded rows without header, byte offset of each row)
+    """
+    if output_columns:
+        df = df[output_columns]
+
+    encoded = df.to_csv(header=False, index=False).encode('utf-8')
+    return encoded, csv_row_starts(encoded)
+
+
+def render_csv_header(columns: List[str]) -> bytes:
+    """Render the CSV header line for a list of columns."""
+    return pd.DataFrame(columns=columns).to_csv(index=False).encode('utf-8')
+
+
+def save_npz(path: Path, arrays: Dict[str, np.ndarray]):
+    """
+    Save arrays as an .npz file readable by numpy.load.
+
+    Unlike numpy.savez_compressed, member timestamps are fixed, so identical
+    arrays always produce identical files.
+
+    @param path: Output path
+    @param arrays: Mapping of array names to arrays
+    """
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, array in arrays.items():
+            info = zipfile.ZipInfo(f'{name}.npy', date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with zf.open(info, 'w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asarray(array), allow_pickle=False)
+
+
+class InvertedIndexBuilder:
+    """
+    Accumulate postings (key -> sorted row numbers) for one forms column.
+
+    Datasets are added in output order, so row numbers within each chunk are
+    already ascending and postings only need to be grouped by key at the end.
+    """
+
+    def __init__(self, column: str, multi_valued: bool = False):
+        self.column = column
+        self.multi_valued = multi_valued
+
+        self._keys: List[np.ndarray] = []
+        self._counts: List[np.ndarray] = []
+        self._rows: List[np.ndarray] = []
+
+    def add(self, values: pd.Series, first_row: int):
+        """
+        Add the values of one dataset's forms.
+
+        @param values: Column values, in output row order
+        @param first_row: Row number of the first value in the output file
+        """
+        values = values.reset_index(drop=True)
+        if self.multi_valued:
+            values = values.str.split(';').explode()
+        values = values[values.notna() & (values != '')]
+
+        if self.multi_valued:
+            # A form may list the same cognate set twice (forms.csv and cognates.csv)
+            values = values[~pd.DataFrame({'row': values.index, 'key': values.to_numpy()}).duplicated().to_numpy()]
+
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind='stable')
+        rows = values.index.to_numpy(dtype=np.int64)[order] + first_row
+
+        self.add_postings(np.asarray(uniques, dtype=object), np.bincount(codes, minlength=len(uniques)), rows)
+
+    def add_postings(self, keys: np.ndarray, counts: np.ndarray, rows: np.ndarray):
+        """
+        Add postings already grouped by key.
+
+        @param keys: Keys of this chunk
+        @param counts: Number of rows for each key
+        @param rows: Row numbers, grouped by key in the order of `keys`
+        """
+        self._keys.append(keys)
+        self._counts.append(np.asarray(counts, dtype=np.int64))
+        self._rows.append(np.asarray(rows, dtype=np.int64))
+
+    def build(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Merge all chunks into a single sorted index.
+
+        @return: Tuple of (UTF-8 keys sorted bytewise, offsets into rows with one
+                 entry per key plus a final end offset, row numbers)
+        """
+        # No chunks, or only chunks without values (e.g., no cognate sets at all)
+        if not any(len(keys) for keys in self._keys):
+            return np.zeros(0, dtype='S1'), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.uint32)
+
+        keys = np.array([str(k).encode('utf-8') for k in np.concatenate(self._keys)], dtype=bytes)
+        counts = np.concatenate(self._counts)
+        rows = np.concatenate(self._rows)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        # Stable sort keeps chunks of the same key in row order
+        order = np.argsort(keys, kind='stable')
+        keys, counts, starts = keys[order], counts[order], starts[order]
+
+        out_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        gather = np.arange(counts.sum()) + np.repeat(starts - out_starts, counts)
+
+        is_new_key = np.concatenate(([True], keys[1:] != keys[:-1]))
+        offsets = np.append(out_starts[is_new_key], counts.sum()).astype(np.int64)
+
+        return keys[is_new_key], offsets, rows[gather].astype(np.uint32)
+
+
+class FormsIndexAccumulator:
+    """
+    Accumulate row byte offsets and inverted indexes for one collection's forms.csv.
+    Written as forms_index.npz so that lookups read only the matching rows.
+    """
+
+    def __init__(self):
+        self.total_rows = 0
+        self.row_offsets: List[np.ndarray] = []
+        self.builders = {
+            name: InvertedIndexBuilder(column, multi_valued)
+            for name, (column, multi_valued) in FORMS_INDEXES.items()
+        }
+
+    def update(self, forms: pd.DataFrame, row_offsets: np.ndarray):
+        """
+        Update indexes from one dataset's forms, as appended to forms.csv.
+
+        @param forms: Forms dataframe, in output row order
+        @param row_offsets: Byte offset of each row in forms.csv
+        """
+        for builder in self.builders.values():
+            builder.add(forms[builder.column], self.total_rows)
+
+        self.row_offsets.append(row_offsets)
+        self.total_rows += len(forms)
+
+    def update_from_file(self, path: Path, offset_shift: int):
+        """
+        Append a forms_index.npz written for a later part of forms.csv (e.g., a shard).
+
+        @param path: forms_index.npz of the part
+        @param offset_shift: Byte offset to add to the part's row offsets
+        """
+        with np.load(path) as index:
+            self.row_offsets.append(index['row_offsets'] + offset_shift)
+            for name, builder in self.builders.items():
+                keys = index[f'{name}_keys']
+                if len(keys):
+                    builder.add_postings(np.array([k.decode('utf-8') for k in keys], dtype=object),
+                                         np.diff(index[f'{name}_offsets']),
+                                         index[f'{name}_rows'].astype(np.int64) + self.total_rows)
+            self.total_rows += len(index['row_offsets'])
+
+    def write(self, output_dir: Path):
+        """Write forms_index.npz to the output directory."""
+        arrays = {
+            'row_offsets': np.concatenate(self.row_offsets) if self.row_offsets else np.zeros(0, dtype=np.int64)
+        }
+        for name, builder in self.builders.items():
+            keys, offsets, rows = builder.build()
+            arrays[f'{name}_keys'] = keys
+            arrays[f'{name}_offsets'] = offsets
+            arrays[f'{name}_rows'] = rows
+
+        save_npz(output_dir / 'forms_index.npz', arrays)
+        logger.info(f"Wrote forms index to {output_dir / 'forms_index.npz'}")
 
 
 def initialize_output_files(output_dir_full: Path, output_dir_core: Path, output_dir_corecog: Path):
@@ -227,8 +482,8 @@ def initialize_output_files(output_dir_full: Path, output_dir_core: Path, output
         # Create output directory
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Remove old CSV files
-        for csv_file in ['forms.csv', 'languages.csv', 'parameters.csv']:
+        # Remove old CSV, index and manifest files
+        for csv_file in COLLECTION_CSV_FILES + ['forms_index.npz', MANIFEST_FILE]:
             csv_path = output_dir / csv_file
             if csv_path.exists():
                 csv_path.unlink()
@@ -247,8 +502,29 @@ class ValidationAccumulator:
     """
     Accumulate validation statistics as datasets are processed.
     Uses minimal memory by storing only counters and summaries.
+
+    Accumulators are partial statistics: each can be built from any set of
+    datasets (e.g., one dataset in a worker, or one shard), serialized with
+    to_dict() and merged with combine(). Per-dataset entries are kept in
+    dataset order, so generate_report() does not depend on how the work was
+    split or in which order the parts were combined.
     """
 
+    # Counters that are summed when combining
+    COUNTERS = [
+        'total_forms', 'total_languages', 'total_parameters',
+        'datasets_processed', 'datasets_with_cognates',
+        'forms_with_glottocode', 'forms_with_concepticon', 'forms_with_cognacy',
+        'forms_with_segments', 'forms_with_alignment',
+        'forms_with_morpheme_index', 'forms_with_segment_slice'
+    ]
+
+    # Lists with one entry per dataset, parallel to self.datasets
+    PER_DATASET = ['all_metadata', 'all_references', 'all_bibtex', 'all_column_tracking']
+
+    # Lists of dataset names with a feature
+    FEATURE_LISTS = ['datasets_with_morpheme_index', 'datasets_with_segment_slice']
+
     def __init__(self):
         self.total_forms = 0
         self.total_languages = 0
@@ -265,7 +541,8 @@ class ValidationAccumulator:
         self.forms_with_morpheme_index = 0
         self.forms_with_segment_slice = 0
 
-        # Collect small tables in memory
+        # Collect small tables in memory (one entry per dataset)
+        self.datasets = []
         self.all_metadata = []
         self.all_references = []
         self.all_bibtex = []
@@ -303,20 +580,20 @@ class ValidationAccumulator:
             self.datasets_with_cognates += 1
 
         # Quality metrics
-        self.forms_with_glottocode += forms['Glottocode'].notna().sum()
-        self.forms_with_concepticon += forms['Concepticon_ID'].notna().sum()
-        self.forms_with_cognacy += forms['Cognacy'].notna().sum()
-        self.forms_with_segments += forms['Segments'].notna().sum()
-        self.forms_with_alignment += forms['Alignment'].notna().sum()
+        self.forms_with_glottocode += int(forms['Glottocode'].notna().sum())
+        self.forms_with_concepticon += int(forms['Concepticon_ID'].notna().sum())
+        self.forms_with_cognacy += int(forms['Cognacy'].notna().sum())
+        self.forms_with_segments += int(forms['Segments'].notna().sum())
+        self.forms_with_alignment += int(forms['Alignment'].notna().sum())
 
         # Partial cognacy tracking
         if forms['Morpheme_Index'].notna().any():
             self.datasets_with_morpheme_index.append(dataset)
-            self.forms_with_morpheme_index += forms['Morpheme_Index'].notna().sum()
+            self.forms_with_morpheme_index += int(forms['Morpheme_Index'].notna().sum())
 
         if forms['Segment_Slice'].notna().any():
             self.datasets_with_segment_slice.append(dataset)
-            self.forms_with_segment_slice += forms['Segment_Slice'].notna().sum()
+            self.forms_with_segment_slice += int(forms['Segment_Slice'].notna().sum())
 
         # Calculate null percentages for this dataset
         null_pct = {}
@@ -324,7 +601,7 @@ class ValidationAccumulator:
             if col in forms.columns:
                 total = len(forms)
                 null_count = forms[col].isna().sum()
-                null_pct[col] = round(100 * null_count / total, 1) if total > 0 else 0
+                null_pct[col] = float(round(100 * null_count / total, 1)) if total > 0 else 0
 
         # Store completeness info
         self.completeness[dataset] = {
@@ -337,11 +614,74 @@ class ValidationAccumulator:
         }
 
         # Accumulate small tables
+        self.datasets.append(dataset)
         self.all_metadata.append(metadata)
         self.all_references.append(references)
         self.all_bibtex.append(bibtex)
         self.all_column_tracking.append(column_tracking)
 
+    def combine(self, other: 'ValidationAccumulator') -> 'ValidationAccumulator':
+        """
+        Merge two partial accumulators covering disjoint sets of datasets.
+
+        The operation is associative and commutative: per-dataset entries
+        are ordered by dataset name, counters are summed.
+
+        @param other: Accumulator for other datasets
+        @return: New accumulator covering the datasets of both
+        """
+        overlap = set(self.datasets) & set(other.datasets)
+        if overlap:
+            raise ValueError(f"Cannot combine validation statistics; datasets counted twice: "
+                             f"{', '.join(sorted(overlap))}")
+
+        combined = ValidationAccumulator()
+        for name in self.COUNTERS:
+            setattr(combined, name, getattr(self, name) + getattr(other, name))
+
+        # Per-dataset entries in dataset order
+        entries = sorted(
+            zip(self.datasets + other.datasets,
+                *[getattr(self, name) + getattr(other, name) for name in self.PER_DATASET]),
+            key=lambda entry: entry[0]
+        )
+        combined.datasets = [entry[0] for entry in entries]
+        for i, name in enumerate(self.PER_DATASET, 1):
+            setattr(combined, name, [entry[i] for entry in entries])
+
+        for name in self.FEATURE_LISTS:
+            setattr(combined, name, sorted(getattr(self, name) + getattr(other, name)))
+
+        completeness = {**self.completeness, **other.completeness}
+        combined.completeness = {dataset: completeness[dataset] for dataset in sorted(completeness)}
+
+        return combined
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the accumulator (e.g., to cache per-dataset or per-shard statistics as JSON).
+
+        @return: JSON-serializable dictionary, see from_dict
+        """
+        data = {name: getattr(self, name) for name in self.COUNTERS}
+        data['datasets'] = self.datasets
+        data.update({name: getattr(self, name) for name in self.PER_DATASET + self.FEATURE_LISTS})
+        data['completeness'] = self.completeness
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ValidationAccumulator':
+        """
+        Restore an accumulator serialized with to_dict.
+
+        @param data: Dictionary from to_dict
+        @return: Accumulator
+        """
+        accumulator = cls()
+        for name in cls.COUNTERS + ['datasets', 'completeness'] + cls.PER_DATASET + cls.FEATURE_LISTS:
+            setattr(accumulator, name, data[name])
+        return accumulator
+
     def generate_report(self) -> dict:
         """
         Generate validation report from accumulated statistics.
@@ -596,7 +936,12 @@ def load_dataset_cognates(dataset_path: Path, dataset: str) -> Optional[pd.DataF
 
     df = pd.read_csv(cognates_path, encoding='utf-8', dtype=str, keep_default_na=False)
 
+    # Add Dataset column
+    df['Dataset'] = dataset
+
     # Prefix IDs
+    if 'ID' in df.columns:
+        df['ID'] = prefix_ids_column(df['ID'], dataset)
     if 'Form_ID' in df.columns:
         df['Form_ID'] = prefix_ids_column(df['Form_ID'], dataset)
     if 'Cognateset_ID' in df.columns:
@@ -612,7 +957,8 @@ def load_dataset_cognates(dataset_path: Path, dataset: str) -> Optional[pd.DataF
 
     # Replace empty strings with pd.NA
     for col in df.columns:
-        df[col] = df[col].replace('', pd.NA)
+        if col not in ['Dataset']:
+            df[col] = df[col].replace('', pd.NA)
 
     return df
 
@@ -712,18 +1058,67 @@ def combine_cognacy(forms_cog, cognates_cog):
     return ';'.join(parts) if parts else pd.NA
 
 
+def join_unique(values: pd.Series):
+    """Join the distinct non-null values of a series with semicolons (NA if none)."""
+    unique = sorted(values.dropna().unique())
+    return ';'.join(unique) if unique else pd.NA
+
+
+def build_cognateset_table(forms: pd.DataFrame, cognates: Optional[pd.DataFrame], dataset: str) -> pd.DataFrame:
+    """
+    Summarize the cognate sets of a dataset from the merged Cognacy column.
+
+    @param forms: Forms with merged Cognacy and joined metadata
+    @param cognates: Cognates dataframe (or None), used to flag partial cognacy
+    @param dataset: Dataset name
+    @return: One row per cognate set, with COGNATESETS_COLUMNS
+    """
+    members = forms[['ID', 'Language_ID', 'Parameter_ID', 'Concepticon_Gloss', 'Cognacy']].copy()
+    members['Cognacy'] = members['Cognacy'].str.split(';')
+    members = members.explode('Cognacy')
+    members = members[members['Cognacy'].notna() & (members['Cognacy'] != '')]
+
+    if members.empty:
+        return pd.DataFrame(columns=COGNATESETS_COLUMNS)
+
+    grouped = members.groupby('Cognacy', sort=True)
+    table = pd.DataFrame({
+        'Form_Count': grouped['ID'].nunique(),
+        'Language_Count': grouped['Language_ID'].nunique(),
+        'Parameter_ID': grouped['Parameter_ID'].agg(join_unique),
+        'Concepticon_Gloss': grouped['Concepticon_Gloss'].agg(join_unique),
+    })
+
+    # A set is partial if any of its judgements targets a morpheme or segment slice
+    partial_sets: set = set()
+    if cognates is not None:
+        is_partial = pd.Series(False, index=cognates.index)
+        for col in ['Morpheme_Index', 'Segment_Slice']:
+            if col in cognates.columns:
+                is_partial |= cognates[col].notna()
+        partial_sets = set(cognates.loc[is_partial, 'Cognateset_ID'].dropna())
+    table['Partial_Cognacy'] = table.index.isin(partial_sets)
+
+    table = table.rename_axis('ID').reset_index()
+    table['Dataset'] = dataset
+
+    return table[COGNATESETS_COLUMNS]
+
+
 # === METADATA JOINING ===
 
 def join_language_metadata(forms: pd.DataFrame, languages: pd.DataFrame) -> pd.DataFrame:
     """
-    Join language metadata (Glottocode, Glottolog_Name) to forms.
+    Join language metadata (Glottocode, Glottolog_Name, Family, Macroarea) to forms.
 
     @param forms: Forms dataframe
     @param languages: Languages dataframe
     @return: Forms with language metadata
     """
     # Select columns to join
-    available_cols = ['ID'] + [c for c in ['Glottocode', 'Glottolog_Name'] if c in languages.columns]
+    available_cols = ['ID'] + [
+        c for c in ['Glottocode', 'Glottolog_Name', 'Family', 'Macroarea'] if c in languages.columns
+    ]
 
     forms = forms.merge(
         languages[available_cols],
@@ -768,13 +1163,14 @@ def join_parameter_metadata(forms: pd.DataFrame, parameters: pd.DataFrame) -> pd
 
 # === DATASET PROCESSING ORCHESTRATION ===
 
-def process_dataset(dataset: str, lexibank_dir: Path) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, dict, dict, str, dict]:
+def process_dataset(dataset: str, lexibank_dir: Path) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, dict, dict, str, dict, pd.DataFrame, pd.DataFrame]:
     """
     Process a single dataset.
 
     @param dataset: Dataset name
     @param lexibank_dir: Path to lexibank directory
-    @return: Tuple of (forms, languages, parameters, metadata, references, bibtex, column_tracking)
+    @return: Tuple of (forms, languages, parameters, metadata, references, bibtex, column_tracking,
+             cognatesets, cognates)
     """
     dataset_path = lexibank_dir / dataset / 'cldf'
 
@@ -824,12 +1220,247 @@ def process_dataset(dataset: str, lexibank_dir: Path) -> Tuple[pd.DataFrame, pd.
         na_position='last'
     ).reset_index(drop=True)
 
+    # Summarize cognate sets
+    cognatesets = build_cognateset_table(forms, cognates, dataset)
+
+    # Keep every cognate judgement in long format
+    if cognates is None:
+        cognates = pd.DataFrame(columns=COGNATES_COLUMNS)
+    cognates = ensure_columns(cognates, COGNATES_COLUMNS)
+
     # Load BibTeX sources
     bibtex_path = dataset_path / 'sources.bib'
     bibtex_content = load_bibtex(bibtex_path)
     prefixed_bibtex = prefix_bibtex_file(bibtex_content, dataset)
 
-    return forms, languages, parameters, metadata, references, prefixed_bibtex, column_tracking
+    return forms, languages, parameters, metadata, references, prefixed_bibtex, column_tracking, cognatesets, cognates
+
+
+def estimate_dataset(dataset: str, lexibank_dir: Path) -> dict:
+    """
+    Estimate the processing cost and peak memory of a dataset before loading it.
+
+    Uses the FormTable's dc:extent from cldf-metadata.json (as in
+    extract_metadata) and the sizes of the CLDF CSV files.
+
+    @param dataset: Dataset name
+    @param lexibank_dir: Path to lexibank directory
+    @return: Dictionary with forms, input_bytes, cost and memory (bytes)
+    """
+    dataset_path = lexibank_dir / dataset / 'cldf'
+    input_bytes = sum(path.stat().st_size for path in dataset_path.glob('*.csv'))
+
+    forms = 0
+    try:
+        with open(dataset_path / 'cldf-metadata.json', 'r', encoding='utf-8') as f:
+            forms = extract_metadata(json.load(f), dataset)['Form_Count'] or 0
+    except (OSError, ValueError):
+        pass
+
+    return {
+        'forms': forms,
+        'input_bytes': input_bytes,
+        # Fall back to input size when dc:extent is missing
+        'cost': forms or input_bytes // 100,
+        'memory': input_bytes * MEMORY_PER_INPUT_BYTE + forms * MEMORY_PER_FORM,
+    }
+
+
+def default_memory_budget() -> int:
+    """Half of the physical memory, or 8 GB if it cannot be determined."""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // 2
+    except (ValueError, OSError, AttributeError):
+        return 8 * 1024 ** 3
+
+
+class DatasetScheduler:
+    """
+    Choose which dataset to process next in a parallel build.
+
+    The largest datasets (by estimated cost) start first, so a huge dataset
+    does not start last and stretch the build. A dataset's estimated memory
+    counts against the budget from the moment it starts until it has been
+    written, because finished results wait in the reorder buffer. The next
+    dataset in output order may always start, so the writer never stalls, and
+    a dataset larger than the whole budget still runs once nothing else is
+    held in memory.
+    """
+
+    def __init__(self, estimates: Dict[str, dict], memory_budget: int, max_jobs: int):
+        self.estimates = estimates
+        self.memory_budget = memory_budget
+        self.max_jobs = max_jobs
+        self.pending: List[str] = []
+        self.in_memory: Dict[str, int] = {}
+
+    @property
+    def memory_in_use(self) -> int:
+        """Estimated memory of started datasets that have not been written yet."""
+        return sum(self.in_memory.values())
+
+    def add(self, dataset: str):
+        """Make a dataset available for scheduling."""
+        self.pending.append(dataset)
+        self.pending.sort(key=lambda name: (-self.estimates[name]['cost'], name))
+
+    def next(self, next_in_order: Optional[str], running: int) -> Optional[str]:
+        """
+        Pick the next dataset to start, if any.
+
+        @param next_in_order: Dataset the writer is waiting for
+        @param running: Number of datasets currently being processed
+        @return: Dataset name, or None if nothing should start now
+        """
+        if running >= self.max_jobs or not self.pending:
+            return None
+
+        in_use = self.memory_in_use
+        chosen = next(
+            (name for name in self.pending if in_use + self.estimates[name]['memory'] <= self.memory_budget),
+            None
+        )
+        if chosen is None and next_in_order in self.pending:
+            chosen = next_in_order
+        if chosen is None and not self.in_memory:
+            chosen = self.pending[0]
+        if chosen is None:
+            return None
+
+        self.pending.remove(chosen)
+        self.in_memory[chosen] = self.estimates[chosen]['memory']
+        return chosen
+
+    def done(self, dataset: str):
+        """Release a dataset's memory after it has been written (or failed)."""
+        self.in_memory.pop(dataset, None)
+
+
+def process_datasets_sequential(
+    datasets: List[str],
+    lexibank_dir: Path,
+    writers: Dict[str, 'CollectionWriter'],
+    core_datasets: set,
+    corecog_datasets: set,
+    estimates: Dict[str, dict],
+    progress: ProgressTracker
+) -> List[str]:
+    """
+    Process datasets one at a time with streaming append, in sorted order.
+
+    @param datasets: Dataset names
+    @param lexibank_dir: Path to lexibank directory
+    @param writers: Writers from create_collection_writers
+    @param core_datasets: Names of core datasets
+    @param corecog_datasets: Names of corecog datasets
+    @param estimates: Estimates from estimate_dataset, for progress weights
+    @param progress: Progress tracker (weighted by estimated forms)
+    @return: Names of skipped datasets
+    """
+    skipped = []
+
+    for i, dataset in enumerate(sorted(datasets), 1):
+        try:
+            logger.info(f"Processing dataset {i}/{len(datasets)}: {dataset}")
+
+            # Process dataset and append it to its collections
+            result = process_dataset(dataset, lexibank_dir)
+            write_dataset(writers, dataset, result, core_datasets, corecog_datasets)
+
+            # Free memory immediately
+            del result
+            gc.collect()
+
+        except Exception as e:
+            logger.error(f"Failed to process {dataset}: {e}")
+            import traceback
+            logger.debug(traceback.format_exc())
+            skipped.append(dataset)
+
+        progress.advance(estimates[dataset]['cost'], dataset)
+
+    return skipped
+
+
+def process_datasets_parallel(
+    datasets: List[str],
+    lexibank_dir: Path,
+    writers: Dict[str, 'CollectionWriter'],
+    core_datasets: set,
+    corecog_datasets: set,
+    estimates: Dict[str, dict],
+    progress: ProgressTracker,
+    jobs: int,
+    memory_budget: int
+) -> List[str]:
+    """
+    Process datasets in a process pool and write them in sorted order.
+
+    Scheduling is largest-first under a memory budget (DatasetScheduler);
+    results are written through a reorder buffer, so the output is identical
+    to a sequential build.
+
+    @param datasets: Dataset names
+    @param lexibank_dir: Path to lexibank directory
+    @param writers: Writers from create_collection_writers
+    @param core_datasets: Names of core datasets
+    @param corecog_datasets: Names of corecog datasets
+    @param estimates: Estimates from estimate_dataset
+    @param progress: Progress tracker (weighted by estimated forms)
+    @param jobs: Number of worker processes
+    @param memory_budget: Memory budget in bytes
+    @return: Names of skipped datasets
+    """
+    order = sorted(datasets)
+    scheduler = DatasetScheduler(estimates, memory_budget, jobs)
+    for dataset in order:
+        scheduler.add(dataset)
+
+    logger.info(f"Scheduling {len(order)} datasets largest-first on {jobs} workers "
+                f"(memory budget {memory_budget / 1024 ** 3:.1f} GB)")
+
+    skipped = []
+    buffer: Dict[str, Optional[tuple]] = {}  # Results of finished datasets (None if failed)
+    futures: Dict[Future, str] = {}
+    next_index = 0
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        while next_index < len(order):
+            while (started := scheduler.next(order[next_index], len(futures))) is not None:
+                logger.debug(f"Starting {started} (~{estimates[started]['memory'] / 1024 ** 2:.0f} MB)")
+                futures[executor.submit(process_dataset, started, lexibank_dir)] = started
+
+            # Write everything that is next in order
+            while next_index < len(order) and order[next_index] in buffer:
+                dataset = order[next_index]
+                next_index += 1
+                result = buffer.pop(dataset)
+                if result is not None:
+                    logger.info(f"Writing dataset {next_index}/{len(order)}: {dataset}")
+                    try:
+                        write_dataset(writers, dataset, result, core_datasets, corecog_datasets)
+                    except Exception as e:
+                        logger.error(f"Failed to write {dataset}: {e}")
+                        skipped.append(dataset)
+                scheduler.done(dataset)
+                progress.advance(estimates[dataset]['cost'], dataset)
+                del result
+                gc.collect()
+
+            if next_index >= len(order):
+                break
+
+            finished, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in finished:
+                dataset = futures.pop(future)
+                try:
+                    buffer[dataset] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to process {dataset}: {e}")
+                    skipped.append(dataset)
+                    buffer[dataset] = None
+
+    return skipped
 
 
 # === VALIDATION ===
@@ -997,13 +1628,159 @@ def generate_validation_report(
     }
 
 
+# === DIRECT ARCHIVES ===
+
+class CompressedSpool:
+    """
+    Deflate a stream into a temporary file (in memory while small).
+
+    @param compressor: Raw deflate compressor
+    """
+
+    def __init__(self, compressor):
+        self.compressor = compressor
+        self.file = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_MEMORY)
+        self.crc = 0
+        self.size = 0
+
+    def write(self, data: bytes):
+        """Compress and spool data."""
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        self.file.write(self.compressor.compress(data))
+
+    def compressed_chunks(self):
+        """End the stream and read back the compressed data."""
+        self.file.write(self.compressor.flush())
+        self.file.seek(0)
+        yield from read_chunks(self.file, ARCHIVE_CHUNK_SIZE)
+        self.file.close()
+
+
+class CollectionArchive:
+    """
+    Stream one collection's files into its release archive (--direct-archive).
+
+    forms.csv is compressed straight into the archive as datasets are
+    appended. ZIP members cannot be interleaved, so the other tables are
+    compressed into spools and copied into the archive, without being
+    compressed again, when the collection is finished. Compression is the
+    same as in prepare_release.py, so the members match those of an archive
+    built from the files.
+
+    The archive is left without documentation and central directory, as
+    <archive>.part; prepare_release.py --direct-archive adds both.
+
+    @param path: Archive path (e.g., releases/arcaverborum.A.full.20251001.zip)
+    @param base_dir: Directory inside the archive
+    @param version: Release version string (e.g., "A.20251001")
+    @param level: Deflate level
+    @param threads: Compression threads per member
+    @param executor: Thread pool shared by the compressors
+    """
+
+    def __init__(self, path: Path, base_dir: str, version: str, level: int, threads: int, executor: Executor):
+        self.path = path
+        self.part_path = path.with_name(path.name + '.part')
+        self.base_dir = base_dir
+        self.version = version
+        self.level = level
+        self.threads = threads
+        self.executor = executor
+        # Members are dated when the archive is started
+        self.date_time = zip_date_time(time.time())
+
+        self.part_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.part_path, 'wb')
+        self.zip = StreamingZipWriter(self.file)
+        self.forms: Optional[ZipMemberWriter] = None
+        self.spools: Dict[str, CompressedSpool] = {}
+
+    def _compressor(self) -> ParallelDeflater:
+        # Matches prepare_release.py's compressor_for for every size
+        return ParallelDeflater(self.level, self.threads, self.executor)
+
+    def append(self, filename: str, data: bytes):
+        """
+        Append data to one of the collection's tables.
+
+        @param filename: Table file name (one of COLLECTION_CSV_FILES)
+        @param data: Encoded CSV data
+        """
+        if filename == 'forms.csv':
+            if self.forms is None:
+                # The final size is not known in advance, so allow for more than 4 GB
+                self.forms = self.zip.open_member(f'{self.base_dir}/forms.csv', self.date_time,
+                                                  self._compressor(), zip64=True)
+            self.forms.write(data)
+        else:
+            if filename not in self.spools:
+                self.spools[filename] = CompressedSpool(self._compressor())
+            self.spools[filename].write(data)
+
+    def write_tables(self):
+        """End forms.csv and copy the spooled tables into the archive."""
+        if self.forms is not None:
+            self.forms.close()
+        for filename in COLLECTION_CSV_FILES:
+            spool = self.spools.pop(filename, None)
+            if spool is not None:
+                self.zip.write_raw_member(f'{self.base_dir}/{filename}', spool.compressed_chunks(),
+                                          spool.crc, spool.size, self.date_time)
+
+    def add_file(self, path: Path):
+        """Add a file written to disk (e.g., sources.bib) to the archive."""
+        with open(path, 'rb') as f:
+            self.zip.write_member(f'{self.base_dir}/{path.name}', read_chunks(f, ARCHIVE_CHUNK_SIZE),
+                                  self.date_time, self._compressor(), size_hint=path.stat().st_size)
+
+    def close(self) -> dict:
+        """
+        Close the partial archive.
+
+        @return: Archive record for manifest.json (path, size, members, ...)
+        """
+        self.file.close()
+        return {
+            'path': str(self.part_path),
+            'version': self.version,
+            'size': self.zip.offset,
+            'level': self.level,
+            'date_time': list(self.date_time),
+            'members': [member.to_dict() for member in self.zip.members],
+        }
+
+
+def open_collection_archives(writers: Dict[str, 'CollectionWriter'], version: Optional[str],
+                             level: int, threads: int, executor: Executor) -> str:
+    """
+    Attach a release archive to every collection writer (--direct-archive).
+
+    @param writers: Writers from create_collection_writers
+    @param version: Release version string (default: today's, as in prepare_release.py)
+    @param level: Deflate level
+    @param threads: Compression threads per member
+    @param executor: Thread pool shared by the compressors
+    @return: Release version
+    """
+    from prepare_release import MAJOR_VERSION, archive_location
+
+    if version is None:
+        version = f"{MAJOR_VERSION}.{time.strftime('%Y%m%d')}"
+    for name, writer in writers.items():
+        path, base_dir = archive_location(version, name, 'zip')
+        writer.archive = CollectionArchive(path, base_dir, version, level, threads, executor)
+        logger.info(f"Streaming {name} collection into {writer.archive.part_path}")
+    return version
+
+
 # === OUTPUT ===
 
 # Removed write_parquet_files - no longer needed (streaming CSV appends instead)
 
 
-def write_bibtex_file(all_bibtex: List[str], output_dir: Path):
-    """Write merged BibTeX file."""
+def write_bibtex_file(all_bibtex: List[str], output_dir: Path) -> str:
+    """Write merged BibTeX file; return its content."""
     logger.info("Writing BibTeX file...")
 
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -1014,6 +1791,7 @@ def write_bibtex_file(all_bibtex: List[str], output_dir: Path):
         f.write(merged_content)
 
     logger.info(f"Wrote merged BibTeX to {output_dir / 'sources.bib'}")
+    return merged_content
 
 
 def write_validation_report(report: dict, output_dir: Path):
@@ -1031,6 +1809,393 @@ def write_validation_report(report: dict, output_dir: Path):
 # Removed write_requirements_txt - requirements.txt is in repo root
 
 
+class CollectionWriter:
+    """
+    Stream processed datasets into one collection's output files.
+
+    Datasets must be added in output order (sorted by name). Keeps the
+    collection's validation statistics, forms index and file manifest
+    (digests of the data as it is appended), and writes the per-collection
+    files (metadata.csv, sources.bib, validation report, forms index,
+    manifest.json) in finish(). With an archive attached (--direct-archive),
+    the tables are streamed into the release archive instead of files.
+    """
+
+    def __init__(self, name: str, label: str, output_dir: Path, dry_run: bool = False):
+        self.name = name
+        self.label = label
+        self.output_dir = output_dir
+        self.dry_run = dry_run
+        self.archive: Optional[CollectionArchive] = None
+        self.validator = ValidationAccumulator()
+        self.index = FormsIndexAccumulator()
+        self.manifest = ManifestBuilder(name, output_dir)
+        self.forms_header = render_csv_header(FORMS_OUTPUT_COLUMNS)
+        self.count = 0
+
+    def add(self, dataset: str, result: tuple, stats: ValidationAccumulator,
+            forms_rows: Optional[bytes] = None, forms_row_starts: Optional[np.ndarray] = None):
+        """
+        Append one processed dataset to the collection.
+
+        @param dataset: Dataset name
+        @param result: Tuple returned by process_dataset
+        @param stats: Validation statistics of the dataset (see dataset_statistics)
+        @param forms_rows: Forms rendered by render_csv_rows (not needed for dry runs)
+        @param forms_row_starts: Row offsets within forms_rows
+        """
+        forms, languages, parameters, _, _, _, _, cognatesets, cognates = result
+
+        self.validator = self.validator.combine(stats)
+        self.count += 1
+
+        if not self.dry_run:
+            if forms_rows is None or forms_row_starts is None:
+                raise ValueError(f"Rendered forms of {dataset} are required to write {self.name}")
+            is_first = (self.count == 1)
+            if is_first:
+                self._append('forms.csv', self.forms_header, None, is_first)
+            offset = self._append('forms.csv', forms_rows, len(forms_row_starts), False, dataset)
+            self.index.update(forms, offset + forms_row_starts)
+
+            for csv_file, df in [('languages.csv', languages), ('parameters.csv', parameters),
+                                 ('cognatesets.csv', cognatesets), ('cognates.csv', cognates)]:
+                if is_first:
+                    self._append(csv_file, render_csv(df.iloc[:0], header=True), None, is_first)
+                self._append(csv_file, render_csv(df, header=False), len(df), False, dataset)
+
+    def _append(self, filename: str, data: bytes, rows: Optional[int], is_first: bool,
+                dataset: Optional[str] = None) -> int:
+        """
+        Append encoded CSV data to a table (or its archive member) and the manifest.
+
+        @param dataset: Dataset the data belongs to (None for the header)
+        @return: Byte offset in the table at which the data starts
+        """
+        digest = self.manifest.digest(filename)
+        offset = digest.size
+        if self.archive is not None:
+            self.archive.append(filename, data)
+        else:
+            append_bytes(self.output_dir / filename, data, is_first)
+        digest.update(data, rows, dataset)
+        return offset
+
+    def log_summary(self):
+        """Log dataset, form, language and parameter totals."""
+        logger.info("=" * 60)
+        logger.info(f"{self.label.upper()} COLLECTION SUMMARY")
+        logger.info("=" * 60)
+        logger.info(f"Datasets: {self.validator.datasets_processed}")
+        logger.info(f"Forms: {self.validator.total_forms:,}")
+        logger.info(f"Languages: {self.validator.total_languages:,}")
+        logger.info(f"Parameters: {self.validator.total_parameters:,}")
+
+    def finish(self, report: dict):
+        """
+        Write the per-collection outputs.
+
+        @param report: Validation report from self.validator.generate_report()
+        """
+        if self.dry_run:
+            logger.info(f"{self.label} collection summary: {report['summary']}")
+            return
+
+        logger.info(f"Writing {self.name} collection metadata and reports...")
+        pd.DataFrame(self.validator.all_metadata).to_csv(
+            self.output_dir / 'metadata.csv',
+            index=False,
+            encoding='utf-8'
+        )
+        bibtex = write_bibtex_file(self.validator.all_bibtex, self.output_dir)
+        write_validation_report(report, self.output_dir)
+        self.index.write(self.output_dir)
+
+        # The remaining files are small; digest them from disk
+        for filename in ['metadata.csv', 'sources.bib', 'validation_report.json', 'forms_index.npz']:
+            self.manifest.digest(filename).update_from_file(self.output_dir / filename)
+        self.manifest.digest('metadata.csv').rows = len(self.validator.all_metadata)
+        self.manifest.digest('sources.bib').bibtex_entries = count_bibtex_entries(bibtex)
+
+        archive = None
+        if self.archive is not None:
+            self.archive.write_tables()
+            for filename in ['metadata.csv', 'sources.bib', 'validation_report.json', 'forms_index.npz']:
+                self.archive.add_file(self.output_dir / filename)
+            archive = self.archive.close()
+            logger.info(f"Wrote {self.name} collection data to {archive['path']}")
+        self.manifest.write(archive)
+
+
+def create_collection_writers(output_dir: Path, dry_run: bool = False) -> Dict[str, CollectionWriter]:
+    """
+    Create the writers for the full, core and corecog collections.
+
+    @param output_dir: Root output directory
+    @param dry_run: If True, only accumulate statistics
+    @return: Dictionary of collection name -> CollectionWriter
+    """
+    return {
+        'full': CollectionWriter('full', 'Full', output_dir / 'full', dry_run),
+        'core': CollectionWriter('core', 'Core', output_dir / 'core', dry_run),
+        'corecog': CollectionWriter('corecog', 'CoreCog', output_dir / 'corecog', dry_run),
+    }
+
+
+def dataset_statistics(dataset: str, result: tuple) -> ValidationAccumulator:
+    """
+    Compute the validation statistics of one processed dataset.
+
+    @param dataset: Dataset name
+    @param result: Tuple returned by process_dataset
+    @return: Accumulator covering only this dataset
+    """
+    forms, languages, parameters, metadata, references, bibtex, column_tracking, _, _ = result
+    stats = ValidationAccumulator()
+    stats.update(dataset, forms, languages, parameters, metadata, references, bibtex, column_tracking)
+    return stats
+
+
+def write_dataset(writers: Dict[str, CollectionWriter], dataset: str, result: tuple,
+                  core_datasets: set, corecog_datasets: set):
+    """
+    Append one processed dataset to every collection it belongs to.
+
+    Forms are rendered and statistics computed once; the same rows and
+    statistics are added to every collection.
+
+    @param writers: Writers from create_collection_writers
+    @param dataset: Dataset name
+    @param result: Tuple returned by process_dataset
+    @param core_datasets: Names of core datasets
+    @param corecog_datasets: Names of corecog datasets
+    """
+    forms_rows, forms_row_starts = None, None
+    if not writers['full'].dry_run:
+        forms_rows, forms_row_starts = render_csv_rows(result[0], FORMS_OUTPUT_COLUMNS)
+    stats = dataset_statistics(dataset, result)
+
+    writers['full'].add(dataset, result, stats, forms_rows, forms_row_starts)
+    if dataset in core_datasets:
+        writers['core'].add(dataset, result, stats, forms_rows, forms_row_starts)
+    if dataset in corecog_datasets:
+        writers['corecog'].add(dataset, result, stats, forms_rows, forms_row_starts)
+
+
+def finish_collections(writers: Dict[str, CollectionWriter]):
+    """
+    Log summaries and write reports, metadata, bibliographies and indexes.
+
+    @param writers: Writers from create_collection_writers
+    """
+    for i, writer in enumerate(writers.values()):
+        if i:
+            logger.info("")
+        writer.log_summary()
+
+    logger.info("")
+    logger.info("Generating validation reports...")
+    reports = {name: writer.validator.generate_report() for name, writer in writers.items()}
+
+    if writers['full'].dry_run:
+        logger.info("Dry run mode - no files written")
+
+    for name, writer in writers.items():
+        writer.finish(reports[name])
+
+    if not writers['full'].dry_run:
+        for writer in writers.values():
+            logger.info(f"{writer.label} collection written to {writer.output_dir}")
+
+
+
+# === SHARDING ===
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a --shard argument of the form i/n (1 <= i <= n).
+
+    @param value: Argument value
+    @return: Tuple of (shard, shards)
+    """
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r}, expected i/n with 1 <= i <= n")
+    return int(match.group(1)), int(match.group(2))
+
+
+def select_shard(datasets: List[str], shard: int, shards: int) -> List[str]:
+    """
+    Select a contiguous block of the sorted datasets.
+
+    Blocks are contiguous so that shard outputs can be concatenated in shard
+    order. All machines must see the same datasets (same clone or lockfile).
+
+    @param datasets: All dataset names
+    @param shard: Shard number (1-based)
+    @param shards: Number of shards
+    @return: Dataset names of this shard, sorted
+    """
+    ordered = sorted(datasets)
+    start = (shard - 1) * len(ordered) // shards
+    end = shard * len(ordered) // shards
+    return ordered[start:end]
+
+
+def write_shard_state(output_dir: Path, shard: int, shards: int, datasets: List[str],
+                      skipped: List[str], writers: Dict[str, 'CollectionWriter']):
+    """
+    Write shard.json with the shard's datasets and validation statistics.
+
+    @param output_dir: Shard output directory
+    @param shard: Shard number (1-based)
+    @param shards: Number of shards
+    @param datasets: Datasets of this shard
+    @param skipped: Datasets skipped due to errors
+    @param writers: Writers of the shard's collections
+    """
+    state = {
+        'shard': shard,
+        'shards': shards,
+        'datasets': sorted(datasets),
+        'skipped': sorted(skipped),
+        'collections': {name: writer.validator.to_dict() for name, writer in writers.items()},
+    }
+    with open(output_dir / SHARD_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    logger.info(f"Wrote shard state to {output_dir / SHARD_STATE_FILE}")
+
+
+def copy_file_data(src_path: Path, dst, offset: int = 0) -> int:
+    """
+    Copy a file from an offset to the current position of an open file.
+
+    Uses copy_file_range or sendfile where available, so the data is not
+    read into Python.
+
+    @param src_path: Source file
+    @param dst: Destination file, opened for binary writing (not append mode)
+    @param offset: Source offset to start at
+    @return: Number of bytes copied
+    """
+    count = src_path.stat().st_size - offset
+    dst.flush()
+
+    with open(src_path, 'rb') as src:
+        copied = 0
+        for copy in ('copy_file_range', 'sendfile'):
+            if not hasattr(os, copy):
+                continue
+            try:
+                while copied < count:
+                    if copy == 'copy_file_range':
+                        n = os.copy_file_range(src.fileno(), dst.fileno(), count - copied, offset + copied)
+                    else:
+                        n = os.sendfile(dst.fileno(), src.fileno(), offset + copied, count - copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError as e:
+                # Unsupported for these files (e.g., across file systems); continue with the next method
+                logger.debug(f"{copy} failed for {src_path}: {e}")
+            if copied == count:
+                break
+
+        if copied < count:
+            src.seek(offset + copied)
+            while chunk := src.read(1024 * 1024):
+                dst.write(chunk)
+                copied += len(chunk)
+
+    # The kernel copies bypass Python's file position
+    dst.seek(0, os.SEEK_END)
+    return copied
+
+
+def combine_shards(shard_dirs: List[Path], output_dir: Path):
+    """
+    Combine the outputs of --shard builds into the collections of a single build.
+
+    CSV files are concatenated at the byte level (without repeated headers),
+    forms indexes are shifted and merged, and metadata, bibliographies and
+    validation reports are regenerated from the combined statistics. The
+    result is identical to building all datasets on one machine.
+
+    @param shard_dirs: Output directories of the shard builds
+    @param output_dir: Output directory of the combined collections
+    """
+    states = []
+    for shard_dir in shard_dirs:
+        state_path = shard_dir / SHARD_STATE_FILE
+        if not state_path.exists():
+            logger.error(f"{SHARD_STATE_FILE} not found in {shard_dir}")
+            sys.exit(1)
+        with open(state_path, 'r', encoding='utf-8') as f:
+            states.append((json.load(f), shard_dir))
+    states.sort(key=lambda item: item[0]['shard'])
+
+    shards = states[0][0]['shards']
+    numbers = [state['shard'] for state, _ in states]
+    if any(state['shards'] != shards for state, _ in states) or numbers != list(range(1, shards + 1)):
+        logger.error(f"Expected shards 1..{shards} exactly once, got {numbers}")
+        sys.exit(1)
+
+    datasets = [dataset for state, _ in states for dataset in state['datasets']]
+    if datasets != sorted(set(datasets)):
+        logger.error("Shard datasets overlap or are out of order; were the shards built from the same datasets?")
+        sys.exit(1)
+
+    skipped = [dataset for state, _ in states for dataset in state['skipped']]
+    if skipped:
+        logger.warning(f"Shards skipped {len(skipped)} datasets due to errors: {', '.join(skipped)}")
+
+    logger.info(f"Combining {shards} shards ({len(datasets)} datasets) into {output_dir}")
+
+    writers = create_collection_writers(output_dir)
+    initialize_output_files(*(writer.output_dir for writer in writers.values()))
+
+    for name, writer in writers.items():
+        logger.info(f"Concatenating {name} collection...")
+        for csv_file in COLLECTION_CSV_FILES:
+            parts = [shard_dir / name / csv_file for _, shard_dir in states]
+            parts = [part for part in parts if part.exists()]
+            if not parts:
+                continue
+
+            part_shifts = []
+            with open(writer.output_dir / csv_file, 'wb') as dst:
+                for i, part in enumerate(parts):
+                    header_size = 0
+                    if i:
+                        with open(part, 'rb') as f:
+                            header_size = len(f.readline())
+                    data_start = dst.tell()
+                    part_shifts.append(data_start - header_size)
+                    copy_file_data(part, dst, header_size)
+
+                    if csv_file == 'forms.csv':
+                        writer.index.update_from_file(part.parent / 'forms_index.npz', data_start - header_size)
+
+            # Checksums do not combine, so the concatenated file is hashed; rows
+            # add up and dataset blocks move by the data before them
+            digest = writer.manifest.digest(csv_file)
+            digest.update_from_file(writer.output_dir / csv_file)
+            entries = [load_manifest(part.parent).get(csv_file, {}) for part in parts]
+            if all('rows' in entry for entry in entries):
+                digest.rows = sum(entry['rows'] for entry in entries)
+            if all('blocks' in entry for entry in entries):
+                digest.blocks = []
+                for entry, shift in zip(entries, part_shifts):
+                    digest.blocks += [[dataset, offset + shift, size, sha256]
+                                      for dataset, offset, size, sha256 in entry['blocks']]
+
+        validators = [ValidationAccumulator.from_dict(state['collections'][name]) for state, _ in states]
+        for validator in validators:
+            writer.validator = writer.validator.combine(validator)
+
+    finish_collections(writers)
+
+
 # === MAIN ===
 
 def main():
@@ -1061,12 +2226,68 @@ def main():
         action='store_true',
         help='Process data but do not write output files'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of datasets to process in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--progress-file',
+        type=Path,
+        help='Write progress (fraction, forms/s, ETA) as JSON to this file'
+    )
+    parser.add_argument(
+        '--memory-budget',
+        type=float,
+        help='Memory budget in GB for datasets in flight with --jobs (default: half of RAM)'
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='I/N',
+        help='Build only shard I of N (a contiguous block of the sorted datasets) for --combine'
+    )
+    parser.add_argument(
+        '--combine',
+        type=Path,
+        nargs='+',
+        metavar='SHARD_DIR',
+        help='Combine the outputs of --shard builds into --output instead of merging datasets'
+    )
+    parser.add_argument(
+        '--direct-archive',
+        action='store_true',
+        help='Stream the collection tables into release archives in releases/ instead of CSV files '
+             '(finish them with prepare_release.py --direct-archive)'
+    )
+    parser.add_argument(
+        '--version',
+        help='Release version for --direct-archive (default: today, as in prepare_release.py)'
+    )
+    parser.add_argument(
+        '--compress-level',
+        type=int,
+        choices=range(0, 10),
+        default=6,
+        metavar='0-9',
+        help='Deflate level for --direct-archive (default: 6)'
+    )
 
     args = parser.parse_args()
 
     if args.verbose:
         logger.setLevel(logging.DEBUG)
 
+    if args.direct_archive and (args.dry_run or args.shard or args.combine):
+        logger.error("--direct-archive cannot be combined with --dry-run, --shard or --combine")
+        sys.exit(1)
+
+    if args.combine:
+        combine_shards(args.combine, args.output)
+        logger.info("Done!")
+        return
+
     lexibank_dir = args.input
     output_dir_full = args.output / 'full'
     output_dir_core = args.output / 'core'
@@ -1092,159 +2313,52 @@ def main():
         sys.exit(1)
 
     logger.info(f"Found {len(datasets)} datasets")
+
+    if args.shard:
+        datasets = select_shard(datasets, *args.shard)
+        logger.info(f"Shard {args.shard[0]}/{args.shard[1]}: {len(datasets)} datasets"
+                    + (f" ({datasets[0]} .. {datasets[-1]})" if datasets else ""))
+
     logger.info("Building full, core, and corecog collections")
 
     # Initialize output directories (remove old files)
     if not args.dry_run:
         initialize_output_files(output_dir_full, output_dir_core, output_dir_corecog)
 
-    # Initialize validation accumulators (one for each collection)
-    validator_full = ValidationAccumulator()
-    validator_core = ValidationAccumulator()
-    validator_corecog = ValidationAccumulator()
-
-    # Process datasets one at a time with streaming append
-    skipped = []
-    core_count = 0
-    corecog_count = 0
-    full_count = 0
-
-    for i, dataset in enumerate(sorted(datasets), 1):
-        try:
-            logger.info(f"Processing dataset {i}/{len(datasets)}: {dataset}")
-
-            # Process dataset
-            forms, languages, parameters, metadata, references, bibtex, column_tracking = process_dataset(
-                dataset, lexibank_dir
-            )
-
-            is_core = dataset in core_datasets
-            is_corecog = dataset in corecog_datasets
-
-            # Update validation statistics for full collection (all datasets)
-            validator_full.update(dataset, forms, languages, parameters, metadata,
-                                references, bibtex, column_tracking)
-            full_count += 1
-
-            # Append to full collection CSV files
-            if not args.dry_run:
-                is_first_full = (full_count == 1)
-                append_to_csv(output_dir_full / 'forms.csv', forms, is_first_full, FORMS_OUTPUT_COLUMNS)
-                append_to_csv(output_dir_full / 'languages.csv', languages, is_first_full)
-                append_to_csv(output_dir_full / 'parameters.csv', parameters, is_first_full)
-
-            # If core dataset, also append to core collection
-            if is_core:
-                validator_core.update(dataset, forms, languages, parameters, metadata,
-                                    references, bibtex, column_tracking)
-                core_count += 1
-
-                if not args.dry_run:
-                    is_first_core = (core_count == 1)
-                    append_to_csv(output_dir_core / 'forms.csv', forms, is_first_core, FORMS_OUTPUT_COLUMNS)
-                    append_to_csv(output_dir_core / 'languages.csv', languages, is_first_core)
-                    append_to_csv(output_dir_core / 'parameters.csv', parameters, is_first_core)
-
-            # If corecog dataset, also append to corecog collection
-            if is_corecog:
-                validator_corecog.update(dataset, forms, languages, parameters, metadata,
-                                       references, bibtex, column_tracking)
-                corecog_count += 1
-
-                if not args.dry_run:
-                    is_first_corecog = (corecog_count == 1)
-                    append_to_csv(output_dir_corecog / 'forms.csv', forms, is_first_corecog, FORMS_OUTPUT_COLUMNS)
-                    append_to_csv(output_dir_corecog / 'languages.csv', languages, is_first_corecog)
-                    append_to_csv(output_dir_corecog / 'parameters.csv', parameters, is_first_corecog)
-
-            # Free memory immediately
-            del forms, languages, parameters
-            gc.collect()
-
-        except Exception as e:
-            logger.error(f"Failed to process {dataset}: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
-            skipped.append(dataset)
-            continue
+    # Initialize collection writers (validation, forms index and output files per collection)
+    writers = create_collection_writers(args.output, args.dry_run)
+
+    # Compression threads are shared by all members of the three archives
+    executor = None
+    if args.direct_archive:
+        executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        version = open_collection_archives(writers, args.version, args.compress_level,
+                                           os.cpu_count() or 1, executor)
+
+    # Progress is weighted by estimated forms (dc:extent), not by dataset count
+    estimates = {dataset: estimate_dataset(dataset, lexibank_dir) for dataset in datasets}
+    progress = ProgressTracker('merge', sum(e['cost'] for e in estimates.values()), len(datasets),
+                               unit='forms', progress_file=args.progress_file, log=logger.info)
+
+    if args.jobs > 1:
+        memory_budget = int(args.memory_budget * 1024 ** 3) if args.memory_budget else default_memory_budget()
+        skipped = process_datasets_parallel(datasets, lexibank_dir, writers, core_datasets, corecog_datasets,
+                                            estimates, progress, args.jobs, memory_budget)
+    else:
+        skipped = process_datasets_sequential(datasets, lexibank_dir, writers, core_datasets, corecog_datasets,
+                                              estimates, progress)
 
     if skipped:
         logger.warning(f"Skipped {len(skipped)} datasets due to errors: {', '.join(skipped)}")
 
-    # Summary for all three collections
-    logger.info("=" * 60)
-    logger.info("FULL COLLECTION SUMMARY")
-    logger.info("=" * 60)
-    logger.info(f"Datasets: {validator_full.datasets_processed}")
-    logger.info(f"Forms: {validator_full.total_forms:,}")
-    logger.info(f"Languages: {validator_full.total_languages:,}")
-    logger.info(f"Parameters: {validator_full.total_parameters:,}")
-
-    logger.info("")
-    logger.info("=" * 60)
-    logger.info("CORE COLLECTION SUMMARY")
-    logger.info("=" * 60)
-    logger.info(f"Datasets: {validator_core.datasets_processed}")
-    logger.info(f"Forms: {validator_core.total_forms:,}")
-    logger.info(f"Languages: {validator_core.total_languages:,}")
-    logger.info(f"Parameters: {validator_core.total_parameters:,}")
-
-    logger.info("")
-    logger.info("=" * 60)
-    logger.info("CoreCog COLLECTION SUMMARY")
-    logger.info("=" * 60)
-    logger.info(f"Datasets: {validator_corecog.datasets_processed}")
-    logger.info(f"Forms: {validator_corecog.total_forms:,}")
-    logger.info(f"Languages: {validator_corecog.total_languages:,}")
-    logger.info(f"Parameters: {validator_corecog.total_parameters:,}")
-
-    # Generate validation reports for all three collections
-    logger.info("")
-    logger.info("Generating validation reports...")
-    validation_report_full = validator_full.generate_report()
-    validation_report_core = validator_core.generate_report()
-    validation_report_corecog = validator_corecog.generate_report()
-
-    # Write outputs for all three collections
-    if not args.dry_run:
-        # Full collection outputs
-        logger.info("Writing full collection metadata and reports...")
-        pd.DataFrame(validator_full.all_metadata).to_csv(
-            output_dir_full / 'metadata.csv',
-            index=False,
-            encoding='utf-8'
-        )
-        write_bibtex_file(validator_full.all_bibtex, output_dir_full)
-        write_validation_report(validation_report_full, output_dir_full)
-
-        # Core collection outputs
-        logger.info("Writing core collection metadata and reports...")
-        pd.DataFrame(validator_core.all_metadata).to_csv(
-            output_dir_core / 'metadata.csv',
-            index=False,
-            encoding='utf-8'
-        )
-        write_bibtex_file(validator_core.all_bibtex, output_dir_core)
-        write_validation_report(validation_report_core, output_dir_core)
-
-        # CORECOG collection outputs
-        logger.info("Writing corecog collection metadata and reports...")
-        pd.DataFrame(validator_corecog.all_metadata).to_csv(
-            output_dir_corecog / 'metadata.csv',
-            index=False,
-            encoding='utf-8'
-        )
-        write_bibtex_file(validator_corecog.all_bibtex, output_dir_corecog)
-        write_validation_report(validation_report_corecog, output_dir_corecog)
-
-        logger.info(f"Full collection written to {output_dir_full}")
-        logger.info(f"Core collection written to {output_dir_core}")
-        logger.info(f"CoreCog collection written to {output_dir_corecog}")
-    else:
-        logger.info("Dry run mode - no files written")
-        logger.info(f"Full collection summary: {validation_report_full['summary']}")
-        logger.info(f"Core collection summary: {validation_report_core['summary']}")
-        logger.info(f"CoreCog collection summary: {validation_report_corecog['summary']}")
+    # Summaries, validation reports and per-collection outputs
+    finish_collections(writers)
+    if args.shard and not args.dry_run:
+        write_shard_state(args.output, *args.shard, datasets, skipped, writers)
+    if executor is not None:
+        executor.shutdown()
+        logger.info(f"Finish the archives with: python prepare_release.py --version {version} --direct-archive")
+    progress.finish()
 
     logger.info("Done!")
 
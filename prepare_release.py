@@ -5,7 +5,7 @@ Prepare Release for Arca Verborum
 
 Automates the creation of Zenodo release archives:
 - Generates documentation from templates
-- Creates ZIP archive with all output files
+- Creates ZIP archive with all output files (and optionally .tar.zst)
 - Computes checksums
 - Updates zenodo.metadata.yml
 - Optionally creates git tag
@@ -15,16 +15,33 @@ Usage:
     python prepare_release.py --version A.20251001  # Explicit version
     python prepare_release.py --force               # Override version check
     python prepare_release.py --git-tag             # Create and push git tag
+    python prepare_release.py --compress-level 9    # Smaller archives, slower
+    python prepare_release.py --tar-zst             # Also create .tar.zst archives
+    python prepare_release.py --direct-archive      # Finish archives from merge_cldf_datasets.py --direct-archive
+    python prepare_release.py --no-delta            # Skip delta packages against the previous release
+    python prepare_release.py --no-member-cache     # Compress every file, ignoring releases/.member-cache
 """
 
 import argparse
+import contextlib
 import datetime
 import hashlib
+import io
 import json
+import os
 import subprocess
 import sys
-import zipfile
+import tarfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import IO, Optional, cast
+
+from manifest import MANIFEST_FILE, count_bibtex_entries, load_manifest, read_manifest
+from progress import ProgressTracker
+from zip_writer import (ZIP64_LIMIT, MemberCache, StreamingZipWriter, ZipMember, compressor_for,
+                        deflate_compressor, read_chunks, zip_date_time)
 
 try:
     import jinja2
@@ -39,19 +56,35 @@ OUTPUT_DIR = Path("output")
 OUTPUT_DIR_FULL = OUTPUT_DIR / "full"
 OUTPUT_DIR_CORE = OUTPUT_DIR / "core"
 OUTPUT_DIR_CORECOG = OUTPUT_DIR / "corecog"
+
+# Collections: name -> (label, output directory), in archive order
+COLLECTIONS = {
+    "full": ("Full", OUTPUT_DIR_FULL),
+    "core": ("Core", OUTPUT_DIR_CORE),
+    "corecog": ("CoreCog", OUTPUT_DIR_CORECOG),
+}
 RELEASES_DIR = Path("releases")
+MEMBER_CACHE_DIR = RELEASES_DIR / ".member-cache"  # Compressed members of the last build, by SHA256
 TEMPLATES_DIR = Path("templates")
 STATE_FILE = Path(".zenodo_state.json")
 METADATA_FILE = Path("zenodo.metadata.yml")
+COPY_BUFFER_SIZE = 1024 * 1024  # Bytes read per chunk when adding files to archives
+PROGRESS_INTERVAL = 5.0  # Seconds between archive progress lines
+DOS_EPOCH = datetime.datetime(1980, 1, 1).timestamp()  # Earliest timestamp a ZIP member can have
+DEFAULT_DEFLATE_LEVEL = 6  # zlib's default
+DEFAULT_ZSTD_LEVEL = 19
 
 # Files to include in release archive
 RELEASE_FILES = [
     "forms.csv",
     "languages.csv",
     "parameters.csv",
+    "cognatesets.csv",
+    "cognates.csv",
     "metadata.csv",
     "sources.bib",
-    "validation_report.json"
+    "validation_report.json",
+    "forms_index.npz"
 ]
 
 
@@ -63,20 +96,6 @@ def die(msg, code=1):
     sys.exit(code)
 
 
-def sha256sum(path: Path) -> str:
-    """
-    Compute SHA256 checksum of a file.
-
-    @param path: Path to file
-    @return: Hex digest of SHA256 hash
-    """
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 def format_bytes(size: int) -> str:
     """
     Format byte size as human-readable string.
@@ -127,12 +146,13 @@ def load_validation_report(output_dir: Path) -> dict:
     return json.loads(report_path.read_text(encoding="utf-8"))
 
 
-def extract_statistics(validation_report: dict, output_dir: Path) -> dict:
+def extract_statistics(validation_report: dict, output_dir: Path, manifest: Optional[dict] = None) -> dict:
     """
     Extract statistics from validation report for templates.
 
     @param validation_report: Parsed validation_report.json
     @param output_dir: Output directory path
+    @param manifest: Up-to-date manifest entries (see manifest.load_manifest)
     @return: Dictionary of statistics
     """
     summary = validation_report.get("summary", {})
@@ -140,12 +160,13 @@ def extract_statistics(validation_report: dict, output_dir: Path) -> dict:
     integrity = validation_report.get("referential_integrity", {})
     versions = validation_report.get("version_distribution", {})
 
-    # Count sources.bib entries
+    # Count sources.bib entries (read the file only if the manifest has no count)
     sources_path = output_dir / "sources.bib"
-    sources_count = 0
-    if sources_path.exists():
-        content = sources_path.read_text(encoding="utf-8")
-        sources_count = content.count("@")
+    sources_count = (manifest or {}).get("sources.bib", {}).get("bibtex_entries")
+    if sources_count is None:
+        sources_count = 0
+        if sources_path.exists():
+            sources_count = count_bibtex_entries(sources_path.read_text(encoding="utf-8"))
 
     return {
         "datasets_count": summary.get("total_datasets", 0),
@@ -188,40 +209,59 @@ def format_version_range(version_dist: dict) -> str:
     return f"{versions[0]}-{versions[-1]}"
 
 
-def compute_checksums(files: list[Path]) -> dict:
+def checksum_key(path: Path) -> str:
+    """Template key for a file's checksum or size (e.g., "forms.csv" -> "forms_csv")."""
+    return path.name.replace(".", "_")
+
+
+class HashingWriter:
     """
-    Compute SHA256 checksums for all files.
+    Write-only file wrapper that computes the SHA256 of everything written.
 
-    @param files: List of file paths
-    @return: Dictionary mapping filenames to checksums
+    The archive writers only append, so the archive checksum is known as
+    soon as the archive is closed.
     """
-    checksums = {}
-    for path in files:
-        if path.exists():
-            checksum = sha256sum(path)
-            # Use safe key names (replace . with _)
-            key = path.name.replace(".", "_")
-            checksums[key] = checksum
-        else:
-            print(f"Warning: File not found for checksum: {path}", file=sys.stderr)
-    return checksums
 
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def add_existing(self, data: bytes):
+        """Account for data already in the file (when appending to it)."""
+        self.sha256.update(data)
+        self.size += len(data)
+
+    def tell(self) -> int:
+        return self.size
 
-def get_file_sizes(files: list[Path]) -> dict:
+    def flush(self):
+        self.f.flush()
+
+
+def get_file_sizes(files: list[Path], manifest: Optional[dict] = None) -> dict:
     """
     Get human-readable file sizes.
 
     @param files: List of file paths
+    @param manifest: Up-to-date manifest entries (see manifest.load_manifest)
     @return: Dictionary mapping filenames to formatted sizes
     """
+    manifest = manifest or {}
     sizes = {}
     for path in files:
-        if path.exists():
+        if path.name in manifest:
+            sizes[checksum_key(path)] = format_bytes(manifest[path.name]["size"])
+        elif path.exists():
             size = path.stat().st_size
-            key = path.name.replace(".", "_")
-            sizes[key] = format_bytes(size)
+            sizes[checksum_key(path)] = format_bytes(size)
         else:
-            sizes[path.name.replace(".", "_")] = "N/A"
+            sizes[checksum_key(path)] = "N/A"
     return sizes
 
 
@@ -247,16 +287,27 @@ def render_template(template_path: Path, context: dict) -> str:
     return template.render(**context)
 
 
-def create_archive(version: str, output_files: list[Path], doc_files: dict[str, str],
-                   collection: str = "full") -> Path:
+def render_release_docs(context: dict) -> dict[str, str]:
     """
-    Create ZIP archive with all release files.
+    Render the documentation files included in each archive.
+
+    @param context: Template context (including data file checksums)
+    @return: Dictionary of filename -> content
+    """
+    return {
+        "DATASET_DESCRIPTION.md": render_template(TEMPLATES_DIR / "DATASET_DESCRIPTION.md.j2", context),
+        "RELEASE_NOTES.md": render_template(TEMPLATES_DIR / "RELEASE_NOTES.md.j2", context)
+    }
+
+
+def archive_location(version: str, collection: str, extension: str) -> tuple[Path, str]:
+    """
+    Archive path and top-level directory for a collection.
 
     @param version: Release version string (e.g., "A.20251008")
-    @param output_files: List of paths to output files
-    @param doc_files: Dictionary of filename -> content for generated docs
     @param collection: Collection name ("full", "core", or "corecog")
-    @return: Path to created ZIP file
+    @param extension: Archive extension ("zip" or "tar.zst")
+    @return: Tuple of (archive path, directory inside the archive)
     """
     # Parse version to extract letter and date
     # Version format: "A.20251008" -> letter="A", date="20251008"
@@ -267,31 +318,594 @@ def create_archive(version: str, output_files: list[Path], doc_files: dict[str,
     version_date = version_parts[1]
 
     # New naming scheme: arcaverborum.A.{collection}.20251008.zip
-    archive_name = f"arcaverborum.{version_letter}.{collection}.{version_date}.zip"
+    archive_name = f"arcaverborum.{version_letter}.{collection}.{version_date}.{extension}"
     # Directory uses hyphens: arcaverborum-A-{collection}-20251008/
     base_dir = f"arcaverborum-{version_letter}-{collection}-{version_date}"
 
-    archive_path = RELEASES_DIR / archive_name
+    return RELEASES_DIR / archive_name, base_dir
+
+
+def hashed_chunks(path: Path, file_hash, progress: ProgressTracker):
+    """
+    Read a file in large chunks, hashing them and reporting progress.
+
+    @param path: File to read
+    @param file_hash: hashlib object updated with every chunk (None if the checksum is known)
+    @param progress: Progress tracker (weighted by bytes)
+    """
+    with open(path, "rb") as f:
+        while chunk := f.read(COPY_BUFFER_SIZE):
+            if file_hash is not None:
+                file_hash.update(chunk)
+            progress.advance(len(chunk), path.name, item_done=False)
+            yield chunk
+
+
+def docs_timestamp(files: list[Path]) -> float:
+    """
+    Timestamp for the generated documentation: that of the newest data file.
+
+    Rebuilding from the same outputs (sequentially or concurrently) then
+    gives identical archives.
+    """
+    return max((f.stat().st_mtime for f in files), default=DOS_EPOCH)
+
+
+def compression_summary(method: str, level: int, raw_size: int, compressed_size: int) -> dict:
+    """Compression method and ratio for the release notes."""
+    return {
+        "method": method,
+        "level": level,
+        "raw_size": format_bytes(raw_size),
+        "compressed_size": format_bytes(compressed_size),
+        "ratio": f"{raw_size / compressed_size:.2f}" if compressed_size else "n/a",
+    }
+
+
+def create_archive(version: str, output_files: list[Path], context: dict,
+                   collection: str = "full", progress_file: Optional[Path] = None,
+                   level: int = DEFAULT_DEFLATE_LEVEL, threads: int = 1,
+                   manifest: Optional[dict] = None, cache: Optional[MemberCache] = None) -> dict:
+    """
+    Create ZIP archive with all release files.
+
+    Every file is read once: its checksum is taken from the merger's
+    manifest or computed while it is compressed, and the archive is hashed
+    as it is written. The documentation lists the
+    data checksums and compression ratio, so it is rendered (with
+    context["checksums"] and context["compression"] set) after the data
+    files have been added.
+
+    Files larger than one block are deflated pigz-style on `threads` threads
+    (see zip_writer.ParallelDeflater); the archive does not depend on the
+    number of threads. Files whose SHA256 is known from the manifest and
+    whose compressed stream is in the member cache are copied from it
+    instead of being compressed again, which gives the same archive.
+
+    Progress is weighted by file size, since forms.csv dominates the archive.
+
+    @param version: Release version string (e.g., "A.20251008")
+    @param output_files: List of paths to output files
+    @param context: Template context for the documentation
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param progress_file: JSON file for machine-readable progress, if any
+    @param level: Deflate level (0-9)
+    @param threads: Compression threads for large files
+    @param manifest: Up-to-date manifest entries (see manifest.load_manifest)
+    @param cache: Cache of compressed members to reuse and add to, if any
+    @return: Dictionary with path, sha256, size, seconds and compression of the archive
+    """
+    manifest = manifest or {}
+    archive_path, base_dir = archive_location(version, collection, "zip")
 
     print(f"Creating archive: {archive_path}")
+    start = time.perf_counter()
+
+    existing_files = [file_path for file_path in output_files if file_path.exists()]
+    progress = ProgressTracker(f"archive {collection}", sum(f.stat().st_size for f in existing_files),
+                               len(existing_files), unit="bytes", progress_file=progress_file,
+                               log=lambda line: print(f"  {line}"), log_interval=PROGRESS_INTERVAL)
+    checksums = {}
+    raw_size = 0
+    compressed_size = 0
+
+    with open(archive_path, "wb") as raw:
+        archive = HashingWriter(raw)
+        with StreamingZipWriter(archive) as zf:
+            # Add output files, hashing each chunk as it is compressed
+            for file_path in output_files:
+                if file_path.exists():
+                    stat = file_path.stat()
+                    name = f"{base_dir}/{file_path.name}"
+                    known_sha256 = manifest[file_path.name]["sha256"] if file_path.name in manifest else None
+                    cached = cache.get(known_sha256, level, stat.st_size) if cache and known_sha256 else None
+                    if cached:
+                        # Unchanged since the cached build: copy the compressed stream
+                        cached_path, info = cached
+                        with open(cached_path, "rb") as f:
+                            member = zf.write_raw_member(name, read_chunks(f, COPY_BUFFER_SIZE), info["crc"],
+                                                         info["file_size"], zip_date_time(stat.st_mtime),
+                                                         stat.st_mode & 0o777)
+                        progress.advance(stat.st_size, file_path.name, item_done=False)
+                    else:
+                        file_hash = None if known_sha256 else hashlib.sha256()
+                        compressor = compressor_for(level, threads, stat.st_size)
+                        if cache:
+                            compressor = cache.recorder(compressor)
+                        member = zf.write_member(
+                            name,
+                            hashed_chunks(file_path, file_hash, progress),
+                            zip_date_time(stat.st_mtime),
+                            compressor,
+                            size_hint=stat.st_size,
+                            mode=stat.st_mode & 0o777
+                        )
+                        if file_hash is not None:
+                            known_sha256 = file_hash.hexdigest()
+                        if cache and known_sha256:
+                            cache.put(known_sha256, level, compressor, member)
+                    checksums[checksum_key(file_path)] = known_sha256
+                    raw_size += member.file_size
+                    compressed_size += member.compress_size
+                    progress.items_done += 1
+                    print(f"  Added: {file_path.name}" + (" (cached)" if cached else ""))
+                else:
+                    print(f"  Warning: Skipping missing file: {file_path.name}", file=sys.stderr)
+
+            # Add generated documentation, now that checksums and ratio are known
+            context["checksums"] = checksums
+            context["compression"] = compression_summary("Deflate (ZIP)", level, raw_size, compressed_size)
+            docs_date_time = zip_date_time(docs_timestamp(existing_files))
+            for filename, content in render_release_docs(context).items():
+                zf.write_member(f"{base_dir}/{filename}", [content.encode("utf-8")], docs_date_time,
+                                deflate_compressor(level))
+                print(f"  Added: {filename}")
+
+    progress.finish()
+    return {
+        "path": archive_path,
+        "sha256": archive.sha256.hexdigest(),
+        "size": archive.size,
+        "seconds": time.perf_counter() - start,
+        "compression": context["compression"],
+        "cache_keys": sorted(cache.used) if cache else [],
+    }
+
+
+def create_tar_zst(version: str, output_files: list[Path], context: dict,
+                   collection: str = "full", level: int = DEFAULT_ZSTD_LEVEL, threads: int = 1) -> dict:
+    """
+    Create a .tar.zst variant of a collection's archive (same contents as the ZIP).
+
+    Requires the optional zstandard package.
+
+    @param version: Release version string (e.g., "A.20251008")
+    @param output_files: List of paths to output files
+    @param context: Template context, with checksums set by create_archive
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param level: Zstandard level (1-22)
+    @param threads: Compression threads
+    @return: Dictionary with path, sha256, size, seconds and compression of the archive
+    """
+    try:
+        import zstandard
+    except ImportError:
+        die("zstandard not installed (needed for --tar-zst). Run: pip install zstandard")
+
+    archive_path, base_dir = archive_location(version, collection, "tar.zst")
+
+    print(f"Creating archive: {archive_path}")
+    start = time.perf_counter()
+
+    existing_files = [file_path for file_path in output_files if file_path.exists()]
+    raw_size = sum(f.stat().st_size for f in existing_files)
+    progress = ProgressTracker(f"tar.zst {collection}", raw_size, len(existing_files), unit="bytes",
+                               log=lambda line: print(f"  {line}"), log_interval=PROGRESS_INTERVAL)
+
+    # threads >= 1 selects zstd's multi-threaded mode, whose output does not depend on the thread count
+    compressor = zstandard.ZstdCompressor(level=level, threads=max(1, threads))
+
+    with open(archive_path, "wb") as raw:
+        archive = HashingWriter(raw)
+        # HashingWriter only implements what the stream writer uses of a binary file
+        with compressor.stream_writer(cast(IO[bytes], archive), closefd=False) as zst:
+            with tarfile.open(fileobj=zst, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                for file_path in existing_files:
+                    info = tar.gettarinfo(file_path, f"{base_dir}/{file_path.name}")
+                    info.uid = info.gid = 0
+                    info.uname = info.gname = ""
+                    with open(file_path, "rb") as f:
+                        tar.addfile(info, f)
+                    progress.advance(info.size, file_path.name)
+                    print(f"  Added: {file_path.name}")
+
+                # Documentation with this archive's compression ratio
+                zst.flush(zstandard.FLUSH_BLOCK)
+                docs_context = {**context,
+                                "archive_name": archive_path.name,
+                                "compression": compression_summary("Zstandard (tar)", level, raw_size, archive.size)}
+                docs_mtime = docs_timestamp(existing_files)
+                for filename, content in render_release_docs(docs_context).items():
+                    data = content.encode("utf-8")
+                    info = tarfile.TarInfo(f"{base_dir}/{filename}")
+                    info.size = len(data)
+                    info.mtime = int(docs_mtime)
+                    info.mode = 0o644
+                    tar.addfile(info, io.BytesIO(data))
+                    print(f"  Added: {filename}")
+
+    progress.finish()
+    return {
+        "path": archive_path,
+        "sha256": archive.sha256.hexdigest(),
+        "size": archive.size,
+        "seconds": time.perf_counter() - start,
+        "compression": docs_context["compression"],
+    }
+
+
+def finish_direct_archive(version: str, collection: str, context: dict, manifest: dict) -> dict:
+    """
+    Finish an archive streamed by merge_cldf_datasets.py --direct-archive.
+
+    The merger wrote the data members to <archive>.part and recorded them,
+    with the data checksums, in the collection's manifest.json. Here the
+    documentation and the central directory are appended; the partial
+    archive is read once for the archive checksum, but nothing is
+    compressed again.
+
+    @param version: Release version string (e.g., "A.20251008")
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param context: Template context for the documentation
+    @param manifest: The collection's manifest (see manifest.read_manifest)
+    @return: Dictionary with path, sha256, size, seconds and compression of the archive
+    """
+    record = manifest["archive"]
+    part_path = Path(record["path"])
+    archive_path, base_dir = archive_location(version, collection, "zip")
+
+    if record["version"] != version:
+        die(f"{part_path} was built for version {record['version']}. Use --version {record['version']}.")
+    if not part_path.exists():
+        die(f"{part_path} not found (already finished?). Run merge_cldf_datasets.py --direct-archive again.")
+    if part_path.stat().st_size != record["size"]:
+        die(f"{part_path} does not match its manifest. Run merge_cldf_datasets.py --direct-archive again.")
+
+    print(f"Finishing archive: {archive_path}")
+    start = time.perf_counter()
+
+    members = [ZipMember.from_dict(member) for member in record["members"]]
+    context["checksums"] = {
+        checksum_key(Path(filename)): entry["sha256"] for filename, entry in manifest["files"].items()
+    }
+    context["compression"] = compression_summary("Deflate (ZIP)", record["level"],
+                                                  sum(member.file_size for member in members),
+                                                  sum(member.compress_size for member in members))
+
+    with open(part_path, "r+b") as raw:
+        archive = HashingWriter(raw)
+        while chunk := raw.read(COPY_BUFFER_SIZE):
+            archive.add_existing(chunk)
+        with StreamingZipWriter(archive, archive.size, members) as zf:
+            for filename, content in render_release_docs(context).items():
+                zf.write_member(f"{base_dir}/{filename}", [content.encode("utf-8")], tuple(record["date_time"]),
+                                deflate_compressor(record["level"]))
+                print(f"  Added: {filename}")
+    os.replace(part_path, archive_path)
+
+    return {
+        "path": archive_path,
+        "sha256": archive.sha256.hexdigest(),
+        "size": archive.size,
+        "seconds": time.perf_counter() - start,
+        "compression": context["compression"],
+    }
+
+
+def release_manifest_path(version: str, collection: str) -> Path:
+    """Path of the manifest saved with a collection's release (releases/<archive>.manifest.json)."""
+    return archive_location(version, collection, "manifest.json")[0]
+
+
+def release_file_entries(output_files: list[Path], manifest: dict, recorded: dict, checksums: dict) -> dict:
+    """
+    Manifest entries of a release's data files, for save_release_manifest.
+
+    Files whose manifest entry was stale (e.g., after a copy changed their
+    modification times) were scanned while archiving; they keep the recorded
+    entry, with its counts and dataset blocks, if the SHA256 computed then
+    matches it.
+
+    @param output_files: Paths of the collection's data files
+    @param manifest: Up-to-date manifest entries (see manifest.load_manifest)
+    @param recorded: All entries of the collection's manifest, stale ones included
+    @param checksums: SHA256 of each archived file, by checksum_key
+    @return: Filename -> manifest entry
+    """
+    entries = {}
+    for f in output_files:
+        if f.name in manifest:
+            entries[f.name] = manifest[f.name]
+        elif f.exists():
+            entry = {"size": f.stat().st_size, "sha256": checksums[checksum_key(f)]}
+            stale = recorded.get(f.name)
+            if stale and (stale.get("size"), stale.get("sha256")) == (entry["size"], entry["sha256"]):
+                entry = stale
+            entries[f.name] = entry
+    return entries
+
+
+def save_release_manifest(version: str, collection: str, files: dict):
+    """
+    Save the data file manifest of a release, for the next release's delta.
+
+    @param version: Release version string (e.g., "A.20251008")
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param files: Filename -> manifest entry (size, sha256 and, for tables, dataset blocks)
+    """
+    path = release_manifest_path(version, collection)
+    entries = {filename: {k: v for k, v in entry.items() if k != "mtime_ns"} for filename, entry in files.items()}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"collection": collection, "version": version, "files": entries}, f, indent=2)
+
+
+def create_delta(version: str, collection: str, previous_version: str, output_dir: Path,
+                 files: dict, docs: dict[str, str], level: int = DEFAULT_DEFLATE_LEVEL) -> Optional[dict]:
+    """
+    Create a delta package from the previous release to this one.
+
+    Tables with dataset blocks in both releases' manifests are shipped as
+    the blocks that changed or were added; apply_delta.py copies the others
+    from the previous release. Files without blocks (metadata.csv,
+    sources.bib, validation_report.json, forms_index.npz, documentation)
+    are shipped whole. The package includes apply_delta.py.
+
+    @param version: Release version string (e.g., "A.20251008")
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param previous_version: Version to create the delta against
+    @param output_dir: Collection output directory (new data files)
+    @param files: Filename -> manifest entry of this release (see save_release_manifest)
+    @param docs: Generated documentation (filename -> content)
+    @param level: Deflate level
+    @return: Dictionary with path, sha256, size and dataset changes, or None if the
+             previous release has no saved manifest or no table has dataset blocks
+             in both manifests
+    """
+    previous_path = release_manifest_path(previous_version, collection)
+    if not previous_path.exists():
+        print(f"  No {previous_path} to create a delta against; skipping delta")
+        return None
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = json.load(f)["files"]
+    # Without a table that has dataset blocks in both releases, the delta
+    # could not tell which datasets changed
+    if not any("blocks" in files.get(filename, {}) and "blocks" in previous.get(filename, {})
+               for filename in RELEASE_FILES):
+        print(f"  No dataset blocks shared with {previous_path}; skipping delta")
+        return None
+
+    delta_path, _ = archive_location(version, collection, f"delta-{previous_version}.zip")
+    print(f"Creating delta: {delta_path}")
+    date_time = zip_date_time(docs_timestamp([output_dir / filename for filename in files]))
+
+    tables = {}
+    whole = {}
+    old_datasets: set[str] = set()
+    new_datasets: set[str] = set()
+    changed: set[str] = set()
+
+    with open(delta_path, "wb") as raw:
+        archive = HashingWriter(raw)
+        with StreamingZipWriter(archive) as zf:
+            for filename in RELEASE_FILES:
+                entry, old_entry = files.get(filename), previous.get(filename)
+                if entry is None:
+                    continue
+                if "blocks" not in entry or old_entry is None or "blocks" not in old_entry:
+                    with open(output_dir / filename, "rb") as f:
+                        zf.write_member(f"files/{filename}", read_chunks(f, COPY_BUFFER_SIZE), date_time,
+                                        compressor_for(level, 1, entry["size"]), size_hint=entry["size"])
+                    whole[filename] = {"size": entry["size"], "sha256": entry["sha256"]}
+                    continue
+
+                # Blocks of the previous release, by dataset
+                old_blocks = {dataset: (offset, sha256) for dataset, offset, _, sha256 in old_entry["blocks"]}
+                old_datasets.update(old_blocks)
+                blocks = []
+                member = zf.open_member(f"tables/{filename}", date_time, compressor_for(level, 1, entry["size"]),
+                                        zip64=entry["size"] * 1.05 > ZIP64_LIMIT)
+                with open(output_dir / filename, "rb") as f:
+                    header_size = entry["blocks"][0][1] if entry["blocks"] else entry["size"]
+                    header = f.read(header_size).decode("utf-8")
+                    delta_offset = 0
+                    for dataset, offset, size, sha256 in entry["blocks"]:
+                        new_datasets.add(dataset)
+                        if dataset in old_blocks and old_blocks[dataset][1] == sha256:
+                            blocks.append({"dataset": dataset, "source": "old", "offset": old_blocks[dataset][0],
+                                           "size": size, "sha256": sha256})
+                            continue
+                        if dataset in old_blocks:
+                            changed.add(dataset)
+                        f.seek(offset)
+                        member.write(f.read(size))
+                        blocks.append({"dataset": dataset, "source": "delta", "offset": delta_offset,
+                                       "size": size, "sha256": sha256})
+                        delta_offset += size
+                member.close()
+                tables[filename] = {"header": header, "size": entry["size"], "sha256": entry["sha256"],
+                                    "blocks": blocks}
+
+            for filename, content in docs.items():
+                data = content.encode("utf-8")
+                zf.write_member(f"files/{filename}", [data], date_time, deflate_compressor(level))
+                whole[filename] = {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+            datasets = {
+                "changed": sorted(changed),
+                "added": sorted(new_datasets - old_datasets),
+                "removed": sorted(old_datasets - new_datasets),
+            }
+            info = {
+                "collection": collection,
+                "from_version": previous_version,
+                "to_version": version,
+                "datasets": datasets,
+                "tables": tables,
+                "files": whole,
+            }
+            zf.write_member("delta.json", [json.dumps(info, indent=2).encode("utf-8")], date_time,
+                            deflate_compressor(level))
+            with open(Path(__file__).parent / "apply_delta.py", "rb") as f:
+                zf.write_member("apply_delta.py", [f.read()], date_time, deflate_compressor(level), mode=0o755)
+
+    print(f"  {len(datasets['changed'])} changed, {len(datasets['added'])} added, "
+          f"{len(datasets['removed'])} removed datasets since {previous_version}")
+    return {
+        "path": delta_path,
+        "sha256": archive.sha256.hexdigest(),
+        "size": archive.size,
+        "from_version": previous_version,
+        **datasets,
+    }
+
+
+def collection_progress_file(progress_file: Optional[Path], collection: str) -> Optional[Path]:
+    """Per-collection progress file (progress.json -> progress.full.json), if progress is requested."""
+    if progress_file is None:
+        return None
+    return progress_file.with_name(f"{progress_file.stem}.{collection}{progress_file.suffix}")
+
+
+def print_collection_header(index: int, collection: str):
+    """Print the section header for a collection."""
+    label, _ = COLLECTIONS[collection]
+    print(("\n" if index else "") + "=" * 70)
+    print(f"{label.upper()} COLLECTION")
+    print("=" * 70)
+
+
+def prepare_collection(collection: str, version: str, context: dict, compression: dict,
+                       progress_file: Optional[Path] = None, direct: bool = False,
+                       previous_version: Optional[str] = None) -> dict:
+    """
+    Build the release archive of one collection.
+
+    @param collection: Collection name ("full", "core", or "corecog")
+    @param version: Release version string (e.g., "A.20251008")
+    @param context: Template context shared by all collections
+    @param compression: Compression options (deflate_level, zstd_level, threads, tar_zst, member_cache)
+    @param progress_file: JSON file for machine-readable progress, if any
+    @param direct: Finish the archive written by merge_cldf_datasets.py --direct-archive
+    @param previous_version: Release to create a delta package against, if any
+    @return: Dictionary with stats, path, sha256 and size of the archive, its
+             compression, and the same for the .tar.zst variant ("tar_zst") and
+             the delta package ("delta"), if built
+    """
+    label, output_dir = COLLECTIONS[collection]
+    output_files = [output_dir / f for f in RELEASE_FILES]
+
+    # Sizes, checksums and counts from the merger's manifest; stale or
+    # missing entries are recomputed from the files
+    if direct:
+        # The tables are only in the partial archive, so the manifest is all there is
+        direct_manifest = read_manifest(output_dir) or {}
+        if "archive" not in direct_manifest:
+            die(f"No direct archive recorded in {output_dir / MANIFEST_FILE}. "
+                "Run merge_cldf_datasets.py --direct-archive first.")
+        manifest = direct_manifest["files"]
+    else:
+        manifest = load_manifest(output_dir)
+        known = sum(1 for f in output_files if f.name in manifest)
+        if known == len(output_files):
+            print("Using manifest.json for file sizes and checksums")
+        else:
+            print(f"manifest.json up to date for {known}/{len(output_files)} files; scanning the others")
 
-    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        # Add output files
-        for file_path in output_files:
-            if file_path.exists():
-                arcname = f"{base_dir}/{file_path.name}"
-                zf.write(file_path, arcname)
-                print(f"  Added: {file_path.name}")
-            else:
-                print(f"  Warning: Skipping missing file: {file_path.name}", file=sys.stderr)
+    # Load validation report and extract statistics
+    print("Loading validation report...")
+    validation_report = load_validation_report(output_dir)
+    stats = extract_statistics(validation_report, output_dir, manifest)
+
+    file_sizes = get_file_sizes(output_files, manifest)
+
+    # Parse version for naming
+    version_letter, version_date = version.split(".")
+
+    context = {
+        **context,
+        "archive_name": f"arcaverborum.{version_letter}.{collection}.{version_date}.zip",
+        "dir_name": f"arcaverborum-{version_letter}-{collection}-{version_date}",
+        "collection": collection,
+        "collection_name": f"{label} Collection",
+        "file_sizes": file_sizes,
+
+        # Format version ranges
+        "glottolog_versions": format_version_range(stats["glottolog_version_dist"]),
+        "concepticon_versions": format_version_range(stats["concepticon_version_dist"]),
+        "clts_versions": format_version_range(stats["clts_version_dist"]),
+
+        **stats
+    }
+
+    # Create archive (documentation is rendered once the data checksums are known)
+    if direct:
+        result = finish_direct_archive(version, collection, context, direct_manifest)
+    else:
+        print("Creating release archive...")
+        cache = MemberCache(MEMBER_CACHE_DIR) if compression["member_cache"] else None
+        result = create_archive(version, output_files, context, collection, progress_file,
+                                compression["deflate_level"], compression["threads"], manifest, cache)
+    if compression["tar_zst"]:
+        result["tar_zst"] = create_tar_zst(version, output_files, context, collection,
+                                           compression["zstd_level"], compression["threads"])
+
+    for archive in [result, result.get("tar_zst")]:
+        if archive:
+            print(f"\n{label} archive created: {archive['path']}")
+            print(f"  Size: {format_bytes(archive['size'])}")
+            print(f"  SHA256: {archive['sha256']}")
+            print(f"  Compression: {archive['compression']['method']} level {archive['compression']['level']}, "
+                  f"ratio {archive['compression']['ratio']}, {archive['seconds']:.1f}s")
+
+    # Save the manifest with the release, for the next release's delta
+    recorded = manifest if direct else (read_manifest(output_dir) or {"files": {}})["files"]
+    release_files = release_file_entries(output_files, manifest, recorded, context["checksums"])
+    save_release_manifest(version, collection, release_files)
+
+    if previous_version:
+        print()
+        if direct:
+            print("Delta packages need the collection files in output/; skipping delta")
+        else:
+            result["delta"] = create_delta(version, collection, previous_version, output_dir, release_files,
+                                           render_release_docs(context), compression["deflate_level"])
+        if result.get("delta"):
+            print(f"{label} delta created: {result['delta']['path']} ({format_bytes(result['delta']['size'])})")
 
-        # Add generated documentation
-        for filename, content in doc_files.items():
-            arcname = f"{base_dir}/{filename}"
-            zf.writestr(arcname, content.encode("utf-8"))
-            print(f"  Added: {filename}")
+    result["stats"] = stats
+    return result
 
-    return archive_path
+
+def prepare_collection_captured(*args) -> tuple[Optional[dict], str, str, int]:
+    """
+    Run prepare_collection in a worker process, capturing its output.
+
+    The parent prints the output of each collection in order, so the log
+    is the same as for a sequential build.
+
+    @return: Tuple of (result or None, stdout, stderr, exit code)
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    result, exit_code = None, 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            result = prepare_collection(*args)
+        except SystemExit as e:  # die()
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+    return result, stdout.getvalue(), stderr.getvalue(), exit_code
 
 
 def update_metadata_file(version: str, archive_paths: list[Path]):
@@ -508,6 +1122,60 @@ def main():
         type=str,
         help="Known issues for this release"
     )
+    parser.add_argument(
+        "--progress-file",
+        type=Path,
+        help="Write archive progress (fraction, bytes/s, ETA) as JSON, one file per collection "
+             "(e.g., progress.json -> progress.full.json)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=len(COLLECTIONS),
+        help=f"Number of archives to build concurrently (default: {len(COLLECTIONS)})"
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(0, 10),
+        default=DEFAULT_DEFLATE_LEVEL,
+        metavar="0-9",
+        help=f"Deflate level for the ZIP archives (default: {DEFAULT_DEFLATE_LEVEL})"
+    )
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        help="Compression threads per archive (default: CPUs / --jobs)"
+    )
+    parser.add_argument(
+        "--tar-zst",
+        action="store_true",
+        help="Also create .tar.zst archives (requires zstandard) and publish them with the ZIPs"
+    )
+    parser.add_argument(
+        "--zstd-level",
+        type=int,
+        choices=range(1, 23),
+        default=DEFAULT_ZSTD_LEVEL,
+        metavar="1-22",
+        help=f"Zstandard level for --tar-zst (default: {DEFAULT_ZSTD_LEVEL})"
+    )
+    parser.add_argument(
+        "--no-member-cache",
+        action="store_true",
+        help="Compress every file instead of reusing unchanged members from the previous build"
+    )
+    parser.add_argument(
+        "--no-delta",
+        action="store_true",
+        help="Do not create delta packages against the previous release"
+    )
+    parser.add_argument(
+        "--direct-archive",
+        action="store_true",
+        help="Finish the archives streamed by merge_cldf_datasets.py --direct-archive "
+             "(adds documentation; the data is not read from output/)"
+    )
 
     args = parser.parse_args()
 
@@ -528,8 +1196,11 @@ def main():
     if not OUTPUT_DIR_CORECOG.exists():
         die(f"CoreCog collection directory not found: {OUTPUT_DIR_CORECOG}. Run merge_cldf_datasets.py first.")
 
-    # Verify all required files exist in all directories
-    for output_dir, name in [(OUTPUT_DIR_FULL, "full"), (OUTPUT_DIR_CORE, "core"), (OUTPUT_DIR_CORECOG, "corecog")]:
+    # Verify all required files exist in all directories (direct archives already hold them)
+    if args.direct_archive and args.tar_zst:
+        die("--tar-zst needs the collection files in output/, which --direct-archive does not write.")
+    collection_dirs = [(OUTPUT_DIR_FULL, "full"), (OUTPUT_DIR_CORE, "core"), (OUTPUT_DIR_CORECOG, "corecog")]
+    for output_dir, name in [] if args.direct_archive else collection_dirs:
         missing_files = []
         for filename in RELEASE_FILES:
             if not (output_dir / filename).exists():
@@ -550,166 +1221,13 @@ def main():
     processing_date = today.strftime("%Y-%m-%d")
     is_first_release = len(state.get("releases", {})) == 0
 
-    # === PROCESS FULL COLLECTION ===
-    print("=" * 70)
-    print("FULL COLLECTION")
-    print("=" * 70)
-
-    # Load validation report and extract statistics
-    print("Loading validation report...")
-    validation_report_full = load_validation_report(OUTPUT_DIR_FULL)
-    stats_full = extract_statistics(validation_report_full, OUTPUT_DIR_FULL)
-
-    # Compute checksums and file sizes
-    output_files_full = [OUTPUT_DIR_FULL / f for f in RELEASE_FILES]
-    checksums_full = compute_checksums(output_files_full)
-    file_sizes_full = get_file_sizes(output_files_full)
-
-    # Parse version for naming
-    version_parts = version.split(".")
-    version_letter = version_parts[0]
-    version_date = version_parts[1]
+    # Delta packages are built against the latest earlier release
+    previous_version = None
+    if not args.no_delta:
+        previous_version = max((v for v in state.get("releases", {}) if v < version), default=None)
 
-    context_full = {
-        "version": version,
-        "archive_name": f"arcaverborum.{version_letter}.full.{version_date}.zip",
-        "dir_name": f"arcaverborum-{version_letter}-full-{version_date}",
-        "collection": "full",
-        "collection_name": "Full Collection",
-        "release_date": processing_date,
-        "processing_date": processing_date,
-        "year": today.year,
-        "doi": "10.5281/zenodo.XXXXXXX",  # Placeholder, filled by Zenodo
-        "is_first_release": is_first_release,
-        "changes": args.changes or "",
-        "known_issues": args.known_issues or "",
-        "checksums": checksums_full,
-        "file_sizes": file_sizes_full,
-        "next_release": None,
-
-        # Format version ranges
-        "glottolog_versions": format_version_range(stats_full["glottolog_version_dist"]),
-        "concepticon_versions": format_version_range(stats_full["concepticon_version_dist"]),
-        "clts_versions": format_version_range(stats_full["clts_version_dist"]),
-
-        **stats_full
-    }
-
-    # Render documentation for full collection
-    print("Generating documentation...")
-    dataset_desc_full = render_template(
-        TEMPLATES_DIR / "DATASET_DESCRIPTION.md.j2",
-        context_full
-    )
-    release_notes_full = render_template(
-        TEMPLATES_DIR / "RELEASE_NOTES.md.j2",
-        context_full
-    )
-
-    # Create full archive
-    print("Creating release archive...")
-    doc_files_full = {
-        "DATASET_DESCRIPTION.md": dataset_desc_full,
-        "RELEASE_NOTES.md": release_notes_full
-    }
-    archive_path_full = create_archive(version, output_files_full, doc_files_full, "full")
-
-    # Compute archive checksum
-    archive_checksum_full = sha256sum(archive_path_full)
-    archive_size_full = format_bytes(archive_path_full.stat().st_size)
-
-    print(f"\nFull archive created: {archive_path_full}")
-    print(f"  Size: {archive_size_full}")
-    print(f"  SHA256: {archive_checksum_full}")
-
-    # === PROCESS CORE COLLECTION ===
-    print("\n" + "=" * 70)
-    print("CORE COLLECTION")
-    print("=" * 70)
-
-    # Load validation report and extract statistics
-    print("Loading validation report...")
-    validation_report_core = load_validation_report(OUTPUT_DIR_CORE)
-    stats_core = extract_statistics(validation_report_core, OUTPUT_DIR_CORE)
-
-    # Compute checksums and file sizes
-    output_files_core = [OUTPUT_DIR_CORE / f for f in RELEASE_FILES]
-    checksums_core = compute_checksums(output_files_core)
-    file_sizes_core = get_file_sizes(output_files_core)
-
-    context_core = {
-        "version": version,
-        "archive_name": f"arcaverborum.{version_letter}.core.{version_date}.zip",
-        "dir_name": f"arcaverborum-{version_letter}-core-{version_date}",
-        "collection": "core",
-        "collection_name": "Core Collection",
-        "release_date": processing_date,
-        "processing_date": processing_date,
-        "year": today.year,
-        "doi": "10.5281/zenodo.XXXXXXX",  # Placeholder, filled by Zenodo
-        "is_first_release": is_first_release,
-        "changes": args.changes or "",
-        "known_issues": args.known_issues or "",
-        "checksums": checksums_core,
-        "file_sizes": file_sizes_core,
-        "next_release": None,
-
-        # Format version ranges
-        "glottolog_versions": format_version_range(stats_core["glottolog_version_dist"]),
-        "concepticon_versions": format_version_range(stats_core["concepticon_version_dist"]),
-        "clts_versions": format_version_range(stats_core["clts_version_dist"]),
-
-        **stats_core
-    }
-
-    # Render documentation for core collection
-    print("Generating documentation...")
-    dataset_desc_core = render_template(
-        TEMPLATES_DIR / "DATASET_DESCRIPTION.md.j2",
-        context_core
-    )
-    release_notes_core = render_template(
-        TEMPLATES_DIR / "RELEASE_NOTES.md.j2",
-        context_core
-    )
-
-    # Create core archive
-    print("Creating release archive...")
-    doc_files_core = {
-        "DATASET_DESCRIPTION.md": dataset_desc_core,
-        "RELEASE_NOTES.md": release_notes_core
-    }
-    archive_path_core = create_archive(version, output_files_core, doc_files_core, "core")
-
-    # Compute archive checksum
-    archive_checksum_core = sha256sum(archive_path_core)
-    archive_size_core = format_bytes(archive_path_core.stat().st_size)
-
-    print(f"\nCore archive created: {archive_path_core}")
-    print(f"  Size: {archive_size_core}")
-    print(f"  SHA256: {archive_checksum_core}")
-
-    # === PROCESS CoreCog COLLECTION ===
-    print("\n" + "=" * 70)
-    print("CoreCog COLLECTION")
-    print("=" * 70)
-
-    # Load validation report and extract statistics
-    print("Loading validation report...")
-    validation_report_corecog = load_validation_report(OUTPUT_DIR_CORECOG)
-    stats_corecog = extract_statistics(validation_report_corecog, OUTPUT_DIR_CORECOG)
-
-    # Compute checksums and file sizes
-    output_files_corecog = [OUTPUT_DIR_CORECOG / f for f in RELEASE_FILES]
-    checksums_corecog = compute_checksums(output_files_corecog)
-    file_sizes_corecog = get_file_sizes(output_files_corecog)
-
-    context_corecog = {
+    context = {
         "version": version,
-        "archive_name": f"arcaverborum.{version_letter}.corecog.{version_date}.zip",
-        "dir_name": f"arcaverborum-{version_letter}-corecog-{version_date}",
-        "collection": "corecog",
-        "collection_name": "CoreCog Collection",
         "release_date": processing_date,
         "processing_date": processing_date,
         "year": today.year,
@@ -717,48 +1235,63 @@ def main():
         "is_first_release": is_first_release,
         "changes": args.changes or "",
         "known_issues": args.known_issues or "",
-        "checksums": checksums_corecog,
-        "file_sizes": file_sizes_corecog,
         "next_release": None,
-
-        # Format version ranges
-        "glottolog_versions": format_version_range(stats_corecog["glottolog_version_dist"]),
-        "concepticon_versions": format_version_range(stats_corecog["concepticon_version_dist"]),
-        "clts_versions": format_version_range(stats_corecog["clts_version_dist"]),
-
-        **stats_corecog
     }
 
-    # Render documentation for corecog collection
-    print("Generating documentation...")
-    dataset_desc_corecog = render_template(
-        TEMPLATES_DIR / "DATASET_DESCRIPTION.md.j2",
-        context_corecog
-    )
-    release_notes_corecog = render_template(
-        TEMPLATES_DIR / "RELEASE_NOTES.md.j2",
-        context_corecog
-    )
-
-    # Create corecog archive
-    print("Creating release archive...")
-    doc_files_corecog = {
-        "DATASET_DESCRIPTION.md": dataset_desc_corecog,
-        "RELEASE_NOTES.md": release_notes_corecog
+    # === PROCESS COLLECTIONS ===
+    # Each collection's output is printed as a block, in collection order,
+    # whether the archives are built one after another or concurrently
+    jobs = max(1, min(args.jobs, len(COLLECTIONS)))
+    compression = {
+        "deflate_level": args.compress_level,
+        "zstd_level": args.zstd_level,
+        "threads": args.compress_threads or max(1, (os.cpu_count() or 1) // jobs),
+        "tar_zst": args.tar_zst,
+        "member_cache": not args.no_member_cache,
     }
-    archive_path_corecog = create_archive(version, output_files_corecog, doc_files_corecog, "corecog")
-
-    # Compute archive checksum
-    archive_checksum_corecog = sha256sum(archive_path_corecog)
-    archive_size_corecog = format_bytes(archive_path_corecog.stat().st_size)
-
-    print(f"\nCoreCog archive created: {archive_path_corecog}")
-    print(f"  Size: {archive_size_corecog}")
-    print(f"  SHA256: {archive_checksum_corecog}")
-
-    # Update metadata file with all three archives
+    results = {}
+
+    if jobs == 1:
+        for i, collection in enumerate(COLLECTIONS):
+            print_collection_header(i, collection)
+            results[collection] = prepare_collection(collection, version, context, compression,
+                                                     collection_progress_file(args.progress_file, collection),
+                                                     args.direct_archive, previous_version)
+    else:
+        print(f"Building {len(COLLECTIONS)} archives with {jobs} processes...\n")
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                collection: executor.submit(prepare_collection_captured, collection, version, context, compression,
+                                            collection_progress_file(args.progress_file, collection),
+                                            args.direct_archive, previous_version)
+                for collection in COLLECTIONS
+            }
+            for i, (collection, future) in enumerate(futures.items()):
+                result, stdout, stderr, exit_code = future.result()
+                print_collection_header(i, collection)
+                sys.stdout.write(stdout)
+                sys.stderr.write(stderr)
+                if exit_code:
+                    executor.shutdown(cancel_futures=True)
+                    sys.exit(exit_code)
+                results[collection] = result
+
+    # Keep the cache to this build's members, so it does not grow with every release
+    if compression["member_cache"] and not args.direct_archive:
+        used = [key for result in results.values() for key in result["cache_keys"]]
+        removed = MemberCache(MEMBER_CACHE_DIR).prune(used)
+        if removed:
+            print(f"\nRemoved {removed} unused members from {MEMBER_CACHE_DIR}")
+
+    archive_paths = [results[collection]["path"] for collection in COLLECTIONS]
+    if args.tar_zst:
+        archive_paths += [results[collection]["tar_zst"]["path"] for collection in COLLECTIONS]
+    archive_paths += [results[collection]["delta"]["path"] for collection in COLLECTIONS
+                      if results[collection].get("delta")]
+
+    # Update metadata file with all archives
     print("\n" + "=" * 70)
-    update_metadata_file(version, [archive_path_full, archive_path_core, archive_path_corecog])
+    update_metadata_file(version, archive_paths)
 
     # Update state
     if "releases" not in state:
@@ -768,21 +1301,23 @@ def main():
     state["releases"][version] = {
         "date": processing_date,
         "archives": {
-            "full": {
-                "path": str(archive_path_full),
-                "sha256": archive_checksum_full,
-                "size": archive_path_full.stat().st_size
-            },
-            "core": {
-                "path": str(archive_path_core),
-                "sha256": archive_checksum_core,
-                "size": archive_path_core.stat().st_size
-            },
-            "corecog": {
-                "path": str(archive_path_corecog),
-                "sha256": archive_checksum_corecog,
-                "size": archive_path_corecog.stat().st_size
+            collection: {
+                "path": str(result["path"]),
+                "sha256": result["sha256"],
+                "size": result["size"],
+                **({"tar_zst": {
+                    "path": str(result["tar_zst"]["path"]),
+                    "sha256": result["tar_zst"]["sha256"],
+                    "size": result["tar_zst"]["size"]
+                }} if "tar_zst" in result else {}),
+                **({"delta": {
+                    "path": str(result["delta"]["path"]),
+                    "sha256": result["delta"]["sha256"],
+                    "size": result["delta"]["size"],
+                    "from_version": result["delta"]["from_version"]
+                }} if result.get("delta") else {})
             }
+            for collection, result in results.items()
         }
     }
     save_state(state)
@@ -790,7 +1325,7 @@ def main():
     print(f"Updated {STATE_FILE}")
 
     # Build website
-    build_website(version, stats_full, stats_core, stats_corecog)
+    build_website(version, results["full"]["stats"], results["core"]["stats"], results["corecog"]["stats"])
 
     # Create git tag if requested
     if args.git_tag:
@@ -801,14 +1336,17 @@ def main():
     print("SUCCESS! All three archives prepared.")
     print("=" * 70)
     print("\nArchives:")
-    print(f"  Full:    {archive_path_full} ({archive_size_full})")
-    print(f"  Core:    {archive_path_core} ({archive_size_core})")
-    print(f"  CoreCog: {archive_path_corecog} ({archive_size_corecog})")
+    for collection, (label, _) in COLLECTIONS.items():
+        for result in [results[collection], results[collection].get("tar_zst"), results[collection].get("delta")]:
+            if result:
+                print(f"  {label + ':':<8} {result['path']} ({format_bytes(result['size'])})")
     print("\nNext steps:")
     print("  1. Review the archives:")
-    print(f"       unzip -l {archive_path_full}")
-    print(f"       unzip -l {archive_path_core}")
-    print(f"       unzip -l {archive_path_corecog}")
+    for archive_path in archive_paths:
+        if archive_path.suffix == ".zip":
+            print(f"       unzip -l {archive_path}")
+        else:
+            print(f"       tar --zstd -tvf {archive_path}")
     print("  2. Preview Zenodo metadata: python zenodo_publish.py --show")
     print("  3. Test on sandbox: python zenodo_publish.py --sandbox")
     print("  4. Publish to Zenodo: python zenodo_publish.py")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+Weighted Progress Reporting
+
+Progress tracking shared by merge_cldf_datasets.py, clone_lexibank.py and
+prepare_release.py. Each item of work carries a
+weight (forms from dc:extent, bytes, or 1 per repository), so the reported
+fraction, throughput and ETA reflect the actual work left rather than the
+number of items.
+
+Progress is logged and, optionally, written to a JSON file that a build
+dashboard can poll. The file is replaced atomically on every write:
+
+    {
+      "task": "merge",
+      "status": "running",
+      "unit": "forms",
+      "done": 123456, "total": 273000, "fraction": 0.4522,
+      "items_done": 12, "items_total": 149,
+      "current": "northeuralex",
+      "elapsed_seconds": 22.7, "rate": 5432.1, "eta_seconds": 27.5,
+      "updated_at": "2026-01-01T12:00:00+00:00"
+    }
+"""
+
+import datetime
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress file updates (except the first and last)
+WRITE_INTERVAL = 1.0
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as H:MM:SS (or "?" if unknown)."""
+    if seconds is None:
+        return "?"
+    return str(datetime.timedelta(seconds=int(seconds)))
+
+
+class ProgressTracker:
+    """
+    Track weighted progress of a task and report throughput and ETA.
+
+    @param task: Task name (e.g., "merge", "clone", "archive full")
+    @param total: Total weight of all items
+    @param items_total: Number of items
+    @param unit: Unit of the weights (e.g., "forms", "bytes", "repositories")
+    @param progress_file: JSON file to update, if any
+    @param log: Function used to report progress lines
+    @param log_interval: Minimum seconds between progress lines (0 = every update)
+    """
+
+    def __init__(
+        self,
+        task: str,
+        total: float,
+        items_total: int,
+        unit: str = 'rows',
+        progress_file: Optional[Path] = None,
+        log: Callable[[str], None] = logger.info,
+        log_interval: float = 0
+    ):
+        self.task = task
+        self.total = total
+        self.items_total = items_total
+        self.unit = unit
+        self.progress_file = progress_file
+        self.log = log
+        self.log_interval = log_interval
+
+        self.done = 0.0
+        self.items_done = 0
+        self.current: Optional[str] = None
+        self.status = 'running'
+        self.start_time = time.perf_counter()
+        self.last_log = 0.0
+        self.last_write = 0.0
+
+        self.write()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the tracker was created."""
+        return time.perf_counter() - self.start_time
+
+    @property
+    def rate(self) -> Optional[float]:
+        """Throughput in units per second, once anything is done."""
+        if self.done <= 0 or self.elapsed <= 0:
+            return None
+        return self.done / self.elapsed
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds remaining, from the throughput so far."""
+        rate = self.rate
+        if rate is None:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def advance(self, weight: float, item: Optional[str] = None, item_done: bool = True):
+        """
+        Record completed work.
+
+        @param weight: Weight of the completed work
+        @param item: Name of the current item
+        @param item_done: If True, the item is complete (counts towards items_done)
+        """
+        self.done += weight
+        if item_done:
+            self.items_done += 1
+        if item is not None:
+            self.current = item
+
+        now = time.perf_counter()
+        if self.log_interval == 0 or now - self.last_log >= self.log_interval:
+            self.last_log = now
+            self.log(self.summary())
+        if now - self.last_write >= WRITE_INTERVAL:
+            self.write()
+
+    def finish(self, status: str = 'done'):
+        """
+        Mark the task as finished and report the final throughput.
+
+        @param status: Final status ("done" or "failed")
+        """
+        self.status = status
+        self.log(f"{self.task}: {status} - {self.done:,.0f} {self.unit} in "
+                 f"{format_duration(self.elapsed)} ({self.rate or 0:,.0f} {self.unit}/s)")
+        self.write()
+
+    def summary(self) -> str:
+        """One-line progress summary."""
+        fraction = self.done / self.total if self.total else 1.0
+        rate = f"{self.rate:,.0f} {self.unit}/s" if self.rate else "?"
+        return (f"{self.task}: {fraction:.1%} ({self.done:,.0f}/{self.total:,.0f} {self.unit}, "
+                f"{self.items_done}/{self.items_total}) at {rate}, ETA {format_duration(self.eta)}")
+
+    def to_dict(self) -> dict:
+        """Machine-readable progress state."""
+        rate = self.rate
+        eta = self.eta
+        return {
+            'task': self.task,
+            'status': self.status,
+            'unit': self.unit,
+            'done': self.done,
+            'total': self.total,
+            'fraction': round(self.done / self.total, 4) if self.total else 1.0,
+            'items_done': self.items_done,
+            'items_total': self.items_total,
+            'current': self.current,
+            'elapsed_seconds': round(self.elapsed, 1),
+            'rate': round(rate, 1) if rate is not None else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'updated_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        }
+
+    def write(self):
+        """Atomically replace the progress file, if configured."""
+        if self.progress_file is None:
+            return
+        self.last_write = time.perf_counter()
+        tmp_path = self.progress_file.with_name(self.progress_file.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, self.progress_file)
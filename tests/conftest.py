@@ -0,0 +1,7 @@
+"""
+Shared test setup: the scripts live in the repository root.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,201 @@
+"""
+Tests of clone_lexibank.py --via archive against a local HTTP stand-in for GitHub.
+
+The server serves repository tarballs at /<repo>/archive/<ref>.tar.gz with
+ETag, Range/If-Range and If-None-Match support, and redirects
+/<repo>/releases/latest like GitHub does.
+"""
+import hashlib
+import io
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import clone_lexibank
+
+
+def make_tarball(name: str, ref: str, files: dict, commit: str = 'a' * 40) -> bytes:
+    """Build a GitHub-style tarball: <name>-<ref>/ with a commit pax header."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz', format=tarfile.PAX_FORMAT,
+                      pax_headers={'comment': commit}) as tar:
+        for path, content in files.items():
+            data = content.encode('utf-8')
+            info = tarfile.TarInfo(f'{name}-{ref}/{path}')
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves the server's archives (path -> bytes) and latest release tags (repo -> tag)."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.server.requests.append(('HEAD', self.path, {}))
+        repo, _, rest = self.path.strip('/').partition('/')
+        if rest == 'releases/latest':
+            tag = self.server.latest.get(repo)
+            self.send_response(302)
+            self.send_header('Location', f'/{repo}/releases/tag/{tag}' if tag else f'/{repo}/releases')
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def do_GET(self):
+        headers = {key: self.headers[key] for key in ('Range', 'If-Range', 'If-None-Match') if self.headers[key]}
+        self.server.requests.append(('GET', self.path, headers))
+        data = self.server.archives.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        if headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        start = 0
+        if 'Range' in headers and headers.get('If-Range', etag) == etag:
+            start = int(headers['Range'].split('=')[1].rstrip('-'))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    httpd.archives, httpd.latest, httpd.requests = {}, {}, []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session():
+    with clone_lexibank.make_session(2) as session:
+        yield session
+
+
+def add_repo(server, name: str, ref: str, commit: str = 'a' * 40) -> bytes:
+    data = make_tarball(name, ref, {
+        'cldf/forms.csv': 'ID,Form\n1,aqua\n',
+        'cldf/cldf-metadata.json': '{}',
+        'raw/big.txt': 'not needed',
+    }, commit)
+    server.archives[f'/{name}/archive/{ref}.tar.gz'] = data
+    return data
+
+
+def sync(server, session, tmp_path: Path, name: str, ref: str = clone_lexibank.LATEST_REF, locked=None):
+    repo = {'name': name, 'url': f'{server.url}/{name}', 'archive_url': None}
+    (tmp_path / 'lexibank').mkdir(exist_ok=True)
+    return clone_lexibank.fetch_archive(repo, tmp_path / 'lexibank', session, ref, locked)
+
+
+def test_downloads_latest_release_and_extracts_only_cldf(server, session, tmp_path):
+    server.latest['wordlist'] = 'v2.0'
+    add_repo(server, 'wordlist', 'HEAD', 'b' * 40)
+    data = add_repo(server, 'wordlist', 'v2.0')
+
+    assert sync(server, session, tmp_path, 'wordlist') == (True, 'cloned')
+
+    repo_dir = tmp_path / 'lexibank' / 'wordlist'
+    assert (repo_dir / 'cldf' / 'forms.csv').read_text() == 'ID,Form\n1,aqua\n'
+    assert not (repo_dir / 'raw').exists()
+    state = clone_lexibank.read_archive_state(repo_dir)
+    assert state['ref'] == 'v2.0'
+    assert state['archive_url'].endswith('/wordlist/archive/v2.0.tar.gz')
+    assert state['sha256'] == hashlib.sha256(data).hexdigest()
+    assert state['commit'] == 'a' * 40
+    assert not list((tmp_path / 'lexibank' / '.downloads').iterdir())
+
+
+def test_repository_without_release_falls_back_to_head(server, session, tmp_path):
+    add_repo(server, 'unreleased', 'HEAD')
+
+    assert sync(server, session, tmp_path, 'unreleased') == (True, 'cloned')
+    assert clone_lexibank.read_archive_state(tmp_path / 'lexibank' / 'unreleased')['ref'] == 'HEAD'
+
+
+def test_unchanged_archive_is_not_downloaded_again(server, session, tmp_path):
+    add_repo(server, 'wordlist', 'main')
+    assert sync(server, session, tmp_path, 'wordlist', 'main') == (True, 'cloned')
+
+    assert sync(server, session, tmp_path, 'wordlist', 'main') == (True, 'unchanged')
+    assert 'If-None-Match' in server.requests[-1][2]
+
+
+def test_partial_download_is_resumed(server, session, tmp_path):
+    data = add_repo(server, 'wordlist', 'main')
+    downloads = tmp_path / 'lexibank' / '.downloads'
+    downloads.mkdir(parents=True)
+    (downloads / 'wordlist.tar.gz.part').write_bytes(data[:100])
+    (downloads / 'wordlist.tar.gz.etag').write_text('"%s"' % hashlib.md5(data).hexdigest())
+
+    assert sync(server, session, tmp_path, 'wordlist', 'main') == (True, 'cloned')
+    assert server.requests[-1][2]['Range'] == 'bytes=100-'
+    state = clone_lexibank.read_archive_state(tmp_path / 'lexibank' / 'wordlist')
+    assert state['sha256'] == hashlib.sha256(data).hexdigest()
+
+
+def test_complete_part_file_is_used_after_416(server, session, tmp_path):
+    data = add_repo(server, 'wordlist', 'main')
+    downloads = tmp_path / 'lexibank' / '.downloads'
+    downloads.mkdir(parents=True)
+    (downloads / 'wordlist.tar.gz.part').write_bytes(data)
+    (downloads / 'wordlist.tar.gz.etag').write_text('"%s"' % hashlib.md5(data).hexdigest())
+
+    assert sync(server, session, tmp_path, 'wordlist', 'main') == (True, 'cloned')
+    assert [r[0] for r in server.requests] == ['GET']
+    state = clone_lexibank.read_archive_state(tmp_path / 'lexibank' / 'wordlist')
+    assert state['sha256'] == hashlib.sha256(data).hexdigest()
+    assert not list(downloads.iterdir())
+
+
+def test_oversized_part_file_is_downloaded_again_after_416(server, session, tmp_path):
+    data = add_repo(server, 'wordlist', 'main')
+    downloads = tmp_path / 'lexibank' / '.downloads'
+    downloads.mkdir(parents=True)
+    (downloads / 'wordlist.tar.gz.part').write_bytes(data + b'garbage')
+    (downloads / 'wordlist.tar.gz.etag').write_text('"%s"' % hashlib.md5(data).hexdigest())
+
+    assert sync(server, session, tmp_path, 'wordlist', 'main') == (True, 'cloned')
+    assert 'Range' in server.requests[0][2] and 'Range' not in server.requests[1][2]
+    state = clone_lexibank.read_archive_state(tmp_path / 'lexibank' / 'wordlist')
+    assert state['sha256'] == hashlib.sha256(data).hexdigest()
+    assert not list(downloads.iterdir())
+
+
+def test_locked_sync_reproduces_the_locked_archive(server, session, tmp_path):
+    server.latest['wordlist'] = 'v2.0'
+    add_repo(server, 'wordlist', 'v2.0')
+    assert sync(server, session, tmp_path, 'wordlist') == (True, 'cloned')
+    entries, changed = clone_lexibank.update_lock_entries(
+        [{'name': 'wordlist', 'url': f'{server.url}/wordlist'}], [], {}, tmp_path / 'lexibank', 'archive')
+    assert changed == ['wordlist'] and entries['wordlist']['ref'] == 'v2.0'
+
+    server.requests.clear()
+    assert sync(server, session, tmp_path, 'wordlist', locked=entries['wordlist']) == (True, 'unchanged')
+    assert server.requests == []
@@ -0,0 +1,117 @@
+"""
+Tests of clone_lexibank.py in git mode against local bare repositories,
+reached over file:// URLs like remote ones.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'clone_lexibank.py'
+NAMES = ['alpha', 'beta', 'gamma']
+
+
+def git(*args, cwd=None) -> str:
+    return subprocess.run(
+        ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.org', *args],
+        cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def commit(work: Path, forms: str) -> str:
+    """Commit a new cldf/forms.csv in a work tree and push it; return the commit."""
+    (work / 'cldf' / 'forms.csv').write_text(forms, encoding='utf-8')
+    git('add', '-A', cwd=work)
+    git('commit', '-q', '-m', 'Update forms', cwd=work)
+    git('push', '-q', 'origin', 'HEAD', cwd=work)
+    return git('rev-parse', 'HEAD', cwd=work)
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """Bare repositories with cldf/ and raw/, plus a datasets.csv pointing at them."""
+    heads, works = {}, {}
+    for name in NAMES:
+        bare = tmp_path / 'upstream' / f'{name}.git'
+        git('init', '-q', '--bare', '-b', 'main', str(bare))
+        git('-C', str(bare), 'config', 'uploadpack.allowFilter', 'true')
+        work = tmp_path / 'work' / name
+        git('clone', '-q', bare.as_uri(), str(work))
+        (work / 'cldf').mkdir()
+        (work / 'raw').mkdir()
+        (work / 'raw' / 'source.txt').write_text('raw data\n', encoding='utf-8')
+        heads[name] = commit(work, f'ID,Form\n{name}-1,aqua\n')
+        works[name] = work
+
+    rows = ''.join(f'{name},{(tmp_path / "upstream" / f"{name}.git").as_uri()},TRUE,TRUE\n' for name in NAMES)
+    (tmp_path / 'datasets.csv').write_text('NAME,URL,CORE,CoreCog\n' + rows, encoding='utf-8')
+    return {'heads': heads, 'works': works}
+
+
+def sync(tmp_path: Path, *args: str, output: str = 'lexibank') -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), '--csv', 'datasets.csv', '--output-dir', output,
+         '--changed-file', 'changed.txt', *args],
+        cwd=tmp_path, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def changed(tmp_path: Path) -> list:
+    return (tmp_path / 'changed.txt').read_text(encoding='utf-8').split()
+
+
+def test_parallel_sparse_clone(tmp_path, upstream):
+    result = sync(tmp_path, '--jobs', '3')
+
+    assert 'Cloned: 3' in result.stderr
+    for name in NAMES:
+        checkout = tmp_path / 'lexibank' / name
+        assert (checkout / 'cldf' / 'forms.csv').exists()
+        assert not (checkout / 'raw').exists()
+    lock = json.loads((tmp_path / 'lexibank.lock').read_text(encoding='utf-8'))
+    assert {name: entry['commit'] for name, entry in lock.items()} == upstream['heads']
+    assert changed(tmp_path) == NAMES
+
+
+def test_unchanged_heads_are_skipped(tmp_path, upstream):
+    sync(tmp_path, '--jobs', '3')
+
+    result = sync(tmp_path, '--jobs', '3')
+    assert 'Unchanged: 3' in result.stderr
+    assert changed(tmp_path) == []
+
+    head = commit(upstream['works']['beta'], 'ID,Form\nbeta-1,agua\n')
+    result = sync(tmp_path, '--jobs', '3')
+    assert 'Updated: 1' in result.stderr and 'Unchanged: 2' in result.stderr
+    assert changed(tmp_path) == ['beta']
+    assert git('-C', str(tmp_path / 'lexibank' / 'beta'), 'rev-parse', 'HEAD') == head
+
+
+def test_locked_checks_out_the_locked_commits(tmp_path, upstream):
+    sync(tmp_path, '--jobs', '3')
+    commit(upstream['works']['alpha'], 'ID,Form\nalpha-1,agua\n')
+
+    sync(tmp_path, '--locked', output='locked')
+    for name in NAMES:
+        assert git('-C', str(tmp_path / 'locked' / name), 'rev-parse', 'HEAD') == upstream['heads'][name]
+
+
+def test_checkouts_share_the_mirror(tmp_path, upstream):
+    sync(tmp_path, '--jobs', '3', '--mirror-dir', 'mirrors')
+
+    mirror = tmp_path / 'mirrors' / 'alpha.git'
+    alternates = tmp_path / 'lexibank' / 'alpha' / '.git' / 'objects' / 'info' / 'alternates'
+    assert Path(alternates.read_text(encoding='utf-8').strip()) == (mirror / 'objects').resolve()
+    assert git('-C', str(mirror), 'config', 'gc.auto') == '0'
+    assert git('-C', str(mirror), 'config', 'gc.pruneExpire') == 'never'
+
+    # A second output tree is built from the mirrors alone
+    (tmp_path / 'upstream').rename(tmp_path / 'offline')
+    result = sync(tmp_path, '--jobs', '3', '--mirror-dir', 'mirrors', '--locked', output='second')
+    assert 'Cloned: 3' in result.stderr
+    for name in NAMES:
+        assert git('-C', str(tmp_path / 'second' / name), 'rev-parse', 'HEAD') == upstream['heads'][name]
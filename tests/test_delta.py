@@ -0,0 +1,79 @@
+"""
+Tests of prepare_release.py's delta packages, applied with apply_delta.py.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import prepare_release
+from manifest import ManifestBuilder, load_manifest
+
+APPLY_DELTA = Path(__file__).resolve().parent.parent / 'apply_delta.py'
+HEADER = 'ID,Language_ID,Form\n'
+OLD = {'alpha': 'alpha-1,alpha,aqua\n', 'beta': 'beta-1,beta,agua\n', 'gamma': 'gamma-1,gamma,eau\n'}
+NEW = {'alpha': 'alpha-1,alpha,aqua\n', 'beta': 'beta-1,beta,acqua\nbeta-2,beta,agua\n', 'delta': 'delta-1,delta,su\n'}
+
+
+def write_collection(directory: Path, datasets: dict) -> dict:
+    """Write forms.csv dataset by dataset and metadata.csv whole, with their manifest."""
+    directory.mkdir(parents=True, exist_ok=True)
+    builder = ManifestBuilder('full', directory)
+    with open(directory / 'forms.csv', 'wb') as f:
+        digest = builder.digest('forms.csv')
+        header = HEADER.encode('utf-8')
+        f.write(header)
+        digest.update(header)
+        for dataset, rows in datasets.items():
+            data = rows.encode('utf-8')
+            f.write(data)
+            digest.update(data, dataset=dataset)
+    (directory / 'metadata.csv').write_text('ID\n' + ''.join(f'{d}\n' for d in datasets), encoding='utf-8')
+    builder.digest('metadata.csv').update_from_file(directory / 'metadata.csv')
+    builder.write()
+    return load_manifest(directory)
+
+
+@pytest.fixture
+def releases(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prepare_release.RELEASES_DIR.mkdir()
+    old_files = write_collection(tmp_path / 'old', OLD)
+    prepare_release.save_release_manifest('A.20250101', 'full', old_files)
+    return tmp_path
+
+
+def test_delta_rebuilds_the_new_collection(releases):
+    files = write_collection(releases / 'new', NEW)
+    delta = prepare_release.create_delta('A.20260101', 'full', 'A.20250101', releases / 'new', files,
+                                         {'README.md': 'Release notes\n'})
+
+    assert (delta['changed'], delta['added'], delta['removed']) == (['beta'], ['delta'], ['gamma'])
+    result = subprocess.run([sys.executable, str(APPLY_DELTA), 'old', str(delta['path']), 'rebuilt'],
+                            cwd=releases, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    for filename in ['forms.csv', 'metadata.csv']:
+        assert (releases / 'rebuilt' / filename).read_bytes() == (releases / 'new' / filename).read_bytes()
+    assert (releases / 'rebuilt' / 'README.md').read_text(encoding='utf-8') == 'Release notes\n'
+
+
+def test_copied_collection_keeps_its_blocks(releases):
+    write_collection(releases / 'new', NEW)
+    forms = releases / 'new' / 'forms.csv'
+    os.utime(forms, ns=(forms.stat().st_atime_ns, forms.stat().st_mtime_ns + 10 ** 9))
+    manifest = load_manifest(releases / 'new')
+    assert 'forms.csv' not in manifest
+
+    output_files = [releases / 'new' / 'forms.csv', releases / 'new' / 'metadata.csv']
+    recorded = json.loads((releases / 'new' / 'manifest.json').read_text(encoding='utf-8'))['files']
+    checksums = {'forms_csv': recorded['forms.csv']['sha256']}
+    files = prepare_release.release_file_entries(output_files, manifest, recorded, checksums)
+    assert [block[0] for block in files['forms.csv']['blocks']] == ['alpha', 'beta', 'delta']
+
+    # A file that changed since the manifest was written has no blocks to trust
+    files = prepare_release.release_file_entries(output_files, manifest, recorded, {'forms_csv': '0' * 64})
+    assert 'blocks' not in files['forms.csv']
+    assert prepare_release.create_delta('A.20260101', 'full', 'A.20250101', releases / 'new', files, {}) is None
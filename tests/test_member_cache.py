@@ -0,0 +1,51 @@
+"""
+Tests of zip_writer.MemberCache.
+"""
+import hashlib
+import io
+import zipfile
+
+from zip_writer import MemberCache, StreamingZipWriter, compressor_for, read_chunks, zip_date_time
+
+DATA = b''.join(b'form-%d,aqua\n' % i for i in range(20000))
+SHA256 = hashlib.sha256(DATA).hexdigest()
+DATE_TIME = zip_date_time(0)
+
+
+def cached_archive(cache: MemberCache) -> bytes:
+    """Write DATA to an archive, from the cache if it has an intact entry."""
+    output = io.BytesIO()
+    with StreamingZipWriter(output) as zf:
+        cached = cache.get(SHA256, 6, len(DATA))
+        if cached:
+            path, info = cached
+            with open(path, 'rb') as f:
+                zf.write_raw_member('forms.csv', read_chunks(f, 4096), info['crc'], info['file_size'], DATE_TIME)
+        else:
+            compressor = cache.recorder(compressor_for(6, 1, len(DATA)))
+            member = zf.write_member('forms.csv', [DATA], DATE_TIME, compressor)
+            cache.put(SHA256, 6, compressor, member)
+    return output.getvalue()
+
+
+def test_cached_member_gives_the_same_archive(tmp_path):
+    cache = MemberCache(tmp_path)
+    archive = cached_archive(cache)
+    assert cache.get(SHA256, 6, len(DATA)) is not None
+    assert cached_archive(cache) == archive
+
+
+def test_corrupted_entry_is_dropped_and_recompressed(tmp_path):
+    cache = MemberCache(tmp_path)
+    archive = cached_archive(cache)
+    path, _ = cache.get(SHA256, 6, len(DATA))
+    stream = bytearray(path.read_bytes())
+    stream[len(stream) // 2] ^= 0xFF
+    path.write_bytes(bytes(stream))
+
+    assert cache.get(SHA256, 6, len(DATA)) is None
+    assert list(tmp_path.iterdir()) == []
+    rebuilt = cached_archive(cache)
+    assert rebuilt == archive
+    with zipfile.ZipFile(io.BytesIO(rebuilt)) as zf:
+        assert zf.read('forms.csv') == DATA
@@ -0,0 +1,186 @@
+"""
+Tests of zenodo_upload.py and zenodo_publish.py against the local Zenodo
+stand-in in tests/zenodo_stub.py.
+"""
+import json
+
+import pytest
+
+import zenodo_upload
+from zenodo_stub import RETRY_AFTER, ZenodoStub
+
+
+@pytest.fixture
+def stub():
+    server = ZenodoStub().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Record retry delays instead of sleeping (also skips zenodo-client's pauses)."""
+    recorded = []
+    monkeypatch.setattr(zenodo_upload, "BACKOFF_SECONDS", 0.25)
+    monkeypatch.setattr(zenodo_upload.time, "sleep", recorded.append)
+    return recorded
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name, size in [("a.zip", 300_000), ("b.zip", 200_000), ("c.zip", 100)]:
+        path = tmp_path / name
+        path.write_bytes(bytes(i % 251 for i in range(size)))
+        paths.append(path)
+    return paths
+
+
+def bucket_url(stub):
+    deposition = stub.new_deposition({}, {})
+    return f"{stub.url}/api/files/{deposition['bucket']}"
+
+
+def test_uploads_all_files(stub, delays, files):
+    engine = zenodo_upload.UploadEngine("token", workers=3)
+    results = engine.upload_files(bucket_url(stub), files)
+
+    assert [r["status"] for r in results] == ["uploaded"] * 3
+    assert stub.buckets["b1"]["a.zip"] == {"checksum": f"md5:{zenodo_upload.file_md5(files[0])}", "size": 300_000}
+    assert set(stub.tokens) == {"token"}
+    assert delays == []
+
+
+def test_503_is_retried_after_retry_after(stub, delays, files):
+    stub.failures["a.zip"] = ["503", "503"]
+    engine = zenodo_upload.UploadEngine("token", retries=3)
+    results = engine.upload_files(bucket_url(stub), files[:1])
+
+    assert results[0]["status"] == "uploaded"
+    # Backoff of 0.25s and 0.5s, raised to the server's Retry-After
+    assert delays == [float(RETRY_AFTER)] * 2
+    transfer = engine.transfers[0]
+    assert transfer["retries"] == 2
+    assert transfer["errors"] == ["HTTP 503", "HTTP 503"]
+
+
+def test_dropped_connection_and_bad_checksum_are_retried(stub, delays, files):
+    stub.failures["a.zip"] = ["drop"]
+    stub.failures["b.zip"] = ["badsum"]
+    engine = zenodo_upload.UploadEngine("token", retries=2)
+    results = engine.upload_files(bucket_url(stub), files[:2])
+
+    assert [r["status"] for r in results] == ["uploaded", "uploaded"]
+    transfers = {t["name"]: t for t in engine.transfers}
+    assert transfers["a.zip"]["retries"] == 1
+    assert transfers["a.zip"]["errors"][0].startswith("ConnectionError")
+    assert transfers["b.zip"]["errors"] == [f"checksum mismatch: md5:{'0' * 32}"]
+    assert stub.buckets["b1"]["b.zip"]["checksum"] == f"md5:{zenodo_upload.file_md5(files[1])}"
+
+
+def test_second_run_skips_files_with_matching_md5(stub, delays, files):
+    bucket = bucket_url(stub)
+    zenodo_upload.UploadEngine("token").upload_files(bucket, files)
+    files[2].write_bytes(b"changed")
+
+    engine = zenodo_upload.UploadEngine("token")
+    results = engine.upload_files(bucket, files)
+
+    assert [r["status"] for r in results] == ["skipped", "skipped", "uploaded"]
+    summary = zenodo_upload.transfer_summary(engine.transfers, engine.upload_seconds)
+    assert (summary["uploaded"], summary["skipped"], summary["bytes"]) == (1, 2, len(b"changed"))
+
+
+def test_exhausted_retries_raise(stub, delays, files):
+    stub.failures["a.zip"] = ["503"] * 3
+    engine = zenodo_upload.UploadEngine("token", retries=2)
+
+    with pytest.raises(RuntimeError, match="failed after 3 attempt"):
+        engine.upload_files(bucket_url(stub), files[:1])
+    transfer = engine.transfers[0]
+    assert transfer["status"] == "failed"
+    assert transfer["errors"] == ["HTTP 503"] * 3
+    assert "a.zip" not in stub.buckets["b1"]
+
+
+# === zenodo_publish.py (needs zenodo-client) ===
+
+@pytest.fixture
+def publish(stub, delays, files, tmp_path, monkeypatch):
+    """Run zenodo_publish.publish_to_zenodo() against the stub in tmp_path."""
+    zenodo_publish = pytest.importorskip("zenodo_publish")
+    pystow_config = pytest.importorskip("pystow.config_api")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYSTOW_CONFIG_HOME", str(tmp_path / "config"))
+    monkeypatch.setenv(zenodo_publish.TEST_TOKEN_VAR, "test-token")
+    monkeypatch.setenv("ZENODO_API_TOKEN", "production-token")
+    pystow_config._get_cfp.cache_clear()
+
+    def run(version="1.0", paths=files[:2], retries=2):
+        meta = {
+            "title": "Test", "version": version, "description": "Test record",
+            "creators": [{"name": "Tester"}], "files": [{"path": str(p)} for p in paths],
+        }
+        zenodo_publish.publish_to_zenodo(meta, upload_retries=retries, api_url=stub.url)
+        return json.loads(zenodo_publish.TRANSFER_LOG.read_text(encoding="utf-8"))["runs"]
+
+    run.module = zenodo_publish
+    run.key = f"arcaverborum_127_0_0_1_{stub.server_address[1]}"
+    yield run
+    pystow_config._get_cfp.cache_clear()
+
+
+def test_publish_to_test_server(publish, stub):
+    stub.failures["b.zip"] = ["503"]
+    runs = publish()
+
+    assert stub.depositions[1]["submitted"]
+    assert set(stub.tokens) == {"test-token"}
+    assert not publish.module.STATE_FILE.exists()
+    import pystow
+    assert pystow.get_config("zenodo", publish.key) == "1"
+    assert pystow.get_config("zenodo", "arcaverborum") is None
+
+    run = runs[-1]
+    assert run["status"] == "published"
+    assert run["environment"] == stub.url
+    assert {t["name"]: t["status"] for t in run["transfers"]} == {"a.zip": "uploaded", "b.zip": "uploaded"}
+    b = next(t for t in run["transfers"] if t["name"] == "b.zip")
+    assert (b["retries"], b["errors"], b["bytes"]) == (1, ["HTTP 503"], 200_000)
+    for key in ("started_at", "ended_at", "upload_seconds", "bytes_per_second", "response_seconds", "md5_seconds"):
+        assert key in b
+    summary = run["summary"]
+    assert (summary["files"], summary["uploaded"], summary["failed"], summary["retries"]) == (2, 2, 0, 1)
+    assert summary["bytes"] == 500_000
+
+
+def test_new_version_uploads_only_changed_files(publish, stub, files):
+    publish()
+    files[1].write_bytes(b"new contents")
+    runs = publish(version="2.0")
+
+    assert len(stub.depositions) == 2 and stub.depositions[2]["submitted"]
+    assert {t["name"]: t["status"] for t in runs[-1]["transfers"]} == {"a.zip": "skipped", "b.zip": "uploaded"}
+    assert len(runs) == 2
+
+
+def test_failed_first_publication_resumes_its_draft(publish, stub):
+    stub.failures["b.zip"] = ["503"] * 2
+    with pytest.raises(SystemExit):
+        publish(retries=1)
+
+    runs = json.loads(publish.module.TRANSFER_LOG.read_text(encoding="utf-8"))["runs"]
+    assert runs[-1]["status"].startswith("failed")
+    assert runs[-1]["summary"]["failed"] == 1
+    assert not stub.depositions[1]["submitted"]
+
+    runs = publish()
+    assert len(stub.depositions) == 1 and stub.depositions[1]["submitted"]
+    assert {t["name"]: t["status"] for t in runs[-1]["transfers"]} == {"a.zip": "skipped", "b.zip": "uploaded"}
+
+
+def test_test_server_requires_its_own_token(publish, stub, monkeypatch):
+    monkeypatch.delenv(publish.module.TEST_TOKEN_VAR)
+    with pytest.raises(SystemExit):
+        publish()
+    assert stub.tokens == []
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Zenodo deposition API used by
+zenodo_publish.py and zenodo_upload.py.
+
+Depositions, buckets and files are kept in memory. Uploads can be made to
+fail on purpose, per file name, with a list of failures used up one per
+upload: "503" (answered with Retry-After), "drop" (connection closed
+halfway through the body) or "badsum" (stored with a wrong checksum).
+
+Usage:
+    python tests/zenodo_stub.py 8000
+    ZENODO_TEST_API_TOKEN=test python zenodo_publish.py --api-url http://127.0.0.1:8000
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+RETRY_AFTER = "1"  # Retry-After of injected 503 responses, in seconds
+
+
+class ZenodoStub(ThreadingHTTPServer):
+    """
+    In-memory deposition server.
+
+    @param port: Port to listen on (0 for any free port)
+    @type port: int
+    """
+
+    def __init__(self, port: int = 0) -> None:
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.depositions: Dict[int, Dict[str, Any]] = {}
+        self.buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.failures: Dict[str, List[str]] = {}  # File name -> failures of its next uploads
+        self.tokens: List[str] = []  # access_token of every request
+        self.lock = threading.Lock()
+
+    def start(self) -> "ZenodoStub":
+        """Serve from a daemon thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def deposition_json(self, deposition: Dict[str, Any]) -> Dict[str, Any]:
+        """A deposition as the API returns it, with its links."""
+        draft = deposition.get("draft", deposition["id"])
+        return {
+            **{k: v for k, v in deposition.items() if k != "draft"},
+            "links": {
+                "bucket": f"{self.url}/api/files/{deposition['bucket']}",
+                "latest_draft": f"{self.url}/api/deposit/depositions/{draft}",
+            },
+        }
+
+    def new_deposition(self, metadata: Dict[str, Any], files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Create a draft deposition with its own bucket."""
+        deposition_id = len(self.depositions) + 1
+        deposition: Dict[str, Any] = {
+            "id": deposition_id, "submitted": False, "metadata": metadata, "bucket": f"b{deposition_id}",
+        }
+        self.depositions[deposition_id] = deposition
+        self.buckets[deposition["bucket"]] = dict(files)
+        return deposition
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ZenodoStub
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, code: int, data: Any, headers: Dict[str, str] = {}) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def route(self) -> str:
+        path, _, query = self.path.partition("?")
+        token = re.search(r"access_token=([^&]*)", query)
+        with self.server.lock:
+            self.server.tokens.append(token[1] if token else "")
+        return path
+
+    def do_POST(self) -> None:
+        path = self.route()
+        body = self.read_body()
+        if path == "/api/deposit/depositions":
+            with self.server.lock:
+                deposition = self.server.new_deposition(json.loads(body or b"{}").get("metadata", {}), {})
+            return self.send_json(201, self.server.deposition_json(deposition))
+
+        match = re.fullmatch(r"/api/deposit/depositions/(\d+)/actions/(\w+)", path)
+        if match is None or int(match[1]) not in self.server.depositions:
+            return self.send_json(404, {"message": "not found"})
+        deposition = self.server.depositions[int(match[1])]
+        with self.server.lock:
+            if match[2] == "publish":
+                deposition["submitted"] = True
+                deposition["doi"] = f"10.5281/zenodo.{deposition['id']}"
+                deposition["conceptdoi"] = "10.5281/zenodo.1"
+                return self.send_json(202, self.server.deposition_json(deposition))
+            if match[2] == "newversion":
+                draft = self.server.new_deposition(dict(deposition["metadata"]),
+                                                   self.server.buckets[deposition["bucket"]])
+                deposition["draft"] = draft["id"]
+                return self.send_json(201, self.server.deposition_json(deposition))
+        self.send_json(400, {"message": f"unsupported action {match[2]}"})
+
+    def do_GET(self) -> None:
+        path = self.route()
+        match = re.fullmatch(r"/api/deposit/depositions/(\d+)", path)
+        if match and int(match[1]) in self.server.depositions:
+            return self.send_json(200, self.server.deposition_json(self.server.depositions[int(match[1])]))
+        match = re.fullmatch(r"/api/files/(\w+)", path)
+        if match and match[1] in self.server.buckets:
+            files = self.server.buckets[match[1]]
+            return self.send_json(200, {"contents": [{"key": k, **v} for k, v in files.items()]})
+        self.send_json(404, {"message": "not found"})
+
+    def do_PUT(self) -> None:
+        path = self.route()
+        match = re.fullmatch(r"/api/deposit/depositions/(\d+)", path)
+        if match and int(match[1]) in self.server.depositions:
+            self.server.depositions[int(match[1])]["metadata"] = json.loads(self.read_body())["metadata"]
+            return self.send_json(200, self.server.deposition_json(self.server.depositions[int(match[1])]))
+
+        match = re.fullmatch(r"/api/files/(\w+)/(.+)", path)
+        if not match or match[1] not in self.server.buckets:
+            self.read_body()
+            return self.send_json(404, {"message": "not found"})
+        bucket, name = match[1], match[2]
+        with self.server.lock:
+            failures = self.server.failures.get(name)
+            failure = failures.pop(0) if failures else None
+
+        size = int(self.headers["Content-Length"])
+        if failure == "drop":
+            self.rfile.read(size // 2)
+            self.close_connection = True
+            return
+        data = self.rfile.read(size)
+        if failure == "503":
+            return self.send_json(503, {"message": "busy"}, {"Retry-After": RETRY_AFTER})
+        md5 = "0" * 32 if failure == "badsum" else hashlib.md5(data).hexdigest()
+        entry = {"checksum": f"md5:{md5}", "size": size}
+        with self.server.lock:
+            self.server.buckets[bucket][name] = entry
+        self.send_json(201, {"key": name, **entry})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Zenodo deposition API")
+    parser.add_argument("port", type=int, nargs="?", default=8000, help="Port (default: 8000)")
+    args = parser.parse_args()
+    server = ZenodoStub(args.port)
+    print(f"Serving the Zenodo stand-in at {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
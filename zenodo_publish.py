@@ -3,21 +3,94 @@
 Publish Arca Verborum dataset to Zenodo using zenodo-client library.
 
 This script reads metadata from zenodo.metadata.yml and uploads the dataset
-to Zenodo (or sandbox), handling versioning automatically.
+to Zenodo (or sandbox), handling versioning automatically. The files are
+uploaded concurrently by zenodo_upload.UploadEngine, which retries failed
+uploads and skips files the deposition already has. Per-file transfer
+metrics of every run are appended to .zenodo_transfers.json.
+
+A new record's draft is registered before its files are uploaded, so a
+failed first publication is resumed on the same draft when run again.
 """
 import argparse
 import json
 import logging
 import os
+import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
 
+import pystow
 import yaml
-from zenodo_client import ensure_zenodo
+from zenodo_client import Zenodo
+
+from zenodo_upload import DEFAULT_RETRIES, DEFAULT_WORKERS, UploadEngine, timestamp, transfer_summary
 
 STATE_FILE = Path(".zenodo_state.json")
+TRANSFER_LOG = STATE_FILE.with_name(".zenodo_transfers.json")
+TRANSFER_LOG_RUNS = 50  # Runs kept in the transfer log
 META_FILE = Path("zenodo.metadata.yml")
+TEST_TOKEN_VAR = "ZENODO_TEST_API_TOKEN"  # Token for --api-url; the real tokens are never sent there
+
+
+class PooledZenodo(Zenodo):
+    """
+    zenodo-client's Zenodo API wrapper, with the file uploads of create()
+    and update() done by UploadEngine instead of one file after another,
+    and ensure() registering a new record's draft before uploading to it.
+
+    @param workers: Number of files uploaded at the same time
+    @type workers: int
+    @param retries: Retries per request before giving up
+    @type retries: int
+    @param api_url: Zenodo instance to use instead of zenodo.org (e.g., a local test server)
+    @type api_url: Optional[str]
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, retries: int = DEFAULT_RETRIES,
+                 api_url: Optional[str] = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if api_url:
+            self.base = api_url.rstrip("/")
+            self.api_base = self.base + "/api"
+            self.depositions_base = self.api_base + "/deposit/depositions"
+        self.engine = UploadEngine(self.access_token, workers=workers, retries=retries)
+
+    def ensure(self, key: str, data: Dict[str, Any], paths: Any) -> Any:
+        """
+        Create a record, or a new version of the record stored under key.
+
+        Unlike zenodo-client, which stores the deposition ID only after
+        create() has uploaded and published, the ID of a new draft is stored
+        right away. If the upload fails, the next run then continues that
+        draft with update() (which skips the files already uploaded) instead
+        of creating another one.
+
+        @param key: pystow config key holding the deposition ID
+        @type key: str
+        @param data: Deposition data ({"metadata": {...}}) for a new record
+        @type data: Dict[str, Any]
+        @param paths: Files to upload
+        @type paths: Any
+        @return: Response of the publish request
+        @rtype: requests.Response
+        """
+        deposition_id = pystow.get_config(self.module, key)
+        if deposition_id is None:
+            res = self.engine.session.post(self.depositions_base, json=data, timeout=60)
+            if res.status_code == 400:
+                raise ValueError(res.text)
+            res.raise_for_status()
+            deposition_id = str(res.json()["id"])
+            pystow.write_config(self.module, key, deposition_id)
+            print(f"[PooledZenodo] Created draft deposition {deposition_id}, stored under key '{key}'")
+        return self.update(deposition_id=deposition_id, paths=paths)
+
+    def _upload_files(self, *, bucket: str, paths: Any, timeout: Optional[float] = None) -> List[Any]:
+        paths = [paths] if isinstance(paths, (str, Path)) else paths
+        results = self.engine.upload_files(bucket, [Path(p) for p in paths])
+        return [r["response"] for r in results if r["response"] is not None]
 
 
 def format_bytes(size: int) -> str:
@@ -78,6 +151,51 @@ def save_state(state: Dict[str, Any]) -> None:
     print("[save_state] State saved successfully")
 
 
+def save_transfer_log(run: Dict[str, Any]) -> None:
+    """
+    Append a run's transfer metrics to the transfer log, keeping the latest runs.
+
+    @param run: Run record with its transfers and summary
+    @type run: Dict[str, Any]
+    """
+    runs = []
+    if TRANSFER_LOG.exists():
+        try:
+            runs = json.loads(TRANSFER_LOG.read_text(encoding="utf-8")).get("runs", [])
+        except (ValueError, AttributeError):
+            print(f"[save_transfer_log] WARNING: Replacing unreadable {TRANSFER_LOG}")
+    runs = (runs + [run])[-TRANSFER_LOG_RUNS:]
+    TRANSFER_LOG.write_text(json.dumps({"runs": runs}, indent=2), encoding="utf-8")
+    print(f"[save_transfer_log] Transfer metrics saved to {TRANSFER_LOG}")
+
+
+def print_transfer_summary(run: Dict[str, Any]) -> None:
+    """
+    Print the transfers of a run, one line per file, and their totals.
+
+    @param run: Run record with its transfers and summary
+    @type run: Dict[str, Any]
+    """
+    print_section("TRANSFER SUMMARY")
+    for t in run["transfers"]:
+        line = f"  {t['name']:<55} {t['status']:<9} {format_bytes(t['bytes']):>10}"
+        if t["status"] == "uploaded":
+            line += f"  {t['upload_seconds']:7.1f}s  {format_bytes(t['bytes_per_second'] or 0)}/s"
+            if "response_seconds" in t:
+                line += f"  server {t['response_seconds']:.1f}s"
+        if t["retries"]:
+            line += f"  {t['retries']} retries"
+        print(line)
+    summary = run["summary"]
+    print(f"\n  Uploaded {summary['uploaded']}, skipped {summary['skipped']}, failed {summary['failed']} "
+          f"of {summary['files']} file(s)")
+    print(f"  Sent {format_bytes(summary['bytes'])} in {summary['seconds']:.1f}s"
+          + (f" ({format_bytes(summary['bytes_per_second'])}/s)" if summary["bytes_per_second"] else ""))
+    print(f"  Retries: {summary['retries']}")
+    if summary["slowest"]:
+        print(f"  Slowest upload: {summary['slowest']}")
+
+
 def die(msg: str, code: int = 1) -> None:
     """
     Print error message and exit.
@@ -255,6 +373,9 @@ def publish_to_zenodo(
     sandbox: bool = False,
     dry_run: bool = False,
     force: bool = False,
+    upload_workers: int = DEFAULT_WORKERS,
+    upload_retries: int = DEFAULT_RETRIES,
+    api_url: Optional[str] = None,
 ) -> None:
     """
     Publish dataset to Zenodo using zenodo-client library.
@@ -267,6 +388,14 @@ def publish_to_zenodo(
     @type dry_run: bool
     @param force: Force publication even if version exists
     @type force: bool
+    @param upload_workers: Number of files uploaded at the same time
+    @type upload_workers: int
+    @param upload_retries: Retries per request before giving up
+    @type upload_retries: int
+    @param api_url: Zenodo instance to use instead of zenodo.org (e.g., a local test server).
+                    It gets its own deposition key and TEST_TOKEN_VAR as token, and
+                    .zenodo_state.json is neither checked nor updated.
+    @type api_url: Optional[str]
     """
     print_section("ZENODO PUBLICATION")
     print(f"[publish_to_zenodo] Environment: {'SANDBOX' if sandbox else 'PRODUCTION'}")
@@ -274,16 +403,25 @@ def publish_to_zenodo(
     print(f"[publish_to_zenodo] Force: {force}")
 
     # Check environment variable
-    token_var = "ZENODO_SANDBOX_API_TOKEN" if sandbox else "ZENODO_API_TOKEN"
+    if api_url:
+        token_var = TEST_TOKEN_VAR
+    else:
+        token_var = "ZENODO_SANDBOX_API_TOKEN" if sandbox else "ZENODO_API_TOKEN"
     token_set = token_var in os.environ
     print(f"[publish_to_zenodo] Environment variable {token_var}: {'SET' if token_set else 'NOT SET'}")
     if not token_set:
+        if api_url:
+            die(f"--api-url requires {token_var}; the Zenodo API tokens are not sent to other servers")
         print(f"[publish_to_zenodo] WARNING: {token_var} not found in environment")
         print("[publish_to_zenodo] zenodo-client will try to read from ~/.config/zenodo.ini")
 
     # Check version against state
     print("\n[publish_to_zenodo] Checking version constraints")
-    state = load_state()
+    if api_url:
+        print(f"[publish_to_zenodo] Test server: ignoring {STATE_FILE}")
+        state: Dict[str, Any] = {}
+    else:
+        state = load_state()
     last_version = state.get("last_version")
     print(f"[publish_to_zenodo] Current version: {meta['version']}")
     print(f"[publish_to_zenodo] Last published version: {last_version or 'None'}")
@@ -317,7 +455,7 @@ def publish_to_zenodo(
         return
 
     print_section("UPLOADING TO ZENODO")
-    print(f"[publish_to_zenodo] Target: {'https://sandbox.zenodo.org' if sandbox else 'https://zenodo.org'}")
+    print(f"[publish_to_zenodo] Target: {api_url or ('https://sandbox.zenodo.org' if sandbox else 'https://zenodo.org')}")
     print(f"[publish_to_zenodo] Version: {meta['version']}")
     print(f"[publish_to_zenodo] Files to upload: {len(paths)}")
 
@@ -334,21 +472,51 @@ def publish_to_zenodo(
     try:
         # Use ensure_zenodo for automatic versioning
         # The 'key' parameter is used to store/retrieve deposition ID
-        key = "arcaverborum_sandbox" if sandbox else "arcaverborum"
+        if api_url:
+            # Keep test depositions apart from the real record
+            key = "arcaverborum_" + re.sub(r"\W+", "_", urlparse(api_url).netloc or api_url).strip("_")
+        else:
+            key = "arcaverborum_sandbox" if sandbox else "arcaverborum"
         print(f"\n[publish_to_zenodo] Using key '{key}' for deposition tracking")
-        print("[publish_to_zenodo] Calling ensure_zenodo()...")
+        print("[publish_to_zenodo] Calling ensure()...")
         print("[publish_to_zenodo] This will create a new deposition or update existing one")
         print(f"[publish_to_zenodo] Metadata structure: {{'metadata': {{...{len(metadata_dict)} fields...}}}}")
+        print(f"[publish_to_zenodo] Uploading {upload_workers} file(s) at a time, {upload_retries} retries per request")
         print()
 
-        response = ensure_zenodo(
-            key=key,
-            data={"metadata": metadata_dict},
-            paths=paths,
+        zenodo = PooledZenodo(
+            workers=upload_workers,
+            retries=upload_retries,
+            api_url=api_url,
+            access_token=os.environ.get(token_var),
             sandbox=sandbox,
         )
-
-        print("\n[publish_to_zenodo] ensure_zenodo() completed successfully")
+        run = {
+            "started_at": timestamp(),
+            "version": meta["version"],
+            "environment": api_url or ("sandbox" if sandbox else "production"),
+            "workers": upload_workers,
+            "retries": upload_retries,
+        }
+        try:
+            response = zenodo.ensure(
+                key=key,
+                data={"metadata": metadata_dict},
+                paths=paths,
+            )
+            run["status"] = "published"
+        except Exception as e:
+            run["status"] = f"failed: {e}"
+            raise
+        finally:
+            # Record the transfers also when the publication failed, to spot flaky uploads
+            run["ended_at"] = timestamp()
+            run["transfers"] = sorted(zenodo.engine.transfers, key=lambda t: t["started_at"])
+            run["summary"] = transfer_summary(run["transfers"], zenodo.engine.upload_seconds)
+            print_transfer_summary(run)
+            save_transfer_log(run)
+
+        print("\n[publish_to_zenodo] ensure() completed successfully")
         print(f"[publish_to_zenodo] Response status code: {response.status_code}")
 
         # Extract information from response
@@ -382,7 +550,10 @@ def publish_to_zenodo(
         # Merge with existing state
         state.update(new_state)
         print()
-        save_state(state)
+        if api_url:
+            print(f"[publish_to_zenodo] Test server: not updating {STATE_FILE}")
+        else:
+            save_state(state)
 
         print_section("SUCCESS")
         print("✓ Successfully published to Zenodo!")
@@ -448,6 +619,23 @@ def main() -> None:
         action="store_true",
         help="Show metadata preview and exit"
     )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of files uploaded at the same time (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--upload-retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries per request, with exponential backoff (default: {DEFAULT_RETRIES})"
+    )
+    parser.add_argument(
+        "--api-url",
+        help=f"Zenodo instance to use instead of zenodo.org or the sandbox (e.g., a local test server; "
+             f"requires {TEST_TOKEN_VAR}, does not update {STATE_FILE})"
+    )
 
     args = parser.parse_args()
     print("[main] Parsed arguments:")
@@ -455,6 +643,10 @@ def main() -> None:
     print(f"[main]   dry_run: {args.dry_run}")
     print(f"[main]   force: {args.force}")
     print(f"[main]   show: {args.show}")
+    print(f"[main]   upload_workers: {args.upload_workers}")
+    print(f"[main]   upload_retries: {args.upload_retries}")
+    if args.api_url:
+        print(f"[main]   api_url: {args.api_url}")
 
     # Read metadata
     print()
@@ -473,6 +665,9 @@ def main() -> None:
         sandbox=args.sandbox,
         dry_run=args.dry_run,
         force=args.force,
+        upload_workers=args.upload_workers,
+        upload_retries=args.upload_retries,
+        api_url=args.api_url,
     )
 
 
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Upload files to a Zenodo deposition bucket.
+
+Used by zenodo_publish.py for the release archives. Files are streamed
+from disk on several threads over one pooled requests.Session. Files
+whose MD5 already matches the checksum the bucket reports (e.g., left by
+an earlier, interrupted run on the same draft) are skipped. Since
+zenodo_publish.py stores a new record's draft ID before uploading, a failed
+publication can be run again and continues on the same draft. Failed
+uploads are retried with exponential backoff, and every upload is checked
+against the MD5 that Zenodo returns.
+
+Each file's transfer is recorded (see UploadEngine.transfers): start and
+end time, bytes, throughput, retries and errors, and how long the server
+took to answer once the data was sent. zenodo_publish.py writes them to a
+JSON log next to .zenodo_state.json.
+"""
+import datetime
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 5
+DEFAULT_TIMEOUT = 300  # Seconds without data before a request fails
+BACKOFF_SECONDS = 2.0  # First retry delay, doubled for each further retry
+MAX_BACKOFF_SECONDS = 60.0
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}  # Responses worth retrying
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def timestamp() -> str:
+    """Current UTC time in ISO 8601, for transfer records."""
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds")
+
+
+def file_md5(path: Path) -> str:
+    """
+    Compute the MD5 of a file, as Zenodo reports it.
+
+    @param path: File to hash
+    @type path: Path
+    @return: Hex digest
+    @rtype: str
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class TimedReader:
+    """
+    File wrapper that notes when the last byte of a request body was read,
+    i.e. handed to the connection.
+
+    @param f: Binary file opened for reading
+    @type f: BinaryIO
+    @param size: File size in bytes
+    @type size: int
+    """
+
+    def __init__(self, f: BinaryIO, size: int) -> None:
+        self.f = f
+        self.size = size
+        self.sent = 0
+        self.finished_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, amount: int = -1) -> bytes:
+        data = self.f.read(amount)
+        self.sent += len(data)
+        if self.finished_at is None and (not data or self.sent >= self.size):
+            self.finished_at = time.perf_counter()
+        return data
+
+
+def transfer_summary(transfers: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    """
+    Totals over the transfers of one run.
+
+    @param transfers: Transfer records (see UploadEngine.transfers)
+    @type transfers: List[Dict[str, Any]]
+    @param seconds: Wall-clock time of the run's uploads
+    @type seconds: float
+    @return: Counts by status, bytes sent, overall throughput, retries and the slowest upload
+    @rtype: Dict[str, Any]
+    """
+    uploaded = [t for t in transfers if t["status"] == "uploaded"]
+    sent = sum(t["bytes"] for t in uploaded)
+    slowest = min(uploaded, key=lambda t: t["bytes_per_second"], default=None)
+    return {
+        "files": len(transfers),
+        "uploaded": len(uploaded),
+        "skipped": sum(1 for t in transfers if t["status"] == "skipped"),
+        "failed": sum(1 for t in transfers if t["status"] == "failed"),
+        "bytes": sent,
+        "seconds": round(seconds, 3),
+        "bytes_per_second": round(sent / seconds) if seconds > 0 else None,
+        "retries": sum(t["retries"] for t in transfers),
+        "slowest": slowest["name"] if slowest else None,
+    }
+
+
+class UploadEngine:
+    """
+    Upload files to Zenodo deposition buckets.
+
+    @param access_token: Zenodo API token
+    @type access_token: str
+    @param workers: Number of files uploaded at the same time
+    @type workers: int
+    @param retries: Retries per request before giving up
+    @type retries: int
+    @param timeout: Seconds without data before a request fails
+    @type timeout: float
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        workers: int = DEFAULT_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.params = {"access_token": access_token}
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.print_lock = threading.Lock()
+        self.transfers: List[Dict[str, Any]] = []
+        self.upload_seconds = 0.0  # Wall-clock time spent in upload_files()
+
+    def log(self, message: str) -> None:
+        """Print a message without interleaving it with those of other threads."""
+        with self.print_lock:
+            print(f"[upload] {message}", flush=True)
+
+    def request(self, method: str, url: str, label: str, path: Optional[Path] = None,
+                transfer: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """
+        Send a request, retrying with backoff on connection errors and on
+        responses such as 429 or 503.
+
+        @param method: HTTP method
+        @type method: str
+        @param url: Request URL
+        @type url: str
+        @param label: Name for log messages
+        @type label: str
+        @param path: File to send as the body (reopened for each attempt)
+        @type path: Optional[Path]
+        @param transfer: Transfer record to count attempts and errors in, and to
+                         set the server response time of the last attempt in
+        @type transfer: Optional[Dict[str, Any]]
+        @return: Successful response
+        @rtype: requests.Response
+        """
+        transfer = transfer if transfer is not None else {"attempts": 0, "errors": []}
+        attempt = 0
+        while True:
+            retry_after = None
+            transfer["attempts"] += 1
+            try:
+                if path is None:
+                    res = self.session.request(method, url, timeout=self.timeout)
+                else:
+                    with open(path, "rb") as f:
+                        body = TimedReader(f, transfer.get("bytes", path.stat().st_size))
+                        res = self.session.request(method, url, data=body, timeout=self.timeout)
+                    if body.finished_at is not None:
+                        # Time from the last byte sent to the complete response
+                        transfer["response_seconds"] = round(time.perf_counter() - body.finished_at, 3)
+                if res.status_code not in RETRY_STATUS:
+                    res.raise_for_status()
+                    return res
+                error = f"HTTP {res.status_code}"
+                retry_after = res.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+            transfer["errors"].append(error)
+
+            if attempt == self.retries:
+                raise RuntimeError(f"{method} {label} failed after {attempt + 1} attempt(s): {error}")
+            delay = min(BACKOFF_SECONDS * 2 ** attempt, MAX_BACKOFF_SECONDS)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            self.log(f"{label}: {error}; retrying in {delay:.0f}s (attempt {attempt + 2}/{self.retries + 1})")
+            time.sleep(delay)
+            attempt += 1
+
+    def bucket_checksums(self, bucket: str) -> Dict[str, str]:
+        """
+        List the files already in a bucket.
+
+        @param bucket: Bucket URL (links.bucket of the deposition)
+        @type bucket: str
+        @return: File name -> checksum (e.g., "md5:...")
+        @rtype: Dict[str, str]
+        """
+        res = self.request("GET", bucket, "bucket listing")
+        return {entry["key"]: entry.get("checksum", "") for entry in res.json().get("contents", [])}
+
+    def upload_file(self, bucket: str, path: Path, existing: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Upload one file unless the bucket already has it with the same MD5.
+
+        The file's transfer record is added to self.transfers, also if the
+        upload fails.
+
+        @param bucket: Bucket URL
+        @type bucket: str
+        @param path: File to upload
+        @type path: Path
+        @param existing: Checksums of the files in the bucket
+        @type existing: Dict[str, str]
+        @return: Dict with name, size, md5, status ("uploaded" or "skipped") and the response (if uploaded)
+        @rtype: Dict[str, Any]
+        """
+        size = path.stat().st_size
+        transfer: Dict[str, Any] = {
+            "name": path.name,
+            "status": "failed",
+            "bytes": size,
+            "started_at": timestamp(),
+            "attempts": 0,
+            "errors": [],
+        }
+        start = time.perf_counter()
+        try:
+            md5 = file_md5(path)
+            transfer["md5_seconds"] = round(time.perf_counter() - start, 3)
+            result = {"name": path.name, "size": size, "md5": md5, "response": None}
+            if existing.get(path.name) == f"md5:{md5}":
+                self.log(f"Skipped {path.name}: already in the deposition (MD5 matches)")
+                transfer["status"] = "skipped"
+                return {**result, "status": "skipped"}
+
+            upload_start = time.perf_counter()
+            for attempt in range(2):
+                res = self.request("PUT", f"{bucket}/{path.name}", path.name, path, transfer)
+                checksum = res.json().get("checksum")
+                if checksum in (None, f"md5:{md5}"):
+                    break
+                transfer["errors"].append(f"checksum mismatch: {checksum}")
+                if attempt:
+                    raise RuntimeError(f"{path.name}: Zenodo reports {checksum}, local file has md5:{md5}")
+                self.log(f"{path.name}: Zenodo reports {checksum}, expected md5:{md5}; uploading again")
+            upload_seconds = time.perf_counter() - upload_start
+            transfer["status"] = "uploaded"
+            transfer["upload_seconds"] = round(upload_seconds, 3)
+            transfer["bytes_per_second"] = round(size / upload_seconds) if upload_seconds > 0 else None
+            self.log(f"Uploaded {path.name} in {upload_seconds:.1f}s"
+                     + (f" ({size / upload_seconds / 1e6:.1f} MB/s)" if upload_seconds > 0 else "")
+                     + (f", {transfer['attempts'] - 1} retries" if transfer["attempts"] > 1 else ""))
+            return {**result, "status": "uploaded", "response": res}
+        finally:
+            transfer["ended_at"] = timestamp()
+            transfer["seconds"] = round(time.perf_counter() - start, 3)
+            transfer["retries"] = max(0, transfer["attempts"] - 1)
+            with self.print_lock:
+                self.transfers.append(transfer)
+
+    def upload_files(self, bucket: str, paths: List[Path]) -> List[Dict[str, Any]]:
+        """
+        Upload files to a bucket concurrently, skipping those it already has.
+
+        @param bucket: Bucket URL
+        @type bucket: str
+        @param paths: Files to upload
+        @type paths: List[Path]
+        @return: Result of upload_file() for each file, in the order of paths
+        @rtype: List[Dict[str, Any]]
+        """
+        start = time.perf_counter()
+        existing = self.bucket_checksums(bucket)
+        self.log(f"{len(paths)} file(s), {len(existing)} already in the bucket, "
+                 f"{min(self.workers, len(paths))} upload(s) at a time")
+        results: Dict[Path, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.upload_file, bucket, path, existing): path for path in paths}
+            try:
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
+            except BaseException:
+                executor.shutdown(cancel_futures=True)
+                raise
+            finally:
+                self.upload_seconds += time.perf_counter() - start
+        return [results[path] for path in paths]
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+
+"""
+Streaming ZIP Writer
+
+Writes ZIP archives to non-seekable streams (e.g., while hashing them), with
+each member's data compressed by any zlib-like compressor. Used by
+prepare_release.py for the release archives.
+
+Members are written with data descriptors (CRC and sizes follow the data),
+as zipfile does for non-seekable files, so the archive is written front to
+back exactly once. ZIP64 extensions are used where sizes or offsets need
+them. The archives can be read with zipfile, unzip and other ZIP tools.
+
+ParallelDeflater compresses large members pigz-style: the data is split into
+blocks that are compressed independently on several threads, each primed
+with the last 32 KiB of the previous block. The concatenated blocks form a
+single valid deflate stream, and the output does not depend on the number
+of threads.
+
+An archive can be written in stages: members written by one process (e.g.,
+merge_cldf_datasets.py --direct-archive) are recorded with
+ZipMember.to_dict(), and another process resumes the writer after them to
+add further members and the central directory.
+
+MemberCache keeps the deflate streams of members by the SHA256 of their
+data, so that files unchanged since the previous build are copied into the
+new archive without being compressed again.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+# Block size for parallel deflate, and the deflate window used to prime each block
+PARALLEL_BLOCK_SIZE = 1024 * 1024
+DEFLATE_WINDOW = 32 * 1024
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_DEFLATED = 8
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+CREATE_SYSTEM_UNIX = 3
+
+
+def deflate_compressor(level: int = 6):
+    """Raw deflate compressor (as used for ZIP members)."""
+    return zlib.compressobj(level, zlib.DEFLATED, -15)
+
+
+def deflate_block(data: bytes, level: int, zdict: bytes, final: bool) -> bytes:
+    """
+    Compress one block of a parallel deflate stream.
+
+    @param data: Block data
+    @param level: Deflate level
+    @param zdict: Preceding data (up to 32 KiB) for back-references
+    @param final: If True, end the deflate stream; otherwise end on a byte boundary
+    @return: Compressed block
+    """
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = deflate_compressor(level)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class ParallelDeflater:
+    """
+    Raw deflate compressor that compresses blocks on several threads.
+
+    Has the same compress()/flush() interface as zlib compressors. Input is
+    buffered into PARALLEL_BLOCK_SIZE blocks; compressed blocks are returned
+    in order as they become available, with up to 2 blocks per thread in
+    flight. Data of at most one block is compressed exactly as by
+    deflate_compressor().
+
+    @param level: Deflate level
+    @param threads: Number of compression threads
+    @param executor: Thread pool to share between compressors (default: a pool of its own)
+    """
+
+    def __init__(self, level: int = 6, threads: int = 1, executor: Optional[Executor] = None):
+        self.level = level
+        self.threads = max(1, threads)
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=self.threads)
+        self.pending: List[Future] = []
+        self.buffer = bytearray()
+        self.zdict = b''
+
+    def _submit(self, block: bytes, final: bool):
+        self.pending.append(self.executor.submit(deflate_block, block, self.level, self.zdict, final))
+        self.zdict = block[-DEFLATE_WINDOW:]
+
+    def _collect(self, keep: int) -> bytes:
+        output = []
+        while len(self.pending) > keep:
+            output.append(self.pending.pop(0).result())
+        return b''.join(output)
+
+    def compress(self, data: bytes) -> bytes:
+        """Add data; return the compressed output that is ready."""
+        self.buffer += data
+        # Keep the last block back, so that flush() can mark it final
+        while len(self.buffer) > PARALLEL_BLOCK_SIZE:
+            self._submit(bytes(self.buffer[:PARALLEL_BLOCK_SIZE]), final=False)
+            del self.buffer[:PARALLEL_BLOCK_SIZE]
+        return self._collect(keep=2 * self.threads)
+
+    def flush(self) -> bytes:
+        """Compress the remaining data and end the deflate stream."""
+        self._submit(bytes(self.buffer), final=True)
+        self.buffer = bytearray()
+        output = self._collect(keep=0)
+        if self.own_executor:
+            self.executor.shutdown()
+        return output
+
+
+@dataclass
+class ZipMember:
+    """Central directory information of a written member."""
+    name: str
+    date_time: Tuple[int, int, int, int, int, int]
+    crc: int
+    compress_size: int
+    file_size: int
+    header_offset: int
+    zip64: bool
+    mode: int
+
+    def to_dict(self) -> dict:
+        """Serialize (e.g., to resume the archive in another process)."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ZipMember':
+        """Deserialize a member written by to_dict()."""
+        return cls(**{**data, 'date_time': tuple(data['date_time'])})
+
+
+def dos_date_time(date_time: Tuple[int, int, int, int, int, int]) -> Tuple[int, int]:
+    """Encode (year, month, day, hour, minute, second) as DOS date and time."""
+    year, month, day, hour, minute, second = date_time
+    return ((year - 1980) << 9 | month << 5 | day), (hour << 11 | minute << 5 | second // 2)
+
+
+class ZipMemberWriter:
+    """
+    Writer for the data of one member, returned by StreamingZipWriter.open_member().
+    """
+
+    def __init__(self, archive: 'StreamingZipWriter', name: str, date_time, compressor,
+                 zip64: bool, mode: int):
+        self.archive = archive
+        self.name = name
+        self.date_time = date_time
+        self.compressor = compressor
+        self.zip64 = zip64
+        self.mode = mode
+        self.header_offset = archive._write_local_header(name, date_time, zip64)
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+
+    def write(self, data: bytes):
+        """Compress and write member data."""
+        self.crc = zlib.crc32(data, self.crc)
+        self.file_size += len(data)
+        self._write_compressed(self.compressor.compress(data))
+
+    def _write_compressed(self, data: bytes):
+        self.compress_size += len(data)
+        self.archive._write(data)
+
+    def close(self) -> ZipMember:
+        """End the member; return its information."""
+        self._write_compressed(self.compressor.flush())
+        if not self.zip64 and max(self.file_size, self.compress_size) >= ZIP64_LIMIT:
+            raise ValueError(f"{self.name} is larger than 4 GB; pass size_hint to write it with ZIP64")
+
+        member = ZipMember(self.name, self.date_time, self.crc, self.compress_size, self.file_size,
+                           self.header_offset, self.zip64, self.mode)
+        self.archive._write_data_descriptor(member)
+        self.archive.members.append(member)
+        return member
+
+
+class StreamingZipWriter:
+    """
+    Write a ZIP archive front to back to a binary stream.
+
+    To add members to an archive whose central directory has not been
+    written yet, pass the archive's current size and its members.
+
+    @param fileobj: Binary stream with a write() method (need not be seekable)
+    @param offset: Bytes already in the archive
+    @param members: Members already in the archive
+    """
+
+    def __init__(self, fileobj, offset: int = 0, members: Optional[List[ZipMember]] = None):
+        self.fileobj = fileobj
+        self.offset = offset
+        self.members: List[ZipMember] = list(members or [])
+
+    def _write(self, data: bytes):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def open_member(self, name: str, date_time: Tuple[int, int, int, int, int, int],
+                    compressor=None, zip64: bool = False, mode: int = 0o644) -> ZipMemberWriter:
+        """
+        Start a deflated member whose data is written piecewise.
+
+        No other member can be written until the returned writer is closed.
+
+        @param name: Member name (path within the archive)
+        @param date_time: Modification time (year, month, day, hour, minute, second)
+        @param compressor: Raw deflate compressor (default: deflate_compressor())
+        @param zip64: Use ZIP64 extensions (needed if the member may exceed 4 GB)
+        @param mode: Unix file permissions
+        @return: Writer with write() and close()
+        """
+        return ZipMemberWriter(self, name, date_time, compressor or deflate_compressor(), zip64, mode)
+
+    def write_member(self, name: str, chunks: Iterable[bytes],
+                     date_time: Tuple[int, int, int, int, int, int],
+                     compressor=None, size_hint: int = 0, mode: int = 0o644) -> ZipMember:
+        """
+        Write one deflated member.
+
+        @param name: Member name (path within the archive)
+        @param chunks: Member data, in chunks
+        @param date_time: Modification time (year, month, day, hour, minute, second)
+        @param compressor: Raw deflate compressor (default: deflate_compressor())
+        @param size_hint: Expected uncompressed size; ZIP64 is used if it may exceed 4 GB
+        @param mode: Unix file permissions
+        @return: Member information
+        """
+        # Same margin as zipfile: compressed data can be slightly larger than the input
+        member = self.open_member(name, date_time, compressor, size_hint * 1.05 > ZIP64_LIMIT, mode)
+        for chunk in chunks:
+            member.write(chunk)
+        return member.close()
+
+    def write_raw_member(self, name: str, compressed_chunks: Iterable[bytes], crc: int, file_size: int,
+                         date_time: Tuple[int, int, int, int, int, int], mode: int = 0o644) -> ZipMember:
+        """
+        Write one member from data that is already deflated.
+
+        @param name: Member name (path within the archive)
+        @param compressed_chunks: Complete raw deflate stream, in chunks
+        @param crc: CRC-32 of the uncompressed data
+        @param file_size: Uncompressed size
+        @param date_time: Modification time (year, month, day, hour, minute, second)
+        @param mode: Unix file permissions
+        @return: Member information
+        """
+        member = self.open_member(name, date_time, RawPassthrough(), file_size * 1.05 > ZIP64_LIMIT, mode)
+        for chunk in compressed_chunks:
+            member._write_compressed(chunk)
+        member.crc = crc
+        member.file_size = file_size
+        return member.close()
+
+    def _write_local_header(self, name: str, date_time, zip64: bool) -> int:
+        header_offset = self.offset
+        encoded_name = name.encode('utf-8')
+        flags = FLAG_DATA_DESCRIPTOR | (FLAG_UTF8 if not name.isascii() else 0)
+        dos_date, dos_time = dos_date_time(date_time)
+        extra = b''
+        sizes = 0
+        if zip64:
+            extra = struct.pack('<HHQQ', 0x0001, 16, 0, 0)
+            sizes = ZIP64_LIMIT
+        self._write(struct.pack(
+            '<IHHHHHIIIHH', 0x04034B50, 45 if zip64 else 20, flags, ZIP_DEFLATED,
+            dos_time, dos_date, 0, sizes, sizes, len(encoded_name), len(extra)
+        ) + encoded_name + extra)
+        return header_offset
+
+    def _write_data_descriptor(self, member: ZipMember):
+        if member.zip64:
+            self._write(struct.pack('<IIQQ', 0x08074B50, member.crc, member.compress_size, member.file_size))
+        else:
+            self._write(struct.pack('<IIII', 0x08074B50, member.crc, member.compress_size, member.file_size))
+
+    def close(self):
+        """Write the central directory."""
+        start = self.offset
+        for member in self.members:
+            encoded_name = member.name.encode('utf-8')
+            flags = FLAG_DATA_DESCRIPTOR | (FLAG_UTF8 if not member.name.isascii() else 0)
+            dos_date, dos_time = dos_date_time(member.date_time)
+
+            # ZIP64 extra field holds the values that do not fit in 32 bits
+            zip64_values = []
+            file_size, compress_size, header_offset = member.file_size, member.compress_size, member.header_offset
+            if file_size >= ZIP64_LIMIT:
+                zip64_values.append(file_size)
+                file_size = ZIP64_LIMIT
+            if compress_size >= ZIP64_LIMIT:
+                zip64_values.append(compress_size)
+                compress_size = ZIP64_LIMIT
+            if header_offset >= ZIP64_LIMIT:
+                zip64_values.append(header_offset)
+                header_offset = ZIP64_LIMIT
+            extra = b''
+            if zip64_values:
+                extra = struct.pack(f'<HH{len(zip64_values)}Q', 0x0001, 8 * len(zip64_values), *zip64_values)
+            version = 45 if zip64_values or member.zip64 else 20
+
+            self._write(struct.pack(
+                '<IBBHHHHHIIIHHHHHII', 0x02014B50, version, CREATE_SYSTEM_UNIX, version, flags,
+                ZIP_DEFLATED, dos_time, dos_date, member.crc, compress_size, file_size,
+                len(encoded_name), len(extra), 0, 0, 0, (0o100000 | member.mode) << 16, header_offset
+            ) + encoded_name + extra)
+
+        size = self.offset - start
+        count = len(self.members)
+        if count >= 0xFFFF or size >= ZIP64_LIMIT or start >= ZIP64_LIMIT:
+            # ZIP64 end of central directory record and locator
+            zip64_end = self.offset
+            self._write(struct.pack('<IQHHIIQQQQ', 0x06064B50, 44, 45, 45, 0, 0, count, count, size, start))
+            self._write(struct.pack('<IIQI', 0x07064B50, 0, zip64_end, 1))
+            count, size, start = min(count, 0xFFFF), min(size, ZIP64_LIMIT), min(start, ZIP64_LIMIT)
+        self._write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, count, count, size, start, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+
+class RawPassthrough:
+    """Compressor for data that is already compressed (see write_raw_member)."""
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b''
+
+
+def compressor_for(level: int, threads: int, size: int):
+    """
+    Choose the compressor for a member.
+
+    Members larger than one block use ParallelDeflater (even with one thread,
+    so that the output does not depend on the thread count).
+
+    @param level: Deflate level
+    @param threads: Number of compression threads
+    @param size: Member size in bytes
+    @return: Compressor with compress() and flush()
+    """
+    if size > PARALLEL_BLOCK_SIZE:
+        return ParallelDeflater(level, threads)
+    return deflate_compressor(level)
+
+
+def read_chunks(f, chunk_size: int) -> Iterable[bytes]:
+    """Iterate over a binary file in chunks."""
+    while chunk := f.read(chunk_size):
+        yield chunk
+
+
+def zip_date_time(timestamp: float) -> Tuple[int, int, int, int, int, int]:
+    """Member date_time for a Unix timestamp (clamped to the DOS epoch, 1980)."""
+    date_time = time.localtime(timestamp)[:6]
+    return date_time if date_time[0] >= 1980 else (1980, 1, 1, 0, 0, 0)
+
+
+def file_sha256(path: Path) -> str:
+    """SHA256 of a file's contents."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in read_chunks(f, PARALLEL_BLOCK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class RecordingCompressor:
+    """
+    Wrap a compressor, saving its output to a file for MemberCache.put()
+    and hashing it as it is written.
+
+    @param compressor: Compressor with compress() and flush()
+    @param path: Temporary file for the compressed stream
+    """
+
+    def __init__(self, compressor, path: Path):
+        self.compressor = compressor
+        self.path = path
+        self.file = open(path, 'wb')
+        self.sha256 = hashlib.sha256()
+
+    def compress(self, data: bytes) -> bytes:
+        output = self.compressor.compress(data)
+        self.file.write(output)
+        self.sha256.update(output)
+        return output
+
+    def flush(self) -> bytes:
+        output = self.compressor.flush()
+        self.file.write(output)
+        self.sha256.update(output)
+        self.file.close()
+        return output
+
+
+class MemberCache:
+    """
+    Content-addressed cache of compressed member data.
+
+    Each entry is a raw deflate stream (<key>.deflate) with its CRC, sizes
+    and the stream's own SHA256 (<key>.json), keyed by the SHA256 of the
+    uncompressed data and the compression settings. The stream is checked
+    against its SHA256 before it is used, and a damaged entry is dropped. The stream is the one compressor_for() produced,
+    so an archive built from cached members is identical to one compressed
+    from scratch.
+
+    @param directory: Cache directory (created if missing)
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.used: Set[str] = set()
+
+    @staticmethod
+    def key(sha256: str, level: int) -> str:
+        """Cache key for data with this SHA256, deflated at this level."""
+        return f"{sha256}.deflate{level}-{PARALLEL_BLOCK_SIZE}"
+
+    def get(self, sha256: str, level: int, file_size: int) -> Optional[Tuple[Path, dict]]:
+        """
+        Look up a cached member.
+
+        @param sha256: SHA256 of the uncompressed data
+        @param level: Deflate level
+        @param file_size: Uncompressed size, checked against the entry
+        @return: Tuple of (path of the deflate stream, dict with crc, file_size,
+                 compress_size and sha256), or None if there is no intact entry
+        """
+        key = self.key(sha256, level)
+        info_path = self.directory / f"{key}.json"
+        data_path = self.directory / f"{key}.deflate"
+        try:
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            intact = (info['file_size'] == file_size and data_path.stat().st_size == info['compress_size']
+                      and file_sha256(data_path) == info['sha256'])
+        except (OSError, ValueError, KeyError):
+            intact = False
+        if not intact:
+            # Drop the entry so that the member is compressed and cached again
+            for path in (info_path, data_path):
+                path.unlink(missing_ok=True)
+            return None
+        self.used.add(key)
+        return data_path, info
+
+    def recorder(self, compressor) -> RecordingCompressor:
+        """Wrap a compressor so that its output can be added with put()."""
+        return RecordingCompressor(compressor, self.directory / f"tmp-{os.getpid()}-{id(compressor)}.deflate")
+
+    def put(self, sha256: str, level: int, recorder: RecordingCompressor, member: ZipMember):
+        """
+        Add the stream saved by a recorder as the entry for this data.
+
+        @param sha256: SHA256 of the uncompressed data
+        @param level: Deflate level
+        @param recorder: Recorder the member was compressed with
+        @param member: Member written with it (CRC and sizes)
+        """
+        key = self.key(sha256, level)
+        os.replace(recorder.path, self.directory / f"{key}.deflate")
+        info = {'crc': member.crc, 'file_size': member.file_size, 'compress_size': member.compress_size,
+                'sha256': recorder.sha256.hexdigest()}
+        tmp_path = self.directory / f"tmp-{os.getpid()}-{key}.json"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(tmp_path, self.directory / f"{key}.json")
+        self.used.add(key)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """
+        Remove all entries except the given ones (and leftover temporary files).
+
+        @param keep: Keys to keep
+        @return: Number of entries removed
+        """
+        keep = set(keep)
+        removed = 0
+        for path in self.directory.iterdir():
+            key = path.name.rsplit('.', 1)[0]
+            if key not in keep:
+                path.unlink()
+                removed += path.suffix == '.json'
+        return removed